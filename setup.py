@@ -143,6 +143,7 @@ metadata['requires'] = ['pickle',]
 metadata['provides'] = ['mpi4py',
                         'mpi4py.dl',
                         'mpi4py.rc',
+                        'mpi4py.aio',
                         'mpi4py.MPI',
                         'mpi4py.MPE',
                         ]
@@ -1127,23 +1127,39 @@ cdef class Comm:
     def send(self, obj=None, int dest=0, int tag=0):
         """Send"""
         cdef MPI_Comm comm = self.ob_mpi
-        return PyMPI_send(obj, dest, tag, comm)
+        cdef _p_stat stat = PyMPI_stats_enter("send", comm)
+        try:
+            return PyMPI_send(obj, dest, tag, comm)
+        finally:
+            PyMPI_stats_exit(stat)
     #
     def bsend(self, obj=None, int dest=0, int tag=0):
         """Send in buffered mode"""
         cdef MPI_Comm comm = self.ob_mpi
-        return PyMPI_bsend(obj, dest, tag, comm)
+        cdef _p_stat stat = PyMPI_stats_enter("bsend", comm)
+        try:
+            return PyMPI_bsend(obj, dest, tag, comm)
+        finally:
+            PyMPI_stats_exit(stat)
     #
     def ssend(self, obj=None, int dest=0, int tag=0):
         """Send in synchronous mode"""
         cdef MPI_Comm comm = self.ob_mpi
-        return PyMPI_ssend(obj, dest, tag, comm)
+        cdef _p_stat stat = PyMPI_stats_enter("ssend", comm)
+        try:
+            return PyMPI_ssend(obj, dest, tag, comm)
+        finally:
+            PyMPI_stats_exit(stat)
     #
     def recv(self, obj=None, int source=0, int tag=0, Status status=None):
         """Receive"""
         cdef MPI_Comm comm = self.ob_mpi
         cdef MPI_Status *statusp = arg_Status(status)
-        return PyMPI_recv(obj, source, tag, comm, statusp)
+        cdef _p_stat stat = PyMPI_stats_enter("recv", comm)
+        try:
+            return PyMPI_recv(obj, source, tag, comm, statusp)
+        finally:
+            PyMPI_stats_exit(stat)
     #
     def sendrecv(self,
                  sendobj=None, int dest=0,   int sendtag=0,
@@ -1152,96 +1168,233 @@ cdef class Comm:
         """Send and Receive"""
         cdef MPI_Comm comm = self.ob_mpi
         cdef MPI_Status *statusp = arg_Status(status)
-        return PyMPI_sendrecv(sendobj, dest,   sendtag,
-                              recvobj, source, recvtag,
-                              comm, statusp)
+        cdef _p_stat stat = PyMPI_stats_enter("sendrecv", comm)
+        try:
+            return PyMPI_sendrecv(sendobj, dest,   sendtag,
+                                  recvobj, source, recvtag,
+                                  comm, statusp)
+        finally:
+            PyMPI_stats_exit(stat)
     #
     def isend(self, obj=None, int dest=0, int tag=0):
         """Nonblocking send"""
         cdef MPI_Comm comm = self.ob_mpi
         cdef Request request = <Request>Request.__new__(Request)
-        request.ob_buf = PyMPI_isend(obj, dest, tag, comm, &request.ob_mpi)
-        return request
+        cdef _p_stat stat = PyMPI_stats_enter("isend", comm)
+        try:
+            request.ob_buf = PyMPI_isend(obj, dest, tag, comm, &request.ob_mpi)
+            return request
+        finally:
+            PyMPI_stats_exit(stat)
     #
     def ibsend(self, obj=None, int dest=0, int tag=0):
         """Nonblocking send in buffered mode"""
         cdef MPI_Comm comm = self.ob_mpi
         cdef Request request = <Request>Request.__new__(Request)
-        request.ob_buf = PyMPI_ibsend(obj, dest, tag, comm, &request.ob_mpi)
-        return request
+        cdef _p_stat stat = PyMPI_stats_enter("ibsend", comm)
+        try:
+            request.ob_buf = PyMPI_ibsend(obj, dest, tag, comm,
+                                          &request.ob_mpi)
+            return request
+        finally:
+            PyMPI_stats_exit(stat)
     #
     def issend(self, obj=None, int dest=0, int tag=0):
         """Nonblocking send in synchronous mode"""
         cdef MPI_Comm comm = self.ob_mpi
         cdef Request request = <Request>Request.__new__(Request)
-        request.ob_buf = PyMPI_issend(obj, dest, tag, comm, &request.ob_mpi)
-        return request
+        cdef _p_stat stat = PyMPI_stats_enter("issend", comm)
+        try:
+            request.ob_buf = PyMPI_issend(obj, dest, tag, comm,
+                                          &request.ob_mpi)
+            return request
+        finally:
+            PyMPI_stats_exit(stat)
     #
     def irecv(self, obj=None, int dest=0, int tag=0):
         cdef MPI_Comm comm = self.ob_mpi
         cdef Request request = <Request>Request.__new__(Request)
-        request.ob_buf = PyMPI_irecv(obj, dest, tag, comm, &request.ob_mpi)
-        return request
+        cdef _p_stat stat = PyMPI_stats_enter("irecv", comm)
+        try:
+            request.ob_buf = PyMPI_irecv(obj, dest, tag, comm, request)
+            return request
+        finally:
+            PyMPI_stats_exit(stat)
+    #
+    def asend(self, obj=None, int dest=0, int tag=0):
+        """Nonblocking send, return an awaitable"""
+        from mpi4py.aio import wait
+        return wait(self.isend(obj, dest, tag))
+    #
+    def arecv(self, obj=None, int source=0, int tag=0):
+        """Nonblocking receive, return an awaitable"""
+        from mpi4py.aio import wait
+        return wait(self.irecv(obj, source, tag))
     #
     def mprobe(self, int source=0, int tag=0, Status status=None):
         cdef MPI_Comm comm = self.ob_mpi
         cdef MPI_Status *statusp = arg_Status(status)
         cdef Message message = <Message>Message.__new__(Message)
-        message.ob_buf = PyMPI_mprobe(source, tag, comm,
-                                      &message.ob_mpi, statusp)
-        return message
+        cdef _p_stat stat = PyMPI_stats_enter("mprobe", comm)
+        try:
+            message.ob_buf = PyMPI_mprobe(source, tag, comm,
+                                          &message.ob_mpi, statusp)
+            return message
+        finally:
+            PyMPI_stats_exit(stat)
     #
     def improbe(self, int source=0, int tag=0, Status status=None):
         cdef int flag = 0
         cdef MPI_Comm comm = self.ob_mpi
         cdef MPI_Status *statusp = arg_Status(status)
         cdef Message message = <Message>Message.__new__(Message)
-        message.ob_buf = PyMPI_improbe(source, tag, comm, &flag,
-                                       &message.ob_mpi, statusp)
-        if flag == 0: return None
-        return message
+        cdef _p_stat stat = PyMPI_stats_enter("improbe", comm)
+        try:
+            message.ob_buf = PyMPI_improbe(source, tag, comm, &flag,
+                                           &message.ob_mpi, statusp)
+            if flag == 0: return None
+            return message
+        finally:
+            PyMPI_stats_exit(stat)
+    #
+    def session(self, int peer, int tag=0):
+        """
+        Create a pickling session with a peer process, objects sent
+        with the given tag do not repeat the classes, functions and
+        attribute names already sent within the session
+        """
+        return _p_session(self, peer, tag)
     #
     def barrier(self):
         "Barrier"
         cdef MPI_Comm comm = self.ob_mpi
-        return PyMPI_barrier(comm)
+        cdef _p_stat stat = PyMPI_stats_enter("barrier", comm)
+        try:
+            return PyMPI_barrier(comm)
+        finally:
+            PyMPI_stats_exit(stat)
     #
     def bcast(self, obj=None, int root=0):
         """Broadcast"""
         cdef MPI_Comm comm = self.ob_mpi
-        return PyMPI_bcast(obj, root, comm)
+        cdef _p_stat stat = PyMPI_stats_enter("bcast", comm)
+        try:
+            return PyMPI_bcast(obj, root, comm)
+        finally:
+            PyMPI_stats_exit(stat)
     #
     def gather(self, sendobj=None, recvobj=None, int root=0):
         """Gather"""
         cdef MPI_Comm comm = self.ob_mpi
-        return PyMPI_gather(sendobj, recvobj, root, comm)
+        cdef _p_stat stat = PyMPI_stats_enter("gather", comm)
+        try:
+            return PyMPI_gather(sendobj, recvobj, root, comm)
+        finally:
+            PyMPI_stats_exit(stat)
     #
     def scatter(self, sendobj=None, recvobj=None, int root=0):
         """Scatter"""
         cdef MPI_Comm comm = self.ob_mpi
-        return PyMPI_scatter(sendobj, recvobj, root, comm)
+        cdef _p_stat stat = PyMPI_stats_enter("scatter", comm)
+        try:
+            return PyMPI_scatter(sendobj, recvobj, root, comm)
+        finally:
+            PyMPI_stats_exit(stat)
     #
     def allgather(self, sendobj=None, recvobj=None):
         """Gather to All"""
         cdef MPI_Comm comm = self.ob_mpi
-        return PyMPI_allgather(sendobj, recvobj, comm)
+        cdef _p_stat stat = PyMPI_stats_enter("allgather", comm)
+        try:
+            return PyMPI_allgather(sendobj, recvobj, comm)
+        finally:
+            PyMPI_stats_exit(stat)
     #
     def alltoall(self, sendobj=None, recvobj=None):
         """All to All Scatter/Gather"""
         cdef MPI_Comm comm = self.ob_mpi
-        return PyMPI_alltoall(sendobj, recvobj, comm)
+        cdef _p_stat stat = PyMPI_stats_enter("alltoall", comm)
+        try:
+            return PyMPI_alltoall(sendobj, recvobj, comm)
+        finally:
+            PyMPI_stats_exit(stat)
+    #
+    def sparse_exchange(self, sendobj=None):
+        """
+        Sparse dynamic data exchange, send objects to the processes
+        in the keys of a mapping and receive a dictionary mapping
+        source processes to received objects
+        """
+        cdef MPI_Comm comm = self.ob_mpi
+        cdef _p_stat stat = PyMPI_stats_enter("sparse_exchange", comm)
+        try:
+            return PyMPI_sparse_exchange(sendobj, comm)
+        finally:
+            PyMPI_stats_exit(stat)
+    #
+    def ibcast(self, obj=None, int root=0):
+        """Nonblocking Broadcast"""
+        cdef MPI_Comm comm = self.ob_mpi
+        cdef Request request = <Request>Request.__new__(Request)
+        cdef _p_stat stat = PyMPI_stats_enter("ibcast", comm)
+        try:
+            PyMPI_ibcast(obj, root, comm, request)
+            return request
+        finally:
+            PyMPI_stats_exit(stat)
+    #
+    def igather(self, sendobj=None, int root=0):
+        """Nonblocking Gather"""
+        cdef MPI_Comm comm = self.ob_mpi
+        cdef Request request = <Request>Request.__new__(Request)
+        cdef _p_stat stat = PyMPI_stats_enter("igather", comm)
+        try:
+            PyMPI_igather(sendobj, root, comm, request)
+            return request
+        finally:
+            PyMPI_stats_exit(stat)
+    #
+    def iallgather(self, sendobj=None):
+        """Nonblocking Gather to All"""
+        cdef MPI_Comm comm = self.ob_mpi
+        cdef Request request = <Request>Request.__new__(Request)
+        cdef _p_stat stat = PyMPI_stats_enter("iallgather", comm)
+        try:
+            PyMPI_iallgather(sendobj, comm, request)
+            return request
+        finally:
+            PyMPI_stats_exit(stat)
+    #
+    def ialltoall(self, sendobj=None):
+        """Nonblocking All to All Scatter/Gather"""
+        cdef MPI_Comm comm = self.ob_mpi
+        cdef Request request = <Request>Request.__new__(Request)
+        cdef _p_stat stat = PyMPI_stats_enter("ialltoall", comm)
+        try:
+            PyMPI_ialltoall(sendobj, comm, request)
+            return request
+        finally:
+            PyMPI_stats_exit(stat)
     #
     def reduce(self, sendobj=None, recvobj=None, op=SUM, int root=0):
         """Reduce"""
         if op is None: op = SUM
         cdef MPI_Comm comm = self.ob_mpi
-        return PyMPI_reduce(sendobj, recvobj, op, root, comm)
+        cdef _p_stat stat = PyMPI_stats_enter("reduce", comm)
+        try:
+            return PyMPI_reduce(sendobj, recvobj, op, root, comm)
+        finally:
+            PyMPI_stats_exit(stat)
     #
     def allreduce(self, sendobj=None, recvobj=None, op=SUM):
         """Reduce to All"""
         if op is None: op = SUM
         cdef MPI_Comm comm = self.ob_mpi
-        return PyMPI_allreduce(sendobj, recvobj, op, comm)
+        cdef _p_stat stat = PyMPI_stats_enter("allreduce", comm)
+        try:
+            return PyMPI_allreduce(sendobj, recvobj, op, comm)
+        finally:
+            PyMPI_stats_exit(stat)
 
 
 cdef class Intracomm(Comm):
@@ -1418,13 +1571,21 @@ cdef class Intracomm(Comm):
         """Inclusive Scan"""
         if op is None: op = SUM
         cdef MPI_Comm comm = self.ob_mpi
-        return PyMPI_scan(sendobj, recvobj, op, comm)
+        cdef _p_stat stat = PyMPI_stats_enter("scan", comm)
+        try:
+            return PyMPI_scan(sendobj, recvobj, op, comm)
+        finally:
+            PyMPI_stats_exit(stat)
     #
     def exscan(self, sendobj=None, recvobj=None, op=SUM):
         """Exclusive Scan"""
         if op is None: op = SUM
         cdef MPI_Comm comm = self.ob_mpi
-        return PyMPI_exscan(sendobj, recvobj, op, comm)
+        cdef _p_stat stat = PyMPI_stats_enter("exscan", comm)
+        try:
+            return PyMPI_exscan(sendobj, recvobj, op, comm)
+        finally:
+            PyMPI_stats_exit(stat)
 
 
     # Establishing Communication
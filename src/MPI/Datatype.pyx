@@ -325,6 +325,17 @@ cdef class Datatype:
         CHKERR( MPI_Type_match_size(typeclass, size, &datatype.ob_mpi) )
         return datatype
 
+    @classmethod
+    def from_numpy_dtype(cls, dtype):
+        """
+        Create a datatype matching a NumPy data type, including
+        structured data types with their field offsets and padding
+        """
+        cdef Datatype cached = PyMPI_dtype_type(PyMPI_as_dtype(dtype))
+        cdef Datatype datatype = <Datatype>cls()
+        CHKERR( MPI_Type_dup(cached.ob_mpi, &datatype.ob_mpi) )
+        return datatype
+
     # Use of Derived Datatypes
     # ------------------------
 
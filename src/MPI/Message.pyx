@@ -124,7 +124,11 @@ cdef class Message:
         cdef MPI_Message message = self.ob_mpi
         cdef object rmsg = self.ob_buf # if obj is None else obj
         cdef MPI_Status *statusp = arg_Status(status)
-        rmsg = PyMPI_mrecv(rmsg, &message, statusp)
+        cdef _p_stat stat = PyMPI_stats_enter("mrecv", MPI_COMM_NULL)
+        try:
+            rmsg = PyMPI_mrecv(rmsg, &message, statusp)
+        finally:
+            PyMPI_stats_exit(stat)
         if self is not __MESSAGE_NO_PROC__: self.ob_mpi = message
         if self.ob_mpi == MPI_MESSAGE_NULL: self.ob_buf = None
         return rmsg
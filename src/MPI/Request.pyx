@@ -25,6 +25,10 @@ cdef class Request:
     def __bool__(self):
         return self.ob_mpi != MPI_REQUEST_NULL
 
+    def __await__(self):
+        from mpi4py.aio import wait
+        return wait(self).__await__()
+
     # Completion Operations
     # ---------------------
 
@@ -226,7 +230,12 @@ cdef class Request:
         """
         Wait for a send or receive to complete
         """
-        cdef msg = PyMPI_wait(self, status)
+        cdef msg = None
+        cdef _p_stat stat = PyMPI_stats_enter("wait", MPI_COMM_NULL)
+        try:
+            msg = PyMPI_wait(self, status)
+        finally:
+            PyMPI_stats_exit(stat)
         return msg
     #
     def test(self, Status status=None):
@@ -234,7 +243,12 @@ cdef class Request:
         Test for the completion of a send or receive
         """
         cdef int flag = 0
-        cdef msg = PyMPI_test(self, &flag, status)
+        cdef msg = None
+        cdef _p_stat stat = PyMPI_stats_enter("test", MPI_COMM_NULL)
+        try:
+            msg = PyMPI_test(self, &flag, status)
+        finally:
+            PyMPI_stats_exit(stat)
         return (<bint>flag, msg)
     #
     @classmethod
@@ -243,7 +257,12 @@ cdef class Request:
         Wait for any previously initiated request to complete
         """
         cdef int index = MPI_UNDEFINED
-        cdef msg = PyMPI_waitany(requests, &index, status)
+        cdef msg = None
+        cdef _p_stat stat = PyMPI_stats_enter("waitany", MPI_COMM_NULL)
+        try:
+            msg = PyMPI_waitany(requests, &index, status)
+        finally:
+            PyMPI_stats_exit(stat)
         return (index, msg)
     #
     @classmethod
@@ -253,7 +272,12 @@ cdef class Request:
         """
         cdef int index = MPI_UNDEFINED
         cdef int flag  = 0
-        cdef msg = PyMPI_testany(requests, &index, &flag, status)
+        cdef msg = None
+        cdef _p_stat stat = PyMPI_stats_enter("testany", MPI_COMM_NULL)
+        try:
+            msg = PyMPI_testany(requests, &index, &flag, status)
+        finally:
+            PyMPI_stats_exit(stat)
         return (index, <bint>flag, msg)
     #
     @classmethod
@@ -261,7 +285,12 @@ cdef class Request:
         """
         Wait for all previously initiated requests to complete
         """
-        cdef msg = PyMPI_waitall(requests, statuses)
+        cdef msg = None
+        cdef _p_stat stat = PyMPI_stats_enter("waitall", MPI_COMM_NULL)
+        try:
+            msg = PyMPI_waitall(requests, statuses)
+        finally:
+            PyMPI_stats_exit(stat)
         return msg
     #
     @classmethod
@@ -270,8 +299,35 @@ cdef class Request:
         Test for completion of all previously initiated requests
         """
         cdef int flag = 0
-        cdef msg = PyMPI_testall(requests, &flag, statuses)
+        cdef msg = None
+        cdef _p_stat stat = PyMPI_stats_enter("testall", MPI_COMM_NULL)
+        try:
+            msg = PyMPI_testall(requests, &flag, statuses)
+        finally:
+            PyMPI_stats_exit(stat)
         return (<bint>flag, msg)
+    #
+    @classmethod
+    def waitsome(cls, requests, statuses=None):
+        """
+        Wait for some previously initiated requests to complete
+        """
+        cdef _p_stat stat = PyMPI_stats_enter("waitsome", MPI_COMM_NULL)
+        try:
+            return PyMPI_waitsome(requests, statuses)
+        finally:
+            PyMPI_stats_exit(stat)
+    #
+    @classmethod
+    def testsome(cls, requests, statuses=None):
+        """
+        Test for completion of some previously initiated requests
+        """
+        cdef _p_stat stat = PyMPI_stats_enter("testsome", MPI_COMM_NULL)
+        try:
+            return PyMPI_testsome(requests, statuses)
+        finally:
+            PyMPI_stats_exit(stat)
 
 
 cdef class Prequest(Request):
@@ -347,6 +403,286 @@ cdef class Grequest(Request):
 
 
 
+
+cdef class RequestSet:
+
+    """
+    Request set
+
+    Requests are kept in a contiguous array of MPI handles, thus
+    completion operations do not copy handles in and out of request
+    objects; only requests that complete are updated. Requests in a
+    set should be completed through the set.
+    """
+
+    cdef MPI_Request *ob_mpi
+    cdef MPI_Status  *ob_sts
+    cdef int count, size
+    cdef int npending
+    cdef list requests
+    cdef bint statuses
+
+    def __cinit__(self, requests=None, bint statuses=False):
+        self.ob_mpi = NULL
+        self.ob_sts = NULL
+        self.count = self.size = 0
+        self.npending = 0
+        self.requests = []
+        self.statuses = statuses
+        if requests is not None:
+            for request in requests:
+                self.add(request)
+
+    def __dealloc__(self):
+        PyMem_Free(self.ob_mpi)
+        PyMem_Free(self.ob_sts)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, Py_ssize_t index):
+        cdef int i = self.check(index)
+        self.progress(-1)
+        return self.sync(i)
+
+    cdef int check(self, Py_ssize_t index) except -1:
+        if index < 0: index += self.count
+        if index < 0 or index >= self.count:
+            raise IndexError("request index out of range")
+        return <int>index
+
+    cdef int reserve(self, int size) except -1:
+        if size <= self.size: return 0
+        if size < 2 * self.size: size = 2 * self.size
+        cdef void *p = PyMem_Realloc(self.ob_mpi,
+                                     <size_t>size * sizeof(MPI_Request))
+        if p == NULL: raise MemoryError
+        self.ob_mpi = <MPI_Request*>p
+        if self.statuses:
+            p = PyMem_Realloc(self.ob_sts,
+                              <size_t>size * sizeof(MPI_Status))
+            if p == NULL: raise MemoryError
+            self.ob_sts = <MPI_Status*>p
+        self.size = size
+        return 0
+
+    cdef Request sync(self, int index):
+        cdef Request request = <Request>self.requests[index]
+        request.ob_mpi = self.ob_mpi[index]
+        if request.ob_mpi == MPI_REQUEST_NULL:
+            request.ob_buf = None
+        return request
+
+    cdef int sync_all(self) except -1:
+        cdef int i = 0
+        for i from 0 <= i < self.count:
+            self.sync(i)
+        return 0
+
+    cdef object sync_some(self, int outcount,
+                          object indices, int iindices[],
+                          MPI_Status istatuses[]):
+        cdef int i = 0
+        if outcount == MPI_UNDEFINED:
+            return None
+        for i from 0 <= i < outcount:
+            self.sync(iindices[i])
+            if self.statuses:
+                self.ob_sts[iindices[i]] = istatuses[i]
+        del indices[outcount:]
+        return indices
+
+    cdef int progress(self, int block) except -1:
+        # pending object receives and collectives replace or complete
+        # their handles as they progress, also when driven by other
+        # calls; while the set has any, the handles in the array are
+        # refreshed from the request objects (block < 0: refresh only)
+        if self.npending == 0: return 0
+        cdef int i = 0, pending = 0, npending = 0
+        cdef Request request = None
+        for i from 0 <= i < self.count:
+            request = <Request>self.requests[i]
+            if block >= 0 and PyMPI_pending(request.ob_buf):
+                if not PyMPI_progress(request, block): pending = 1
+            self.ob_mpi[i] = request.ob_mpi
+            if PyMPI_pending(request.ob_buf): npending += 1
+        self.npending = npending
+        return pending
+
+    def add(self, Request request not None):
+        """
+        Add a request to the set, return its index
+        """
+        self.reserve(self.count + 1)
+        self.ob_mpi[self.count] = request.ob_mpi
+        if self.statuses:
+            self.ob_sts[self.count] = empty_status
+        self.requests.append(request)
+        self.count += 1
+        if PyMPI_pending(request.ob_buf):
+            self.npending += 1
+        return self.count - 1
+
+    def remove(self, Py_ssize_t index):
+        """
+        Remove a request from the set and return it,
+        following requests are shifted down by one
+        """
+        cdef int i = self.check(index), j = 0
+        self.progress(-1)
+        cdef Request request = self.sync(i)
+        for j from i < j < self.count:
+            self.ob_mpi[j-1] = self.ob_mpi[j]
+            if self.statuses:
+                self.ob_sts[j-1] = self.ob_sts[j]
+        del self.requests[i]
+        self.count -= 1
+        return request
+
+    def get_status(self, Py_ssize_t index):
+        """
+        Status of a request as set by the last completion
+        operation (null requests get an empty status)
+        """
+        cdef int i = self.check(index)
+        if not self.statuses: raise ValueError(
+            "request set created without statuses")
+        cdef Status status = <Status>Status.__new__(Status)
+        status.ob_mpi = self.ob_sts[i]
+        return status
+
+    # Completion Operations
+    # ---------------------
+
+    def Waitall(self):
+        """
+        Wait for all requests to complete
+        """
+        cdef int count = self.count
+        cdef MPI_Request *irequests = self.ob_mpi
+        cdef MPI_Status *istatuses = MPI_STATUSES_IGNORE
+        if self.statuses: istatuses = self.ob_sts
+        self.progress(1)
+        try:
+            with nogil: CHKERR( MPI_Waitall(
+                count, irequests, istatuses) )
+        finally:
+            self.sync_all()
+        return None
+
+    def Testall(self):
+        """
+        Test for completion of all requests
+        """
+        cdef int count = self.count
+        cdef MPI_Request *irequests = self.ob_mpi
+        cdef int flag = 0
+        cdef MPI_Status *istatuses = MPI_STATUSES_IGNORE
+        if self.statuses: istatuses = self.ob_sts
+        self.progress(0)
+        try:
+            with nogil: CHKERR( MPI_Testall(
+                count, irequests, &flag, istatuses) )
+        finally:
+            if flag: self.sync_all()
+        return <bint>flag
+
+    def Waitany(self):
+        """
+        Wait for any request to complete,
+        return its index (or ``UNDEFINED``)
+        """
+        cdef int count = self.count
+        cdef MPI_Request *irequests = self.ob_mpi
+        cdef int index = MPI_UNDEFINED
+        cdef bint flag = 0
+        cdef double delay = 0
+        cdef MPI_Status status = empty_status
+        while self.progress(0):
+            flag, index = self.Testany()
+            if flag: return index
+            delay = PyMPI_idle(delay)
+        with nogil: CHKERR( MPI_Waitany(
+            count, irequests, &index, &status) )
+        if index != MPI_UNDEFINED:
+            self.sync(index)
+            if self.statuses: self.ob_sts[index] = status
+        return index
+
+    def Testany(self):
+        """
+        Test for completion of any request,
+        return a flag and an index (or ``UNDEFINED``)
+        """
+        cdef int count = self.count
+        cdef MPI_Request *irequests = self.ob_mpi
+        cdef int index = MPI_UNDEFINED
+        cdef int flag = 0
+        cdef MPI_Status status = empty_status
+        self.progress(0)
+        with nogil: CHKERR( MPI_Testany(
+            count, irequests, &index, &flag, &status) )
+        if index != MPI_UNDEFINED:
+            self.sync(index)
+            if self.statuses: self.ob_sts[index] = status
+        return (<bint>flag, index)
+
+    def Waitsome(self):
+        """
+        Wait for some requests to complete, return an integer
+        array of their indices (or ``None`` if none is active)
+        """
+        cdef object done = None
+        cdef double delay = 0
+        while self.progress(0):
+            done = self.Testsome()
+            if done is None or len(done) > 0: return done
+            delay = PyMPI_idle(delay)
+        cdef int incount = self.count
+        cdef MPI_Request *irequests = self.ob_mpi
+        cdef int outcount = MPI_UNDEFINED, *iindices = NULL
+        cdef MPI_Status *istatuses = MPI_STATUSES_IGNORE
+        cdef object indices = newarray_int(incount, &iindices)
+        cdef object tmp = None
+        if self.statuses:
+            tmp = allocate(incount, sizeof(MPI_Status),
+                           <void**>&istatuses)
+        with nogil: CHKERR( MPI_Waitsome(
+            incount, irequests, &outcount, iindices, istatuses) )
+        return self.sync_some(outcount, indices, iindices, istatuses)
+
+    def Testsome(self):
+        """
+        Test for completion of some requests, return an integer
+        array of their indices (or ``None`` if none is active)
+        """
+        cdef int incount = self.count
+        cdef MPI_Request *irequests = self.ob_mpi
+        cdef int outcount = MPI_UNDEFINED, *iindices = NULL
+        cdef MPI_Status *istatuses = MPI_STATUSES_IGNORE
+        cdef object indices = newarray_int(incount, &iindices)
+        cdef object tmp = None
+        if self.statuses:
+            tmp = allocate(incount, sizeof(MPI_Status),
+                           <void**>&istatuses)
+        self.progress(0)
+        with nogil: CHKERR( MPI_Testsome(
+            incount, irequests, &outcount, iindices, istatuses) )
+        return self.sync_some(outcount, indices, iindices, istatuses)
+
+    # Persistent Requests
+    # -------------------
+
+    def Startall(self):
+        """
+        Start all (persistent) requests
+        """
+        cdef int count = self.count
+        cdef MPI_Request *irequests = self.ob_mpi
+        with nogil: CHKERR( MPI_Startall(count, irequests) )
+
+
+
 cdef Request __REQUEST_NULL__ = new_Request(MPI_REQUEST_NULL)
 
 
@@ -133,3 +133,125 @@ cdef class Status:
             return self.Is_cancelled()
         def __set__(self, value):
             self.Set_cancelled(value)
+
+
+
+cdef class StatusArray:
+
+    """
+    Status array
+
+    Statuses are kept in a contiguous array, their fields are
+    returned as integer arrays supporting the buffer interface
+    """
+
+    cdef MPI_Status *ob_mpi
+    cdef Py_ssize_t count
+
+    def __cinit__(self, Py_ssize_t n=0):
+        self.ob_mpi = NULL
+        self.count = 0
+        self.resize(n)
+
+    def __dealloc__(self):
+        PyMem_Free(self.ob_mpi)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, Py_ssize_t index):
+        if index < 0: index += self.count
+        if index < 0 or index >= self.count:
+            raise IndexError("status index out of range")
+        cdef Status status = <Status>Status.__new__(Status)
+        copy_Status(&self.ob_mpi[index], &status.ob_mpi)
+        return status
+
+    cdef int resize(self, Py_ssize_t n) except -1:
+        cdef Py_ssize_t i = 0
+        if n <= self.count: return 0
+        cdef void *p = PyMem_Realloc(self.ob_mpi,
+                                     <size_t>n * sizeof(MPI_Status))
+        if p == NULL: raise MemoryError
+        self.ob_mpi = <MPI_Status*>p
+        for i from self.count <= i < n:
+            self.ob_mpi[i] = empty_status
+        self.count = n
+        return 0
+
+    def Get_source(self):
+        """
+        Get message sources
+        """
+        cdef Py_ssize_t i = 0
+        cdef int *array = NULL
+        cdef object result = newarray_int(self.count, &array)
+        for i from 0 <= i < self.count:
+            array[i] = self.ob_mpi[i].MPI_SOURCE
+        return result
+
+    property sources:
+        """message sources"""
+        def __get__(self):
+            return self.Get_source()
+
+    def Get_tag(self):
+        """
+        Get message tags
+        """
+        cdef Py_ssize_t i = 0
+        cdef int *array = NULL
+        cdef object result = newarray_int(self.count, &array)
+        for i from 0 <= i < self.count:
+            array[i] = self.ob_mpi[i].MPI_TAG
+        return result
+
+    property tags:
+        """message tags"""
+        def __get__(self):
+            return self.Get_tag()
+
+    def Get_error(self):
+        """
+        Get message error codes
+        """
+        cdef Py_ssize_t i = 0
+        cdef int *array = NULL
+        cdef object result = newarray_int(self.count, &array)
+        for i from 0 <= i < self.count:
+            array[i] = self.ob_mpi[i].MPI_ERROR
+        return result
+
+    property errors:
+        """message error codes"""
+        def __get__(self):
+            return self.Get_error()
+
+    def Get_count(self, Datatype datatype not None=BYTE):
+        """
+        Get the numbers of *top level* elements
+        """
+        cdef Py_ssize_t i = 0
+        cdef int *array = NULL
+        cdef object result = newarray_int(self.count, &array)
+        for i from 0 <= i < self.count:
+            CHKERR( MPI_Get_count(&self.ob_mpi[i],
+                                  datatype.ob_mpi, &array[i]) )
+        return result
+
+    property counts:
+        """byte counts"""
+        def __get__(self):
+            return self.Get_count(__BYTE__)
+
+    def Get_elements(self, Datatype datatype not None):
+        """
+        Get the numbers of basic elements in a datatype
+        """
+        cdef Py_ssize_t i = 0
+        cdef int *array = NULL
+        cdef object result = newarray_int(self.count, &array)
+        for i from 0 <= i < self.count:
+            CHKERR( MPI_Get_elements(&self.ob_mpi[i],
+                                     datatype.ob_mpi, &array[i]) )
+        return result
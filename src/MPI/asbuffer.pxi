@@ -9,9 +9,9 @@ cdef extern from "Python.h":
         Py_ssize_t itemsize
         bint readonly
         char *format
-        #int ndim
-        #Py_ssize_t *shape
-        #Py_ssize_t *strides
+        int ndim
+        Py_ssize_t *shape
+        Py_ssize_t *strides
         #Py_ssize_t *suboffsets
     cdef enum:
         PyBUF_SIMPLE
@@ -23,6 +23,7 @@ cdef extern from "Python.h":
     int  PyObject_CheckBuffer(object)
     int  PyObject_GetBuffer(object, Py_buffer *, int) except -1
     void PyBuffer_Release(Py_buffer *)
+    int  PyBuffer_IsContiguous(Py_buffer *, char)
     int  PyBuffer_FillInfo(Py_buffer *, object,
                            void *, Py_ssize_t,
                            bint, int) except -1
@@ -157,6 +158,17 @@ cdef inline _p_buffer getbuffer(object ob, bint readonly, bint format):
     PyObject_GetBufferEx(ob, &buf.view, flags)
     return buf
 
+cdef inline _p_buffer getbuffer_strided(object ob, bint readonly,
+                                        bint format):
+    cdef _p_buffer buf = newbuffer()
+    cdef int flags = PyBUF_STRIDES
+    if not readonly:
+        flags |= PyBUF_WRITABLE
+    if format:
+        flags |= PyBUF_FORMAT
+    PyObject_GetBufferEx(ob, &buf.view, flags)
+    return buf
+
 cdef inline object getformat(_p_buffer buf):
     cdef Py_buffer *view = &buf.view
     #
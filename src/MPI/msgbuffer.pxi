@@ -23,6 +23,200 @@ cdef class _p_message:
     cdef object count
     cdef object displ
     cdef Datatype type
+    cdef bint free_type
+
+    def __dealloc__(self):
+        if not self.free_type: return
+        if not mpi_active(): return
+        MPI_Type_free(&self.type.ob_mpi)
+
+# Non-contiguous buffers (e.g., strided NumPy arrays) are described
+# with a datatype built from their shape and strides, thus MPI reads
+# and writes the original memory; these datatypes are cached per
+# layout, keeping the most recently used ones, and dropped along with
+# their base datatype when it is evicted from the NumPy data type cache
+
+cdef enum:
+    PyMPI_STRIDED_CACHE = 256
+
+cdef object PyMPI_strided_cache = None
+
+cdef MPI_Datatype PyMPI_strided_type(MPI_Datatype base,
+                                     Py_buffer *view) except *:
+    cdef MPI_Datatype dtype = base, tmp = MPI_DATATYPE_NULL
+    cdef int i = 0, d = view.ndim - 1
+    cdef int blen = 1
+    for i from 0 <= i < view.ndim:
+        if view.shape[i] > INT_MAX: raise ValueError(
+            "message: buffer dimension %d too large" % view.shape[i])
+    if d >= 0 and view.strides[d] == view.itemsize:
+        blen = <int>view.shape[d]
+        d -= 1
+    if d < 0:
+        CHKERR( MPI_Type_contiguous(blen, base, &dtype) )
+    while d >= 0:
+        CHKERR( MPI_Type_create_hvector(<int>view.shape[d], blen,
+                                        <MPI_Aint>view.strides[d],
+                                        dtype, &tmp) )
+        if dtype != base: CHKERR( MPI_Type_free(&dtype) )
+        dtype, tmp = tmp, MPI_DATATYPE_NULL
+        blen = 1
+        d -= 1
+    CHKERR( MPI_Type_commit(&dtype) )
+    return dtype
+
+cdef int PyMPI_strided_purge(MPI_Datatype base) except -1:
+    if PyMPI_strided_cache is None: return 0
+    cdef object handle = MPI_Type_c2f(base)
+    for key in [key for key in PyMPI_strided_cache if key[0] == handle]:
+        del PyMPI_strided_cache[key]
+    return 0
+
+cdef int message_strided(_p_message m, MPI_Datatype *btype,
+                         bint cacheable) except -1:
+    cdef Py_buffer *view = &m.buf.view
+    cdef Datatype base = m.type
+    cdef bint free_base = m.free_type
+    cdef MPI_Aint lb = 0, extent = 0
+    CHKERR( MPI_Type_get_extent(base.ob_mpi, &lb, &extent) )
+    if extent != view.itemsize: raise ValueError(
+        "message: datatype extent %d does not match "
+        "buffer item size %d" % (extent, view.itemsize))
+    # only predefined or internally cached datatypes are long-lived,
+    # user datatypes may be freed and their handles reused
+    cacheable = cacheable and not free_base
+    global PyMPI_strided_cache
+    if cacheable and PyMPI_strided_cache is None:
+        from collections import OrderedDict
+        PyMPI_strided_cache = OrderedDict()
+    cdef object key = None
+    cdef Datatype datatype = None
+    if cacheable:
+        key = (MPI_Type_c2f(base.ob_mpi),
+               tuple([view.shape[i] for i in range(view.ndim)]),
+               tuple([view.strides[i] for i in range(view.ndim)]))
+        datatype = PyMPI_strided_cache.pop(key, None)
+    if datatype is None:
+        datatype = <Datatype>Datatype.__new__(Datatype)
+        datatype.ob_mpi = PyMPI_strided_type(base.ob_mpi, view)
+        if cacheable:
+            datatype.flags |= PyMPI_OWNED
+            if len(PyMPI_strided_cache) >= PyMPI_STRIDED_CACHE:
+                PyMPI_strided_cache.popitem(last=False)
+    if cacheable:
+        PyMPI_strided_cache[key] = datatype
+    m.free_type = not cacheable
+    m.type = datatype
+    if free_base: MPI_Type_free(&base.ob_mpi)
+    btype[0] = datatype.ob_mpi
+    return 0
+
+# Counts beyond INT_MAX are described with a derived datatype covering
+# the whole message, built from chunks of INT_MAX entries plus a
+# remainder; these datatypes are owned by the message
+
+cdef MPI_Datatype PyMPI_large_type(MPI_Datatype base,
+                                   MPI_Aint count) except *:
+    cdef MPI_Aint q = count // INT_MAX, r = count % INT_MAX
+    cdef MPI_Aint lb = 0, extent = 0
+    cdef MPI_Datatype chunk = MPI_DATATYPE_NULL
+    cdef MPI_Datatype dtype = MPI_DATATYPE_NULL
+    cdef MPI_Datatype tmp = MPI_DATATYPE_NULL
+    cdef int blocklengths[2]
+    cdef MPI_Aint displacements[2]
+    cdef MPI_Datatype types[2]
+    if q > INT_MAX: raise OverflowError(
+        "message: count %d too large" % count)
+    CHKERR( MPI_Type_get_extent(base, &lb, &extent) )
+    if q == 0:
+        CHKERR( MPI_Type_contiguous(<int>r, base, &dtype) )
+    else:
+        CHKERR( MPI_Type_contiguous(INT_MAX, base, &chunk) )
+        try: CHKERR( MPI_Type_contiguous(<int>q, chunk, &dtype) )
+        finally: MPI_Type_free(&chunk)
+        if r > 0:
+            blocklengths[0], blocklengths[1] = 1, <int>r
+            displacements[0], displacements[1] = 0, q * INT_MAX * extent
+            types[0], types[1] = dtype, base
+            try: CHKERR( MPI_Type_create_struct(2, blocklengths,
+                                                displacements,
+                                                types, &tmp) )
+            finally: MPI_Type_free(&dtype)
+            dtype, tmp = tmp, MPI_DATATYPE_NULL
+        try: CHKERR( MPI_Type_create_resized(dtype, lb,
+                                             count * extent, &tmp) )
+        finally: MPI_Type_free(&dtype)
+        dtype, tmp = tmp, MPI_DATATYPE_NULL
+    CHKERR( MPI_Type_commit(&dtype) )
+    return dtype
+
+cdef int message_large(_p_message m, MPI_Aint count,
+                       MPI_Datatype *btype) except -1:
+    cdef Datatype base = m.type
+    cdef bint free_base = m.free_type
+    cdef Datatype datatype = <Datatype>Datatype.__new__(Datatype)
+    datatype.ob_mpi = PyMPI_large_type(btype[0], count)
+    m.type = datatype
+    m.free_type = 1
+    if free_base: MPI_Type_free(&base.ob_mpi)
+    btype[0] = datatype.ob_mpi
+    return 0
+
+cdef object message_vector_large(_p_message m,
+                                 object o_counts,
+                                 object o_displs,
+                                 MPI_Aint asize,
+                                 int blocks,
+                                 #
+                                 int          **counts,
+                                 int          **displs,
+                                 MPI_Datatype *btype,
+                                 ):
+    cdef int i = 0
+    cdef object unit = 0, value = 0
+    if o_counts is None:
+        o_counts = [(asize // blocks) + (asize % blocks > i)
+                    for i from 0 <= i < blocks]
+    elif is_int(o_counts):
+        o_counts = [o_counts] * blocks
+    else:
+        o_counts = list(o_counts)
+    if o_displs is None: # contiguous
+        o_displs, value = [], 0
+        for i from 0 <= i < blocks:
+            o_displs.append(value)
+            value += o_counts[i]
+    elif is_int(o_displs): # strided
+        o_displs = [o_displs * i for i from 0 <= i < blocks]
+    else: # general
+        o_displs = list(o_displs)
+    # the common unit of counts and displacements
+    for value in o_counts + o_displs:
+        value = abs(value)
+        while value: unit, value = value, unit % value
+    if unit == 0: unit = 1
+    if max([abs(value) for value in o_counts + o_displs]) // unit > INT_MAX:
+        raise OverflowError("message: counts or displacements too large")
+    if unit > 1: message_large(m, unit, btype)
+    o_counts = asarray_int([value // unit for value in o_counts],
+                           blocks, counts)
+    o_displs = asarray_int([value // unit for value in o_displs],
+                           blocks, displs)
+    return (o_counts, o_displs)
+
+cdef Datatype message_dtype(_p_message m):
+    cdef object ob = <object>m.buf.view.obj
+    cdef object dtype = None
+    try: # numpy.ndarray
+        dtype = ob.dtype
+    except AttributeError:
+        from numpy import asarray
+        dtype = asarray(ob).dtype
+    if dtype.itemsize != m.buf.view.itemsize: raise ValueError(
+        "message: dtype item size %d does not match "
+        "buffer item size %d" % (dtype.itemsize, m.buf.view.itemsize))
+    m.free_type = 0
+    return PyMPI_dtype_type(dtype)
 
 cdef _p_message message_basic(object o_buf,
                               object o_type,
@@ -31,10 +225,12 @@ cdef _p_message message_basic(object o_buf,
                               void        **baddr,
                               MPI_Aint     *bsize,
                               MPI_Datatype *btype,
+                              bint strided=0,
                               ):
     global TypeDict
     cdef _p_message m = <_p_message>_p_message.__new__(_p_message)
     cdef int f = (o_type is None)
+    cdef bint cacheable = 1
     # special-case for BOTTOM or None,
     # an explicit MPI datatype is required
     if o_buf is __BOTTOM__ or o_buf is None:
@@ -49,17 +245,34 @@ cdef _p_message message_basic(object o_buf,
         return m
     #elif obuf
     # get buffer base address and length
-    m.buf = getbuffer(o_buf, readonly, f)
+    if strided:
+        # most buffers are contiguous, so ask for a strided view only
+        # when a contiguous one is refused
+        try:
+            m.buf = getbuffer(o_buf, readonly, f)
+        except (BufferError, ValueError):
+            m.buf = getbuffer_strided(o_buf, readonly, f)
+    else:
+        m.buf = getbuffer(o_buf, readonly, f)
     baddr[0] = <void*>    m.buf.view.buf
     bsize[0] = <MPI_Aint> m.buf.view.len
     # lookup datatype if not provided or not a Datatype
     if isinstance(o_type, Datatype):
         m.type = <Datatype>o_type
     elif o_type is None:
-        m.type = TypeDict[getformat(m.buf)]
+        format = getformat(m.buf)
+        if (m.buf.view.obj != NULL and format is not None and
+            (format == 'V' or format[:2] == 'T{')):
+            m.type = message_dtype(m)
+        else:
+            m.type = TypeDict[format]
     else:
         m.type = TypeDict[o_type]
     btype[0] = m.type.ob_mpi
+    if not f and not named_Datatype(btype[0]): cacheable = 0
+    # describe non-contiguous buffers with a derived datatype
+    if strided and not PyBuffer_IsContiguous(&m.buf.view, c'A'):
+        message_strided(m, btype, cacheable)
     # and we are done ...
     return m
 
@@ -71,6 +284,7 @@ cdef _p_message message_simple(object msg,
                                void         **_addr,
                                int          *_count,
                                MPI_Datatype *_type,
+                               bint strided=0,
                                ):
     # special-case PROC_NULL target rank
     if rank == MPI_PROC_NULL:
@@ -78,6 +292,10 @@ cdef _p_message message_simple(object msg,
         _count[0] = 0
         _type[0]  = MPI_BYTE
         return None
+    # precompiled buffer specification
+    if type(msg) is BufferSpec:
+        return message_spec(<BufferSpec>msg, readonly, blocks, strided,
+                            _addr, _count, _type)
     # unpack message list/tuple
     cdef Py_ssize_t nargs = 0
     cdef object o_buf   = None
@@ -111,21 +329,26 @@ cdef _p_message message_simple(object msg,
     cdef void *baddr = NULL
     cdef MPI_Aint bsize = 0
     cdef MPI_Datatype btype = MPI_DATATYPE_NULL
+    strided = (strided and not PYPY and
+               o_count is None and o_displ is None)
     cdef _p_message m = message_basic(o_buf, o_type, readonly,
-                                      &baddr, &bsize, &btype)
+                                      &baddr, &bsize, &btype,
+                                      strided)
+    if strided and not PyBuffer_IsContiguous(&m.buf.view, c'A'):
+        o_count = 1 # a single item of the derived datatype
     # buffer: count and displacement
-    cdef int count = 0 # number of datatype entries
-    cdef int displ = 0 # from base buffer, in datatype entries
+    cdef MPI_Aint count = 0 # number of datatype entries
+    cdef MPI_Aint displ = 0 # from base buffer, in datatype entries
     cdef MPI_Aint offset = 0 # from base buffer, in bytes
     cdef MPI_Aint extent = 0, lb = 0
     if o_displ is not None:
         if o_count is None: raise ValueError(
             "message: cannot handle displacement, "
             "explicit count required")
-        count = <int> o_count
+        count = <MPI_Aint> o_count
         if count < 0: raise ValueError(
             "message: negative count %d" % count)
-        displ = <int> o_displ
+        displ = <MPI_Aint> o_displ
         if displ < 0: raise ValueError(
             "message: negative diplacement %d" % displ)
         if displ != 0:
@@ -135,7 +358,7 @@ cdef _p_message message_simple(object msg,
             CHKERR( MPI_Type_get_extent(btype, &lb, &extent) )
             offset = displ*extent # XXX overflow?
     elif o_count is not None:
-        count = <int> o_count
+        count = <MPI_Aint> o_count
         if count < 0:
             raise ValueError(
                 "message: negative count %d" % count)
@@ -159,11 +382,13 @@ cdef _p_message message_simple(object msg,
              "number of datatype items %d is not a multiple of"
              "the required number of blocks %d"
              ) %  (bsize//extent, blocks))
-        count = <int> ((bsize // extent) // blocks) # XXX overflow?
-    if o_count is None: o_count = count
-    if o_displ is None: o_displ = displ
-    m.count = o_count
+        count = (bsize // extent) // blocks
+    m.count = o_count # None if guessed from the buffer
     m.displ = o_displ
+    # counts beyond INT_MAX: a single item of a derived datatype
+    if count > INT_MAX:
+        message_large(m, count, &btype)
+        count = 1
     # sanity-check zero-sized messages
     if o_buf is None:
         if count != 0:
@@ -174,10 +399,89 @@ cdef _p_message message_simple(object msg,
                 "message: buffer is None but displacement is %d" % displ)
     # return collected message data
     _addr[0]  = <void*>(<char*>baddr + offset)
-    _count[0] = count
+    _count[0] = <int> count
     _type[0]  = btype
     return m
 
+# Buffer specifications are usually parsed (and buffers acquired) on
+# each call; a BufferSpec resolves address, count, and datatype once,
+# and can then be passed in place of the buffer specification
+
+cdef class BufferSpec:
+
+    """
+    Precompiled buffer specification
+    """
+
+    cdef _p_message msg
+    cdef void *addr
+    cdef int count
+    cdef MPI_Datatype dtype
+    cdef bint guess
+    cdef bint strided
+    cdef bint readonly
+
+    def __cinit__(self, msg):
+        self.msg = None
+        self.addr = NULL
+        self.count = 0
+        self.dtype = MPI_DATATYPE_NULL
+        self.readonly = 0
+        cdef bint strided = not PYPY
+        try:
+            self.msg = message_simple(msg, 0, 0, 1,
+                                      &self.addr, &self.count,
+                                      &self.dtype, strided)
+        except (BufferError, TypeError):
+            self.readonly = 1
+            self.msg = message_simple(msg, 1, 0, 1,
+                                      &self.addr, &self.count,
+                                      &self.dtype, strided)
+        self.guess = self.msg.count is None
+        self.strided = (strided and self.msg.buf.view.obj != NULL and
+                        not PyBuffer_IsContiguous(&self.msg.buf.view, c'A'))
+
+    property count:
+        """number of datatype entries"""
+        def __get__(self):
+            return self.count
+
+    property datatype:
+        """datatype of the entries"""
+        def __get__(self):
+            return self.msg.type
+
+    property readonly:
+        """whether the buffer is read-only"""
+        def __get__(self):
+            return self.readonly
+
+cdef _p_message message_spec(BufferSpec spec,
+                             bint readonly,
+                             int blocks,
+                             bint strided,
+                             #
+                             void         **_addr,
+                             int          *_count,
+                             MPI_Datatype *_type,
+                             ):
+    if spec.readonly and not readonly: raise ValueError(
+        "message: buffer is read-only")
+    if spec.strided and not strided: raise ValueError(
+        "message: buffer is not contiguous")
+    cdef int count = spec.count
+    if spec.guess and blocks > 1:
+        if (count % blocks) != 0: raise ValueError(
+            ("message: cannot guess count, "
+             "number of datatype items %d is not a multiple of"
+             "the required number of blocks %d"
+             ) %  (count, blocks))
+        count = count // blocks
+    _addr[0]  = spec.addr
+    _count[0] = count
+    _type[0]  = spec.dtype
+    return spec.msg
+
 cdef _p_message message_vector(object msg,
                                int readonly,
                                int rank,
@@ -236,47 +540,60 @@ cdef _p_message message_vector(object msg,
     cdef int i=0, val=0
     cdef MPI_Aint extent=0, lb=0
     cdef MPI_Aint asize=0, aval=0
-    if o_counts is None:
-        if bsize > 0:
-            if btype == MPI_DATATYPE_NULL:
-                raise ValueError(
-                    "message: cannot guess count, "
-                    "datatype is null")
-            CHKERR( MPI_Type_get_extent(btype, &lb, &extent) )
-            if extent <= 0: raise ValueError(
-                ("message: cannot guess count, "
-                 "datatype extent %d (lb:%d, ub:%d)"
-                 ) % (extent, lb, lb+extent))
-            if (bsize % extent) != 0: raise ValueError(
-                ("message: cannot guess count, "
-                 "buffer length %d is not a multiple of "
-                 "datatype extent %d (lb:%d, ub:%d)"
-                 ) % (bsize, extent, lb, lb+extent))
-            asize = bsize // extent
-        o_counts = newarray_int(blocks, &counts)
-        for i from 0 <= i < blocks:
-            aval = (asize // blocks) + (asize % blocks > i)
-            counts[i] = <int> aval # XXX overflow?
-    elif is_int(o_counts):
-        val = <int> o_counts
-        o_counts = newarray_int(blocks, &counts)
-        for i from 0 <= i < blocks:
-            counts[i] = val
-    else:
-        o_counts = chkarray_int(o_counts, blocks, &counts)
-    if o_displs is None: # contiguous
-        val = 0
-        o_displs = newarray_int(blocks, &displs)
-        for i from 0 <= i < blocks:
-            displs[i] = val
-            val += counts[i]
-    elif is_int(o_displs): # strided
-        val = <int> o_displs
-        o_displs = newarray_int(blocks, &displs)
-        for i from 0 <= i < blocks:
-            displs[i] = val * i
-    else: # general
-        o_displs = chkarray_int(o_displs, blocks, &displs)
+    cdef object v_counts = o_counts
+    cdef object v_displs = o_displs
+    if o_counts is None and bsize > 0:
+        if btype == MPI_DATATYPE_NULL:
+            raise ValueError(
+                "message: cannot guess count, "
+                "datatype is null")
+        CHKERR( MPI_Type_get_extent(btype, &lb, &extent) )
+        if extent <= 0: raise ValueError(
+            ("message: cannot guess count, "
+             "datatype extent %d (lb:%d, ub:%d)"
+             ) % (extent, lb, lb+extent))
+        if (bsize % extent) != 0: raise ValueError(
+            ("message: cannot guess count, "
+             "buffer length %d is not a multiple of "
+             "datatype extent %d (lb:%d, ub:%d)"
+             ) % (bsize, extent, lb, lb+extent))
+        asize = bsize // extent
+    # counts and displacements beyond INT_MAX
+    # are expressed in units of a derived datatype
+    try:
+        if o_counts is None:
+            o_counts = newarray_int(blocks, &counts)
+            for i from 0 <= i < blocks:
+                aval = (asize // blocks) + (asize % blocks > i)
+                if aval > INT_MAX: raise OverflowError
+                counts[i] = <int> aval
+        elif is_int(o_counts):
+            val = <int> o_counts
+            o_counts = newarray_int(blocks, &counts)
+            for i from 0 <= i < blocks:
+                counts[i] = val
+        else:
+            o_counts = chkarray_int(o_counts, blocks, &counts)
+        if o_displs is None: # contiguous
+            aval = 0
+            o_displs = newarray_int(blocks, &displs)
+            for i from 0 <= i < blocks:
+                if aval > INT_MAX: raise OverflowError
+                displs[i] = <int> aval
+                aval += counts[i]
+        elif is_int(o_displs): # strided
+            val = <int> o_displs
+            o_displs = newarray_int(blocks, &displs)
+            for i from 0 <= i < blocks:
+                aval = <MPI_Aint> val * i
+                if aval > INT_MAX: raise OverflowError
+                displs[i] = <int> aval
+        else: # general
+            o_displs = chkarray_int(o_displs, blocks, &displs)
+    except OverflowError:
+        o_counts, o_displs = message_vector_large(
+            m, v_counts, v_displs, asize, blocks,
+            &counts, &displs, &btype)
     m.count = o_counts
     m.displ = o_displs
     # return collected message data
@@ -308,7 +625,8 @@ cdef class _p_msg_p2p:
                                    rank, 0,
                                    &self.buf,
                                    &self.count,
-                                   &self.dtype)
+                                   &self.dtype,
+                                   1) # strided
         return 0
 
     cdef int for_recv(self, object msg, int rank) except -1:
@@ -316,7 +634,8 @@ cdef class _p_msg_p2p:
                                    rank, 0,
                                    &self.buf,
                                    &self.count,
-                                   &self.dtype)
+                                   &self.dtype,
+                                   1) # strided
         return 0
 
 cdef inline _p_msg_p2p message_p2p_send(object sendbuf, int dest):
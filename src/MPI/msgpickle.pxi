@@ -6,6 +6,12 @@ cdef extern from "Python.h":
     char*      PyBytes_AsString(object) except NULL
     Py_ssize_t PyBytes_Size(object) except -1
     object     PyBytes_FromStringAndSize(char*,Py_ssize_t)
+    char*      PyByteArray_AsString(object) except NULL
+    object     PyByteArray_FromStringAndSize(char*,Py_ssize_t)
+    bint       PyByteArray_CheckExact(object)
+    Py_ssize_t PyByteArray_Size(object) except -1
+    int        PyByteArray_Resize(object,Py_ssize_t) except -1
+    Py_ssize_t Py_REFCNT(object)
 
 cdef extern from *:
     enum: USE_MATCHED_RECV "PyMPI_USE_MATCHED_RECV"
@@ -15,16 +21,33 @@ cdef extern from *:
 cdef object PyPickle_dumps = None
 cdef object PyPickle_loads = None
 cdef object PyPickle_PROTOCOL = -1
+cdef object PyPickle_Pickler = None
+cdef object PyPickle_Unpickler = None
 if PY_MAJOR_VERSION >= 3:
     from pickle import dumps as PyPickle_dumps
     from pickle import loads as PyPickle_loads
+    from pickle import Pickler as PyPickle_Pickler
+    from pickle import Unpickler as PyPickle_Unpickler
 else:
     try:
         from cPickle import dumps as PyPickle_dumps
         from cPickle import loads as PyPickle_loads
+        from cPickle import Pickler as PyPickle_Pickler
+        from cPickle import Unpickler as PyPickle_Unpickler
     except ImportError:
         from pickle  import dumps as PyPickle_dumps
         from pickle  import loads as PyPickle_loads
+        from pickle  import Pickler as PyPickle_Pickler
+        from pickle  import Unpickler as PyPickle_Unpickler
+
+cdef object PyPickle_PickleBuffer = None
+cdef object PyPickle_HIGHEST_PROTOCOL = 2
+if PY_MAJOR_VERSION >= 3:
+    from pickle import HIGHEST_PROTOCOL as PyPickle_HIGHEST_PROTOCOL
+    try:
+        from pickle import PickleBuffer as PyPickle_PickleBuffer
+    except ImportError:
+        pass
 
 cdef object PyStringIO_New = None
 cdef object PyPickle_loadf = None
@@ -35,17 +58,511 @@ if PY_MAJOR_VERSION == 2:
     except ImportError:
         pass
 
+# -----------------------------------------------------------------------------
+
+# Messages larger than INT_MAX bytes cannot be described with an int
+# count of MPI_BYTE. Such messages (as well as out-of-band frames, see
+# below) are described with an hindexed datatype of MPI_BYTE blocks
+# relative to MPI_BOTTOM, with every block at most 1 GiB long. The
+# receiving side always sees a plain sequence of bytes. Both sizes can
+# be lowered with pickle.MSG_LIMIT and pickle.MSG_CHUNK.
+
+cdef extern from "limits.h":
+    enum: INT_MAX
+    long LONG_MAX
+
+cdef enum:
+    PyMPI_MSG_CHUNK_MAX = 1<<30
+
+cdef MPI_Count PyMPI_MSG_LIMIT = INT_MAX
+cdef MPI_Count PyMPI_MSG_CHUNK = PyMPI_MSG_CHUNK_MAX
+
+#@cython.internal
+cdef class _p_msgtype:
+
+    cdef object ob
+    cdef list   blens
+    cdef list   disps
+    cdef MPI_Count size
+    cdef MPI_Datatype dtype
+
+    def __cinit__(self, *args):
+        self.ob    = None
+        self.blens = []
+        self.disps = []
+        self.size  = 0
+        self.dtype = MPI_DATATYPE_NULL
+
+    def __dealloc__(self):
+        if not mpi_active(): return
+        if self.dtype != MPI_DATATYPE_NULL:
+            MPI_Type_free(&self.dtype)
+
+    cdef int add(self, void *p, MPI_Count n) except -1:
+        cdef MPI_Aint addr = 0
+        cdef MPI_Count m = 0
+        self.size += n
+        while n > 0:
+            m = n if n < PyMPI_MSG_CHUNK else PyMPI_MSG_CHUNK
+            CHKERR( MPI_Get_address(p, &addr) )
+            self.blens.append(m)
+            self.disps.append(addr)
+            p = <void*>(<char*>p + m)
+            n -= m
+        return 0
+
+    cdef int commit(self) except -1:
+        cdef int i = 0, count = <int>len(self.blens)
+        cdef int *ilens = NULL
+        cdef MPI_Aint *idisps = NULL
+        cdef object tmp1 = allocate_int(count, &ilens)
+        cdef object tmp2 = allocate(count, sizeof(MPI_Aint), <void**>&idisps)
+        for i from 0 <= i < count:
+            ilens[i] = self.blens[i]
+            idisps[i] = self.disps[i]
+        CHKERR( MPI_Type_create_hindexed(count, ilens, idisps,
+                                         MPI_BYTE, &self.dtype) )
+        CHKERR( MPI_Type_commit(&self.dtype) )
+        self.blens = self.disps = None
+        return 0
+
+cdef object PyMPI_msgbytes(object ob, void *base, MPI_Count size,
+                           void **p, int *n, MPI_Datatype *t):
+    if size <= PyMPI_MSG_LIMIT:
+        p[0] = base
+        n[0] = <int> size
+        t[0] = MPI_BYTE
+        return ob
+    cdef _p_msgtype msg = _p_msgtype()
+    msg.ob = ob
+    msg.add(base, size)
+    msg.commit()
+    p[0] = MPI_BOTTOM
+    n[0] = 1
+    t[0] = msg.dtype
+    return msg
+
+cdef MPI_Count PyMPI_msgspec(object msg, void **p, int *n,
+                             MPI_Datatype *t) except -1:
+    cdef MPI_Aint size = 0
+    if msg is None:
+        p[0] = NULL
+        n[0] = 0
+        t[0] = MPI_BYTE
+        return 0
+    if isinstance(msg, _p_msgtype):
+        p[0] = MPI_BOTTOM
+        n[0] = 1
+        t[0] = (<_p_msgtype>msg).dtype
+        return (<_p_msgtype>msg).size
+    getbuffer_r(msg, p, &size)
+    n[0] = <int> size
+    t[0] = MPI_BYTE
+    return size
+
+cdef inline MPI_Count PyMPI_msgsize(object msg) except -1:
+    if msg is None:
+        return 0
+    if isinstance(msg, _p_msgtype):
+        return (<_p_msgtype>msg).size
+    return PyBytes_Size(msg)
+
+cdef inline MPI_Count PyMPI_Get_bytes(MPI_Status *status) except -1:
+    cdef MPI_Count count = 0
+    CHKERR( MPI_Get_elements_x(status, MPI_BYTE, &count) )
+    return count
+
+# -----------------------------------------------------------------------------
+
+# Out-of-band frames. A pickle stream whose large buffers were taken
+# out-of-band (pickle protocol 5) is sent as a single message made of
+# a header, the in-band pickle data, and the raw buffer contents. The
+# sender describes the pieces with an hindexed datatype relative to
+# MPI_BOTTOM, thus buffers are never copied into an intermediate
+# bytes object; the receiver hands slices of the message buffer to
+# pickle.loads(), or copies of them if the message was received in a
+# caller buffer. Plain pickles never start with the frame magic.
+
+cdef struct PyMPI_Frame:
+    unsigned char magic[4]
+    unsigned int  flags
+    long long     dsize
+    long long     nbufs
+
+cdef enum:
+    PyMPI_FRAME_ALIGN = 64
+
+cdef char PyMPI_FRAME_ZEROS[64]
+
+cdef inline bint PyMPI_Frame_check(char *p, Py_ssize_t n):
+    return (n >= <Py_ssize_t>sizeof(PyMPI_Frame) and
+            <unsigned char>p[0] == 0xFE and p[1] == c'M' and
+            p[2] == c'P' and p[3] == c'I')
+
+cdef inline Py_ssize_t PyMPI_Frame_pad(Py_ssize_t offset):
+    return (PyMPI_FRAME_ALIGN - offset % PyMPI_FRAME_ALIGN) % PyMPI_FRAME_ALIGN
+
+# Compression. Pickle streams longer than a threshold may be
+# compressed with one of the stdlib codecs below. They are sent as a
+# frame whose flags record the codec, so receivers decompress them
+# regardless of their own settings. Out-of-band buffers are never
+# compressed, only the in-band pickle data.
+
+cdef enum:
+    PyMPI_FRAME_CODEC = 0xFF
+
+cdef tuple PyMPI_CODECS = (None, 'zlib', 'bz2', 'lzma')
+
+cdef object PyMPI_codec(unsigned int codec):
+    if codec == 0 or codec >= <unsigned int>len(PyMPI_CODECS):
+        raise ValueError("unknown compression codec %d" % codec)
+    return __import__(PyMPI_CODECS[codec])
+
+# Raw objects. When pickle.RAW is set, exact bytes and bytearray
+# instances and contiguous NumPy arrays of simple dtypes are not
+# pickled at all. They are sent
+# as a frame whose flags record the kind of object, whose in-band
+# data describes the array (dtype, shape, order), and whose single
+# out-of-band buffer is the object memory. Arrays are rebuilt on top
+# of receive buffers allocated by the library, thus without copies;
+# messages received in caller buffers (or kept in immutable bytes)
+# are copied, the result never aliases them.
+
+cdef enum:
+    PyMPI_FRAME_KIND      = 0xFF00
+    PyMPI_FRAME_BYTES     = 0x0100
+    PyMPI_FRAME_BYTEARRAY = 0x0200
+    PyMPI_FRAME_NDARRAY   = 0x0300
+
+# Frames up to this size are sent as a contiguous copy, for them
+# creating a datatype costs more than copying the memory.
+cdef enum:
+    PyMPI_FRAME_INLINE = 4096
+
+cdef object PyMPI_numpy = None
+
+cdef inline bint PyMPI_is_ndarray(object obj):
+    cdef object cls = type(obj)
+    return cls.__name__ == 'ndarray' and cls.__module__ == 'numpy'
+
+cdef object PyMPI_dump_raw(object obj):
+    if type(obj) is bytes:
+        return _p_frame(b'', [obj], PyMPI_FRAME_BYTES)
+    if type(obj) is bytearray:
+        return _p_frame(b'', [obj], PyMPI_FRAME_BYTEARRAY)
+    if not PyMPI_is_ndarray(obj):
+        return None
+    cdef object dtype = obj.dtype
+    if (dtype.hasobject or
+        dtype.fields is not None or
+        dtype.subdtype is not None or
+        dtype.itemsize == 0):
+        return None
+    cdef object order, buf
+    if obj.flags.c_contiguous:
+        order, buf = 'C', obj
+    elif obj.flags.f_contiguous:
+        order, buf = 'F', obj.T
+    else:
+        return None
+    buf = buf.reshape(-1).view('B')
+    cdef object shape = ','.join([str(i) for i in obj.shape])
+    cdef object meta = ';'.join([dtype.str, shape, order]).encode('ascii')
+    return _p_frame(meta, [buf], PyMPI_FRAME_NDARRAY)
+
+cdef object PyMPI_load_raw(unsigned int kind, object meta, list bufs,
+                           bint owned):
+    global PyMPI_numpy
+    cdef void *p = NULL
+    cdef MPI_Aint n = 0
+    if len(bufs) != 1:
+        raise ValueError("invalid raw object frame")
+    cdef object buf = bufs[0]
+    if kind == PyMPI_FRAME_BYTES:
+        getbuffer_r(buf, &p, &n)
+        return PyBytes_FromStringAndSize(<char*>p, n)
+    if kind == PyMPI_FRAME_BYTEARRAY:
+        getbuffer_r(buf, &p, &n)
+        return PyByteArray_FromStringAndSize(<char*>p, n)
+    if kind != PyMPI_FRAME_NDARRAY:
+        raise ValueError("unknown object kind 0x%x" % kind)
+    if PyMPI_numpy is None:
+        PyMPI_numpy = __import__('numpy')
+    getbuffer_r(meta, &p, &n)
+    meta = PyBytes_FromStringAndSize(<char*>p, n).decode('ascii')
+    cdef object dtype, shape, order
+    dtype, shape, order = meta.split(';')
+    shape = tuple([int(i) for i in shape.split(',')]) if shape else ()
+    if not owned: buf = bytearray(buf)
+    return PyMPI_numpy.frombuffer(buf, dtype).reshape(shape, order=order)
+
+#@cython.internal
+cdef class _p_oob:
+
+    cdef Py_ssize_t threshold
+    cdef list bufs
+
+    def __cinit__(self, Py_ssize_t threshold):
+        self.threshold = threshold
+        self.bufs = []
+
+    def __call__(self, pb):
+        cdef object m
+        try:
+            m = pb.raw()
+        except BufferError:
+            return True
+        if len(m) < self.threshold:
+            return True
+        self.bufs.append(m)
+        return False
+
+#@cython.internal
+cdef class _p_frame(_p_msgtype):
+
+    cdef object head
+    cdef object data
+    cdef list   bufs
+    cdef list   views
+    cdef unsigned int flags
+
+    def __cinit__(self, data, list bufs, unsigned int flags=0):
+        self.head  = None
+        self.data  = data
+        self.bufs  = bufs
+        self.views = []
+        self.flags = flags
+
+    cdef int build(self) except -1:
+        cdef Py_ssize_t i = 0, nbufs = len(self.bufs)
+        cdef Py_ssize_t hsize = <Py_ssize_t>sizeof(PyMPI_Frame)
+        hsize += nbufs * <Py_ssize_t>sizeof(long long)
+        self.head = PyByteArray_FromStringAndSize(NULL, hsize)
+        cdef PyMPI_Frame *hdr = <PyMPI_Frame*>PyByteArray_AsString(self.head)
+        cdef long long *bsizes = <long long*>(&hdr[1])
+        hdr.magic[0] = 0xFE
+        hdr.magic[1] = c'M'
+        hdr.magic[2] = c'P'
+        hdr.magic[3] = c'I'
+        hdr.flags = self.flags
+        hdr.dsize = PyBytes_Size(self.data)
+        hdr.nbufs = nbufs
+        #
+        cdef void *p = NULL
+        cdef MPI_Aint n = 0
+        self.add(hdr, hsize)
+        self.add(PyBytes_AsString(self.data), hdr.dsize)
+        for i from 0 <= i < nbufs:
+            self.views.append(getbuffer_r(self.bufs[i], &p, &n))
+            bsizes[i] = n
+            self.add(PyMPI_FRAME_ZEROS, PyMPI_Frame_pad(self.size))
+            self.add(p, n)
+        return 0
+
+    cdef object tobytes(self):
+        cdef Py_ssize_t i = 0, nbufs = len(self.bufs)
+        cdef Py_ssize_t offset = len(self.head) + len(self.data)
+        cdef list items = [self.head, self.data]
+        for i from 0 <= i < nbufs:
+            items.append(b'\0' * PyMPI_Frame_pad(offset))
+            items.append(self.bufs[i])
+            offset += len(items[-2]) + (<_p_buffer>self.views[i]).view.len
+        return b''.join(items)
+
+
+# -----------------------------------------------------------------------------
+
+# Receive buffer pool. Buffers for incoming pickled messages are taken
+# from buckets of power-of-two capacity and, once the message has been
+# loaded, given back unless the loaded object still refers to them
+# (e.g., arrays built on top of the message). The pool holds at most
+# pickle.BUFFER_POOL bytes; when full, the oldest buffer of the least
+# recently used bucket is freed first. All operations run with the
+# GIL held.
+
+cdef enum:
+    PyMPI_POOL_MINBUF = 1<<14
+    PyMPI_POOL_MAXBUF = 1<<20
+    PyMPI_POOL_NBUCKETS = 21
+
+cdef inline int PyMPI_pool_bucket(Py_ssize_t n):
+    cdef int k = 0
+    n -= 1
+    while n > 0:
+        n >>= 1
+        k += 1
+    return k
+
+#@cython.internal
+cdef class _p_pool:
+
+    cdef list buckets
+    cdef long long stamp[PyMPI_POOL_NBUCKETS]
+    cdef long long clock
+    cdef Py_ssize_t size
+    cdef Py_ssize_t limit
+
+    def __cinit__(self):
+        cdef int k = 0
+        self.buckets = [[] for k in range(PyMPI_POOL_NBUCKETS)]
+        for k from 0 <= k < PyMPI_POOL_NBUCKETS:
+            self.stamp[k] = 0
+        self.clock = 0
+        self.size = 0
+        self.limit = 0
+
+    cdef object get(self, Py_ssize_t n):
+        cdef int k = PyMPI_pool_bucket(n)
+        cdef list bucket = self.buckets[k]
+        cdef object buf
+        self.clock += 1
+        self.stamp[k] = self.clock
+        if bucket:
+            buf = bucket.pop()
+            self.size -= <Py_ssize_t>1 << k
+        else:
+            buf = PyByteArray_FromStringAndSize(NULL, <Py_ssize_t>1 << k)
+        PyByteArray_Resize(buf, n)
+        return buf
+
+    cdef int put(self, object buf) except -1:
+        if not PyByteArray_CheckExact(buf): return 0
+        cdef Py_ssize_t n = PyByteArray_Size(buf)
+        if n < PyMPI_POOL_MINBUF or n > PyMPI_POOL_MAXBUF: return 0
+        cdef int k = PyMPI_pool_bucket(n)
+        if self.size + (<Py_ssize_t>1 << k) > self.limit:
+            if (<Py_ssize_t>1 << k) > self.limit: return 0
+            self.size += <Py_ssize_t>1 << k
+            self.trim()
+            self.size -= <Py_ssize_t>1 << k
+        (<list>self.buckets[k]).append(buf)
+        self.size += <Py_ssize_t>1 << k
+        return 0
+
+    cdef int trim(self) except -1:
+        cdef int i = 0, k = 0
+        while self.size > self.limit:
+            k = -1
+            for i from 0 <= i < PyMPI_POOL_NBUCKETS:
+                if not self.buckets[i]: continue
+                if k < 0 or self.stamp[i] < self.stamp[k]: k = i
+            if k < 0: break
+            del (<list>self.buckets[k])[0]
+            self.size -= <Py_ssize_t>1 << k
+        return 0
+
+# Serialization counters, kept per communicator (Fortran) handle and
+# call site while enabled. Time spent in the call beyond pickling and
+# unpickling is reported as transfer time.
+
+#@cython.internal
+cdef class _p_stat:
+
+    cdef MPI_Count calls
+    cdef MPI_Count dumps
+    cdef MPI_Count loads
+    cdef MPI_Count bytes_out
+    cdef MPI_Count bytes_in
+    cdef double dumps_time
+    cdef double loads_time
+    cdef double total_time
+
+    cdef dict todict(self):
+        cdef double transfer = self.total_time
+        transfer -= self.dumps_time + self.loads_time
+        if transfer < 0: transfer = 0
+        return {
+            'calls'         : self.calls,
+            'dumps'         : self.dumps,
+            'loads'         : self.loads,
+            'bytes_out'     : self.bytes_out,
+            'bytes_in'      : self.bytes_in,
+            'dumps_time'    : self.dumps_time,
+            'loads_time'    : self.loads_time,
+            'transfer_time' : transfer,
+            }
+
+#@cython.internal
+cdef class _p_stats:
+
+    cdef dict sites
+    cdef _p_stat cur
+    cdef double start
+
+    def __cinit__(self):
+        self.sites = {}
+        self.cur = None
+        self.start = 0
+
+    cdef _p_stat get(self, object site, object handle):
+        cdef object key = (handle, site)
+        cdef _p_stat stat = self.sites.get(key)
+        if stat is None:
+            stat = self.sites[key] = _p_stat()
+        return stat
+
+    cdef _p_stat enter(self, object site, MPI_Comm comm):
+        cdef object handle = None
+        if comm != MPI_COMM_NULL:
+            handle = MPI_Comm_c2f(comm)
+        self.cur = self.get(site, handle)
+        self.start = MPI_Wtime()
+        return self.cur
+
+    cdef int exit(self, _p_stat stat) except -1:
+        if self.cur is not stat: return 0
+        stat.calls += 1
+        stat.total_time += MPI_Wtime() - self.start
+        self.cur = None
+        return 0
+
+    cdef _p_stat current(self):
+        if self.cur is None:
+            return self.get('other', None)
+        return self.cur
+
+    cdef dict snapshot(self):
+        cdef dict result = {}
+        for key, stat in self.sites.items():
+            result[key] = (<_p_stat>stat).todict()
+        return result
+
 #@cython.internal
 cdef class _p_Pickle:
 
     cdef object ob_dumps
     cdef object ob_loads
     cdef object ob_PROTOCOL
+    cdef object ob_THRESHOLD
+    cdef object ob_COMPRESS
+    cdef object ob_codec
+    cdef unsigned int codec
+    cdef Py_ssize_t compress_threshold
+    cdef object ob_BCAST_CHUNK
+    cdef object ob_ALLTOALL_WINDOW
+    cdef object ob_BUFFER_POOL
+    cdef bint reduce_buffers
+    cdef bint raw
+    cdef _p_pool pool
+    cdef _p_stats stats
 
     def __cinit__(self):
         self.ob_dumps = None
         self.ob_loads = None
         self.ob_PROTOCOL = PyPickle_PROTOCOL
+        self.ob_THRESHOLD = None
+        self.ob_COMPRESS = None
+        self.ob_codec = None
+        self.codec = 0
+        self.compress_threshold = 4096
+        self.ob_BCAST_CHUNK = None
+        self.ob_ALLTOALL_WINDOW = None
+        self.ob_BUFFER_POOL = 1<<24
+        self.pool = _p_pool()
+        self.pool.limit = self.ob_BUFFER_POOL
+        self.reduce_buffers = 0
+        self.raw = 0
+        self.stats = None
 
     property dumps:
         def __get__(self):
@@ -77,31 +594,332 @@ cdef class _p_Pickle:
         def __set__(self, PROTOCOL):
             self.ob_PROTOCOL = PROTOCOL
 
-    cdef object dump(self, object obj, void **p, int *n):
+    property THRESHOLD:
+        def __get__(self):
+            return self.ob_THRESHOLD
+        def __set__(self, THRESHOLD):
+            if THRESHOLD is not None and THRESHOLD < 0:
+                raise ValueError("threshold must be non-negative")
+            self.ob_THRESHOLD = THRESHOLD
+
+    property COMPRESS:
+        def __get__(self):
+            return self.ob_COMPRESS
+        def __set__(self, COMPRESS):
+            cdef unsigned int codec = 0
+            if COMPRESS is not None:
+                if COMPRESS not in PyMPI_CODECS:
+                    raise ValueError(
+                        "unknown compression codec %r" % (COMPRESS,))
+                codec = PyMPI_CODECS.index(COMPRESS)
+                self.ob_codec = PyMPI_codec(codec)
+            else:
+                self.ob_codec = None
+            self.codec = codec
+            self.ob_COMPRESS = COMPRESS
+
+    property COMPRESS_THRESHOLD:
+        def __get__(self):
+            return self.compress_threshold
+        def __set__(self, Py_ssize_t COMPRESS_THRESHOLD):
+            if COMPRESS_THRESHOLD < 0:
+                raise ValueError("threshold must be non-negative")
+            self.compress_threshold = COMPRESS_THRESHOLD
+
+    property MSG_LIMIT:
+        def __get__(self):
+            return PyMPI_MSG_LIMIT
+        def __set__(self, MSG_LIMIT):
+            global PyMPI_MSG_LIMIT
+            if MSG_LIMIT <= 0:
+                raise ValueError("message limit must be positive")
+            if MSG_LIMIT > INT_MAX:
+                raise ValueError("message limit must be at most %d" %
+                                 INT_MAX)
+            PyMPI_MSG_LIMIT = MSG_LIMIT
+
+    property MSG_CHUNK:
+        def __get__(self):
+            return PyMPI_MSG_CHUNK
+        def __set__(self, MSG_CHUNK):
+            global PyMPI_MSG_CHUNK
+            if MSG_CHUNK <= 0:
+                raise ValueError("chunk size must be positive")
+            if MSG_CHUNK > PyMPI_MSG_CHUNK_MAX:
+                raise ValueError("chunk size must be at most %d" %
+                                 PyMPI_MSG_CHUNK_MAX)
+            PyMPI_MSG_CHUNK = MSG_CHUNK
+
+    property BCAST_CHUNK:
+        def __get__(self):
+            return self.ob_BCAST_CHUNK
+        def __set__(self, BCAST_CHUNK):
+            if BCAST_CHUNK is not None:
+                if BCAST_CHUNK <= 0:
+                    raise ValueError("chunk size must be positive")
+            self.ob_BCAST_CHUNK = BCAST_CHUNK
+
+    property ALLTOALL_WINDOW:
+        def __get__(self):
+            return self.ob_ALLTOALL_WINDOW
+        def __set__(self, ALLTOALL_WINDOW):
+            if ALLTOALL_WINDOW is not None:
+                if ALLTOALL_WINDOW <= 0:
+                    raise ValueError("window size must be positive")
+                if ALLTOALL_WINDOW > INT_MAX:
+                    raise ValueError("window size must be at most %d" %
+                                     INT_MAX)
+            self.ob_ALLTOALL_WINDOW = ALLTOALL_WINDOW
+
+    property BUFFER_POOL:
+        def __get__(self):
+            return self.ob_BUFFER_POOL
+        def __set__(self, BUFFER_POOL):
+            if BUFFER_POOL is not None and BUFFER_POOL < 0:
+                raise ValueError("pool size must be non-negative")
+            self.pool.limit = BUFFER_POOL or 0
+            self.pool.trim()
+            self.ob_BUFFER_POOL = BUFFER_POOL
+
+    property REDUCE_BUFFERS:
+        def __get__(self):
+            return self.reduce_buffers
+        def __set__(self, bint REDUCE_BUFFERS):
+            self.reduce_buffers = REDUCE_BUFFERS
+
+    property RAW:
+        def __get__(self):
+            return self.raw
+        def __set__(self, bint RAW):
+            self.raw = RAW
+
+    property STATS:
+        def __get__(self):
+            return self.stats is not None
+        def __set__(self, STATS):
+            if not STATS:
+                self.stats = None
+            elif self.stats is None:
+                self.stats = _p_stats()
+
+    def get_stats(self):
+        """
+        Serialization counters by communicator handle and call site
+        """
+        if self.stats is None: return {}
+        return self.stats.snapshot()
+
+    def reset_stats(self):
+        """
+        Reset serialization counters
+        """
+        if self.stats is None: return
+        self.stats = _p_stats()
+
+    def gather_stats(self, Comm comm not None, int root=0):
+        """
+        Sum serialization counters over the processes of an
+        intracommunicator, the result is returned at the root
+        """
+        cdef dict local = self.get_stats()
+        cdef _p_stats stats = self.stats
+        self.stats = None
+        try:
+            items = PyMPI_gather(local, None, root, comm.ob_mpi)
+        finally:
+            self.stats = stats
+        if items is None: return None
+        cdef dict result = {}
+        cdef dict total
+        for item in items:
+            for key, counters in item.items():
+                total = result.get(key)
+                if total is None:
+                    result[key] = dict(counters)
+                else:
+                    for name, value in counters.items():
+                        total[name] += value
+        return result
+
+    cdef bint oob(self):
+        if self.ob_THRESHOLD is None: return 0
+        if self.ob_dumps is not None: return 0
+        if PyPickle_PickleBuffer is None: return 0
+        cdef object protocol = self.ob_PROTOCOL
+        if protocol is None or protocol < 0:
+            protocol = PyPickle_HIGHEST_PROTOCOL
+        return protocol >= 5
+
+    cdef bint segmented(self, object obj) except -1:
+        if self.ob_BCAST_CHUNK is None: return 0
+        if self.ob_dumps is not None: return 0
+        if self.codec: return 0
+        if obj is None: return 0
+        return not self.raw or PyMPI_dump_raw(obj) is None
+
+    cdef object dump(self, object obj, void **p, int *n, MPI_Datatype *t):
+        if self.stats is None or obj is None:
+            return self.dumpm(obj, p, n, t)
+        cdef double start = MPI_Wtime()
+        cdef object msg = self.dumpm(obj, p, n, t)
+        cdef double elapsed = MPI_Wtime() - start
+        cdef MPI_Count size = 0
+        CHKERR( MPI_Type_size_x(t[0], &size) )
+        cdef _p_stat stat = self.stats.current()
+        stat.dumps += 1
+        stat.bytes_out += <MPI_Count>n[0] * size
+        stat.dumps_time += elapsed
+        return msg
+
+    cdef object dumpm(self, object obj, void **p, int *n, MPI_Datatype *t):
+        t[0] = MPI_BYTE
         if obj is None:
             p[0] = NULL
             n[0] = 0
             return None
-        cdef object buf
+        cdef object buf = None
+        cdef _p_frame frame = None
+        if self.raw and self.ob_dumps is None:
+            frame = PyMPI_dump_raw(obj)
+        if frame is None:
+            buf = self.dumpf(obj)
+            if type(buf) is _p_frame:
+                frame = <_p_frame>buf
+        if frame is not None:
+            frame.build()
+            if frame.size > PyMPI_FRAME_INLINE:
+                frame.commit()
+                p[0] = MPI_BOTTOM
+                n[0] = 1
+                t[0] = frame.dtype
+                return frame
+            buf = frame.tobytes()
+        return PyMPI_msgbytes(buf, PyBytes_AsString(buf), PyBytes_Size(buf),
+                              p, n, t)
+
+    cdef object dumpf(self, object obj):
+        # pickle stream, or frame if out-of-band buffers or compression
+        cdef object buf, zbuf
+        cdef list bufs = []
+        cdef unsigned int flags = 0
+        cdef _p_oob oob = None
         if self.ob_dumps is None:
-            buf = PyPickle_dumps(obj, self.ob_PROTOCOL)
+            if self.oob():
+                oob = _p_oob(self.ob_THRESHOLD)
+                buf = PyPickle_dumps(obj, self.ob_PROTOCOL,
+                                     buffer_callback=oob)
+                bufs = oob.bufs
+            else:
+                buf = PyPickle_dumps(obj, self.ob_PROTOCOL)
         else:
             buf = self.ob_dumps(obj, self.ob_PROTOCOL)
-        p[0] = <void*> PyBytes_AsString(buf)
-        n[0] = <int>   PyBytes_Size(buf) # XXX overflow?
+        if self.codec and PyBytes_Size(buf) >= self.compress_threshold:
+            zbuf = self.ob_codec.compress(buf)
+            if PyBytes_Size(zbuf) < PyBytes_Size(buf):
+                buf = zbuf
+                flags = self.codec
+        if bufs or flags:
+            return _p_frame(buf, bufs, flags)
         return buf
 
-    cdef object alloc(self, void **p, int n):
+    cdef object alloc(self, void **p, MPI_Count n):
         if n == 0:
             p[0] = NULL
             return None
         cdef object buf
-        buf = PyBytes_FromStringAndSize(NULL, n)
-        p[0] = PyBytes_AsString(buf)
+        if (PY_MAJOR_VERSION >= 3 and self.pool.limit > 0 and
+            PyMPI_POOL_MINBUF <= n <= PyMPI_POOL_MAXBUF):
+            buf = self.pool.get(<Py_ssize_t>n)
+            p[0] = PyByteArray_AsString(buf)
+        elif PY_MAJOR_VERSION >= 3:
+            buf = PyByteArray_FromStringAndSize(NULL, n)
+            p[0] = PyByteArray_AsString(buf)
+        else:
+            buf = PyBytes_FromStringAndSize(NULL, n)
+            p[0] = PyBytes_AsString(buf)
         return buf
 
-    cdef object load(self, object buf):
+    cdef object loadf(self, object buf, char *p, Py_ssize_t n,
+                      bint owned):
+        cdef PyMPI_Frame *hdr = <PyMPI_Frame*>p
+        cdef long long *bsizes = <long long*>(&hdr[1])
+        cdef Py_ssize_t i = 0, nbufs = 0, offset = 0
+        if hdr.nbufs < 0 or hdr.dsize < 0 or hdr.nbufs > n:
+            raise ValueError("invalid out-of-band frame header")
+        nbufs = <Py_ssize_t>hdr.nbufs
+        offset = <Py_ssize_t>sizeof(PyMPI_Frame)
+        offset += nbufs * <Py_ssize_t>sizeof(long long)
+        if offset > n or hdr.dsize > n - offset:
+            raise ValueError("out-of-band frame exceeds message size")
+        cdef object mv = memoryview(buf)
+        if mv.ndim != 1 or mv.itemsize != 1:
+            mv = mv.cast('B')
+        cdef object data = mv[offset:offset+<Py_ssize_t>hdr.dsize]
+        offset += <Py_ssize_t>hdr.dsize
+        cdef list bufs = []
+        for i from 0 <= i < nbufs:
+            offset += PyMPI_Frame_pad(offset)
+            if bsizes[i] < 0 or bsizes[i] > n - offset:
+                raise ValueError("out-of-band frame exceeds message size")
+            if owned:
+                bufs.append(mv[offset:offset+<Py_ssize_t>bsizes[i]])
+            else:
+                bufs.append(PyByteArray_FromStringAndSize(
+                    p + offset, <Py_ssize_t>bsizes[i]))
+            offset += <Py_ssize_t>bsizes[i]
+        if PY_MAJOR_VERSION == 2:
+            data = data.tobytes()
+        return self.loadb(data, hdr.flags, bufs, owned)
+
+    cdef object loadb(self, object data, unsigned int flags, list bufs,
+                      bint owned):
+        if flags & PyMPI_FRAME_KIND:
+            return PyMPI_load_raw(flags & PyMPI_FRAME_KIND, data, bufs,
+                                  owned)
+        if flags & PyMPI_FRAME_CODEC:
+            data = PyMPI_codec(flags & PyMPI_FRAME_CODEC).decompress(data)
+        cdef object loads = self.ob_loads
+        if loads is None:
+            loads = PyPickle_loads
+        if bufs:
+            return loads(data, buffers=bufs)
+        else:
+            return loads(data)
+
+    cdef object load(self, object buf, bint owned=0):
+        # owned buffers come from alloc(), or are private copies, thus
+        # loaded objects may be built on top of them
+        if self.stats is None or buf is None:
+            return self.loadm(buf, owned)
+        cdef MPI_Aint size = 0
+        if isinstance(buf, _p_msgtype):
+            size = <MPI_Aint>(<_p_msgtype>buf).size
+        else:
+            getbuffer_r(buf, NULL, &size)
+        cdef double start = MPI_Wtime()
+        cdef object obj = self.loadm(buf, owned)
+        cdef double elapsed = MPI_Wtime() - start
+        cdef _p_stat stat = self.stats.current()
+        stat.loads += 1
+        stat.bytes_in += size
+        stat.loads_time += elapsed
+        return obj
+
+    cdef object loadm(self, object buf, bint owned):
         if buf is None: return None
+        cdef _p_frame frame
+        cdef list bufs
+        if type(buf) is _p_msgtype:
+            buf = (<_p_msgtype>buf).ob
+        elif type(buf) is _p_frame:
+            frame = <_p_frame>buf
+            bufs = [bytearray(b) for b in frame.bufs]
+            return self.loadb(frame.data, frame.flags, bufs, 1)
+        cdef void *p = NULL
+        cdef MPI_Aint n = 0
+        getbuffer_r(buf, &p, &n)
+        if PyMPI_Frame_check(<char*>p, n):
+            return self.loadf(buf, <char*>p, n, owned)
         cdef bint use_StringIO = \
             (PY_MAJOR_VERSION == 2 and
              not PyBytes_CheckExact(buf) and
@@ -119,28 +937,89 @@ cdef class _p_Pickle:
                 buf = buf.read()
             return self.ob_loads(buf)
 
-    cdef object dumpv(self, object obj, void **p,
-                      int n, int cnt[], int dsp[]):
+    cdef object loadr(self, object buf):
+        # load a message received in a buffer from alloc(), and give
+        # the buffer back to the pool if the loaded object does not
+        # refer to it; callers must not use the buffer afterwards
+        if buf is None: return None
+        cdef Py_ssize_t refs = Py_REFCNT(buf)
+        cdef object obj = self.load(buf, 1)
+        if Py_REFCNT(buf) == refs: self.pool.put(buf)
+        return obj
+
+    cdef object dumpv(self, object obj, int n):
         cdef Py_ssize_t i=0, m=n
-        if obj is None:
-            p[0] = NULL
-            for i from 0 <= i < m:
-                cnt[i] = 0
-                dsp[i] = 0
-            return None
+        if obj is None: return [None] * m
         cdef object items = list(obj)
         m = len(items)
         if m != n: raise ValueError(
             "expecting %d items, got %d" % (n, m))
+        cdef void *p = NULL
+        cdef int c = 0
+        cdef MPI_Datatype t = MPI_BYTE
+        for i from 0 <= i < m:
+            items[i] = self.dump(items[i], &p, &c, &t)
+        return items
+
+    cdef object joinv(self, object items, void **p, int n,
+                      MPI_Count cnt[], int icnt[], int dsp[],
+                      MPI_Count limit):
+        # items longer than limit bytes are left out, and
+        # have to be communicated on their own
+        cdef Py_ssize_t i=0, m=n
+        cdef list pieces = []
+        cdef object item
         cdef int d=0, c=0
         for i from 0 <= i < m:
-            items[i] = self.dump(items[i], p, &c)
-            if c == 0: items[i] = b''
-            cnt[i] = c; dsp[i] = d; d += c
-        cdef object buf = b''.join(items) # XXX use _PyBytes_Join() ?
+            item = items[i]
+            cnt[i] = PyMPI_msgsize(item)
+            c = <int>cnt[i] if cnt[i] <= limit else 0
+            icnt[i] = c; dsp[i] = d; d += c
+            if c == 0: continue
+            if type(item) is _p_frame:
+                item = (<_p_frame>item).tobytes()
+            pieces.append(item)
+        cdef object buf = b''.join(pieces) # XXX use _PyBytes_Join() ?
         p[0] = PyBytes_AsString(buf)
         return buf
 
+    cdef object joinw(self, object items, void **p, int n,
+                      MPI_Count cnt[], int icnt[], int dsp[],
+                      MPI_Datatype typ[], MPI_Count limit):
+        # as joinv(), but large items are not concatenated; instead,
+        # each one is described by a datatype relative to MPI_BOTTOM
+        cdef Py_ssize_t i=0, m=n
+        cdef MPI_Count total = 0
+        cdef bint frames = False
+        cdef object item
+        for i from 0 <= i < m:
+            item = items[i]
+            cnt[i] = PyMPI_msgsize(item)
+            if cnt[i] > limit: continue
+            total += cnt[i]
+            frames |= type(item) is _p_frame
+        if not frames and total <= PyMPI_FRAME_INLINE * m:
+            for i from 0 <= i < m:
+                typ[i] = MPI_BYTE
+            return self.joinv(items, p, n, cnt, icnt, dsp, limit)
+        cdef list msgs = []
+        cdef _p_msgtype msg
+        p[0] = MPI_BOTTOM
+        for i from 0 <= i < m:
+            item = items[i]
+            icnt[i] = 0; dsp[i] = 0; typ[i] = MPI_BYTE
+            if cnt[i] == 0 or cnt[i] > limit: continue
+            if type(item) is _p_frame:
+                msg = <_p_frame>item
+            else:
+                msg = _p_msgtype()
+                msg.ob = item
+                msg.add(PyBytes_AsString(item), cnt[i])
+                msg.commit()
+                msgs.append(msg)
+            icnt[i] = 1; typ[i] = msg.dtype
+        return msgs
+
     cdef object allocv(self, void **p,
                        int n, int cnt[], int dsp[]):
         cdef int i=0, d=0
@@ -154,12 +1033,26 @@ cdef class _p_Pickle:
         cdef Py_ssize_t i=0, m=n
         cdef object items = [None] * m
         if obj is None: return items
-        cdef char *p = PyBytes_AsString(obj)
+        cdef Py_ssize_t refs = Py_REFCNT(obj)
+        cdef void *p = NULL
+        getbuffer_r(obj, &p, NULL)
+        cdef object mv = None
         cdef object buf = None
         for i from 0 <= i < m:
             if cnt[i] == 0: continue
-            buf = PyBytes_FromStringAndSize(p+dsp[i], cnt[i])
-            items[i] = self.load(buf)
+            if (PY_MAJOR_VERSION >= 3 and self.ob_loads is None and
+                cnt[i] > PyMPI_FRAME_INLINE):
+                # large items are unpickled in place, small ones are
+                # cheaper to copy than to slice
+                if mv is None: mv = memoryview(obj)
+                buf = mv[dsp[i]:dsp[i]+cnt[i]]
+            elif PY_MAJOR_VERSION >= 3:
+                buf = PyByteArray_FromStringAndSize(<char*>p+dsp[i], cnt[i])
+            else:
+                buf = PyBytes_FromStringAndSize(<char*>p+dsp[i], cnt[i])
+            items[i] = self.load(buf, 1)
+        mv = buf = None
+        if Py_REFCNT(obj) == refs: self.pool.put(obj)
         return items
 
 
@@ -170,6 +1063,20 @@ cdef inline _p_Pickle PyMPI_pickle():
 
 _p_pickle = PyMPI_PICKLE
 
+cdef inline _p_stat PyMPI_stats_enter(object site, MPI_Comm comm):
+    # counters cost a single test while disabled; nested calls are
+    # charged to the outermost call site
+    cdef _p_stats stats = PyMPI_PICKLE.stats
+    if stats is None: return None
+    if stats.cur is not None: return None
+    return stats.enter(site, comm)
+
+cdef inline int PyMPI_stats_exit(_p_stat stat) except -1:
+    if stat is None: return 0
+    cdef _p_stats stats = PyMPI_PICKLE.stats
+    if stats is None: return 0
+    return stats.exit(stat)
+
 # -----------------------------------------------------------------------------
 
 cdef object PyMPI_send(object obj, int dest, int tag,
@@ -183,7 +1090,7 @@ cdef object PyMPI_send(object obj, int dest, int tag,
     cdef int dosend = (dest != MPI_PROC_NULL)
     #
     cdef object smsg = None
-    if dosend: smsg = pickle.dump(obj, &sbuf, &scount)
+    if dosend: smsg = pickle.dump(obj, &sbuf, &scount, &stype)
     with nogil: CHKERR( MPI_Send(sbuf, scount, stype,
                                  dest, tag, comm) )
     return None
@@ -200,7 +1107,7 @@ cdef object PyMPI_bsend(object obj, int dest, int tag,
     cdef int dosend = (dest != MPI_PROC_NULL)
     #
     cdef object smsg = None
-    if dosend: smsg = pickle.dump(obj, &sbuf, &scount)
+    if dosend: smsg = pickle.dump(obj, &sbuf, &scount, &stype)
     with nogil: CHKERR( MPI_Bsend(sbuf, scount, stype,
                                   dest, tag, comm) )
     return None
@@ -217,7 +1124,7 @@ cdef object PyMPI_ssend(object obj, int dest, int tag,
     cdef int dosend = (dest != MPI_PROC_NULL)
     #
     cdef object smsg = None
-    if dosend: smsg = pickle.dump(obj, &sbuf, &scount)
+    if dosend: smsg = pickle.dump(obj, &sbuf, &scount, &stype)
     with nogil: CHKERR( MPI_Ssend(sbuf, scount, stype,
                                   dest, tag, comm) )
     return None
@@ -233,7 +1140,7 @@ cdef object PyMPI_recv(object obj, int source, int tag,
     #
     cdef int dorecv = (source != MPI_PROC_NULL)
     #
-    cdef object rmsg = None
+    cdef object rmsg = None, rtmp = None
     cdef MPI_Message match = MPI_MESSAGE_NULL
     cdef MPI_Status rsts
     cdef MPI_Aint rlen = 0
@@ -244,13 +1151,13 @@ cdef object PyMPI_recv(object obj, int source, int tag,
                     CHKERR( MPI_Mprobe(source, tag, comm, &match, &rsts) )
                 else:
                     CHKERR( MPI_Probe(source, tag, comm, &rsts) )
-                CHKERR( MPI_Get_count(&rsts, rtype, &rcount) )
-            rmsg = pickle.alloc(&rbuf, rcount)
+            rlen = <MPI_Aint> PyMPI_Get_bytes(&rsts)
+            rmsg = pickle.alloc(&rbuf, rlen)
             source = rsts.MPI_SOURCE
             tag = rsts.MPI_TAG
         else:
             rmsg = getbuffer_w(obj, &rbuf, &rlen)
-            rcount = <int> rlen # XXX overflow?
+        rtmp = PyMPI_msgbytes(rmsg, rbuf, rlen, &rbuf, &rcount, &rtype)
     #
     with nogil:
         if match != MPI_MESSAGE_NULL:
@@ -259,7 +1166,8 @@ cdef object PyMPI_recv(object obj, int source, int tag,
         else:
             CHKERR( MPI_Recv(rbuf, rcount, rtype,
                              source, tag, comm, status) )
-    if dorecv: rmsg = pickle.load(rmsg)
+    if dorecv and obj is None: rmsg = pickle.loadr(rmsg)
+    elif dorecv: rmsg = pickle.load(rmsg)
     return rmsg
 
 
@@ -279,12 +1187,12 @@ cdef object PyMPI_sendrecv(object sobj, int dest,   int sendtag,
     cdef int dorecv = (source != MPI_PROC_NULL)
     #
     cdef object smsg = None
-    if dosend: smsg = pickle.dump(sobj, &sbuf, &scount)
+    if dosend: smsg = pickle.dump(sobj, &sbuf, &scount, &stype)
     cdef MPI_Request sreq = MPI_REQUEST_NULL
     with nogil: CHKERR( MPI_Isend(sbuf, scount, stype,
                                   dest, sendtag, comm, &sreq) )
     #
-    cdef object rmsg = None
+    cdef object rmsg = None, rtmp = None
     cdef MPI_Message match = MPI_MESSAGE_NULL
     cdef MPI_Status rsts
     cdef MPI_Aint rlen = 0
@@ -295,13 +1203,13 @@ cdef object PyMPI_sendrecv(object sobj, int dest,   int sendtag,
                     CHKERR( MPI_Mprobe(source, recvtag, comm, &match, &rsts) )
                 else:
                     CHKERR( MPI_Probe(source, recvtag, comm, &rsts) )
-                CHKERR( MPI_Get_count(&rsts, rtype, &rcount) )
-            rmsg = pickle.alloc(&rbuf, rcount)
+            rlen = <MPI_Aint> PyMPI_Get_bytes(&rsts)
+            rmsg = pickle.alloc(&rbuf, rlen)
             source = rsts.MPI_SOURCE
             recvtag = rsts.MPI_TAG
         else:
             rmsg = getbuffer_w(robj, &rbuf, &rlen)
-            rcount = <int> rlen # XXX overflow?
+        rtmp = PyMPI_msgbytes(rmsg, rbuf, rlen, &rbuf, &rcount, &rtype)
     #
     with nogil:
         if match != MPI_MESSAGE_NULL:
@@ -311,7 +1219,8 @@ cdef object PyMPI_sendrecv(object sobj, int dest,   int sendtag,
             CHKERR( MPI_Recv(rbuf, rcount, rtype,
                              source, recvtag, comm, status) )
         CHKERR( MPI_Wait(&sreq, MPI_STATUS_IGNORE) )
-    if dorecv: rmsg = pickle.load(rmsg)
+    if dorecv and robj is None: rmsg = pickle.loadr(rmsg)
+    elif dorecv: rmsg = pickle.load(rmsg)
     return rmsg
 
 # -----------------------------------------------------------------------------
@@ -326,7 +1235,7 @@ cdef object PyMPI_isend(object obj, int dest, int tag,
     #
     cdef object smsg = None
     cdef int dosend = (dest != MPI_PROC_NULL)
-    if dosend: smsg = pickle.dump(obj, &sbuf, &scount)
+    if dosend: smsg = pickle.dump(obj, &sbuf, &scount, &stype)
     with nogil: CHKERR( MPI_Isend(sbuf, scount, stype,
                                   dest, tag, comm, request) )
     return smsg
@@ -342,7 +1251,7 @@ cdef object PyMPI_ibsend(object obj, int dest, int tag,
     #
     cdef object smsg = None
     cdef int dosend = (dest != MPI_PROC_NULL)
-    if dosend: smsg = pickle.dump(obj, &sbuf, &scount)
+    if dosend: smsg = pickle.dump(obj, &sbuf, &scount, &stype)
     with nogil: CHKERR( MPI_Ibsend(sbuf, scount, stype,
                                    dest, tag, comm, request) )
     return smsg
@@ -358,45 +1267,249 @@ cdef object PyMPI_issend(object obj, int dest, int tag,
     #
     cdef object smsg = None
     cdef int dosend = (dest != MPI_PROC_NULL)
-    if dosend: smsg = pickle.dump(obj, &sbuf, &scount)
+    if dosend: smsg = pickle.dump(obj, &sbuf, &scount, &stype)
     with nogil: CHKERR( MPI_Issend(sbuf, scount, stype,
                                    dest, tag, comm, request) )
     return smsg
 
 
+cdef list PyMPI_irecv_queue = []
+
+cdef class _p_irecv:
+
+    # Pending receive posted without a buffer. The message is matched
+    # once it arrives, so the buffer is allocated with its exact size.
+    # Until then, the request handle is a generalized request.
+
+    cdef Request request
+    cdef MPI_Request grequest
+    cdef MPI_Comm comm
+    cdef int source
+    cdef int tag
+
+    def __cinit__(self):
+        self.request = None
+        self.grequest = MPI_REQUEST_NULL
+        self.comm = MPI_COMM_NULL
+        self.source = MPI_ANY_SOURCE
+        self.tag = MPI_ANY_TAG
+
+    def query(self, Status status):
+        status.Set_cancelled(self.request is None)
+
+    def cancel(self, bint completed):
+        if completed: return
+        if self.request is None: return
+        PyMPI_irecv_queue.remove(self)
+        self.request = None
+        CHKERR( MPI_Grequest_complete(self.grequest) )
+
+    cdef int post(self) except -1:
+        cdef _p_greq state = \
+             _p_greq(self.query, None, self.cancel, None, None)
+        with nogil: CHKERR( MPI_Grequest_start(
+            greq_query_fn, greq_free_fn, greq_cancel_fn,
+            <void*>state, &self.grequest) )
+        Py_INCREF(state)
+        self.request.ob_mpi = self.grequest
+        PyMPI_irecv_queue.append(self)
+        return 0
+
+    cdef bint match(self, MPI_Comm comm, MPI_Status *status):
+        if self.comm != comm:
+            return 0
+        if (self.source != MPI_ANY_SOURCE and
+            self.source != status.MPI_SOURCE):
+            return 0
+        if (self.tag != MPI_ANY_TAG and
+            self.tag != status.MPI_TAG):
+            return 0
+        return 1
+
+    cdef bint covers(self, _p_irecv other):
+        if self.comm != other.comm:
+            return 0
+        if (self.source != MPI_ANY_SOURCE and
+            self.source != other.source):
+            return 0
+        if (self.tag != MPI_ANY_TAG and
+            self.tag != other.tag):
+            return 0
+        return 1
+
+    cdef bint ready(self):
+        # A receive whose messages would all be taken by an earlier
+        # pending receive cannot match anything until that one does.
+        cdef _p_irecv state
+        for state in PyMPI_irecv_queue:
+            if state is self: return 1
+            if state.covers(self): return 0
+        return 1
+
+    cdef int recv(self, MPI_Message *message,
+                  MPI_Status *status) except -1:
+        cdef _p_Pickle pickle = PyMPI_pickle()
+        cdef void *rbuf = NULL
+        cdef MPI_Aint rlen = <MPI_Aint> PyMPI_Get_bytes(status)
+        cdef int rcount = 0
+        cdef MPI_Datatype rtype = MPI_BYTE
+        cdef object rmsg = pickle.alloc(&rbuf, rlen)
+        if PY_MAJOR_VERSION < 3 and rmsg is not None:
+            rmsg = getbuffer(rmsg, 1, 0)
+        cdef object rtmp = PyMPI_msgbytes(rmsg, rbuf, rlen,
+                                          &rbuf, &rcount, &rtype)
+        cdef Request request = self.request
+        PyMPI_irecv_queue.remove(self)
+        self.request = None
+        request.ob_buf = rmsg
+        with nogil:
+            CHKERR( MPI_Grequest_complete(self.grequest) )
+            CHKERR( MPI_Request_free(&self.grequest) )
+            if message[0] != MPI_MESSAGE_NULL:
+                CHKERR( MPI_Imrecv(rbuf, rcount, rtype,
+                                   message, &request.ob_mpi) )
+            else:
+                CHKERR( MPI_Irecv(rbuf, rcount, rtype,
+                                  status.MPI_SOURCE, status.MPI_TAG,
+                                  self.comm, &request.ob_mpi) )
+        return 0
+
+    cdef int probe(self, bint block) except -1:
+        cdef _p_irecv target = self
+        cdef int flag = 0
+        cdef MPI_Message message = MPI_MESSAGE_NULL
+        cdef MPI_Status rsts
+        with nogil:
+            if USE_MATCHED_RECV and block:
+                CHKERR( MPI_Mprobe(self.source, self.tag, self.comm,
+                                   &message, &rsts) )
+                flag = 1
+            elif USE_MATCHED_RECV:
+                CHKERR( MPI_Improbe(self.source, self.tag, self.comm,
+                                    &flag, &message, &rsts) )
+            elif block:
+                CHKERR( MPI_Probe(self.source, self.tag, self.comm,
+                                  &rsts) )
+                flag = 1
+            else:
+                CHKERR( MPI_Iprobe(self.source, self.tag, self.comm,
+                                   &flag, &rsts) )
+        if not flag: return 0
+        # the message goes to the earliest posted receive it matches
+        for target in PyMPI_irecv_queue:
+            if target.match(self.comm, &rsts): break
+        target.recv(&message, &rsts)
+        return 1
+
+    cdef int progress(self, bint block) except -1:
+        # With other receives pending, all of them are polled: their
+        # senders may be waiting for them to be posted.
+        cdef double delay = 0
+        while self.request is not None:
+            if len(PyMPI_irecv_queue) == 1:
+                if not self.probe(block): return 0
+            elif PyMPI_irecv_poll():
+                delay = 0
+            elif not block:
+                return 0
+            else:
+                delay = PyMPI_idle(delay)
+        return 1
+
+
+cdef int PyMPI_irecv_poll() except -1:
+    cdef _p_irecv state
+    cdef int count = 0
+    for state in list(PyMPI_irecv_queue):
+        if state.request is None: continue
+        if not state.ready(): continue
+        count += state.probe(0)
+    return count
+
+cdef double PyMPI_IDLE_MIN = 0.00001
+cdef double PyMPI_IDLE_MAX = 0.001
+cdef object PyMPI_sleep = None
+
+cdef double PyMPI_idle(double delay) except -1:
+    # Polling loops sleep with the GIL released while nothing
+    # completes, doubling the delay up to a small maximum.
+    global PyMPI_sleep
+    if PyMPI_sleep is None:
+        from time import sleep
+        PyMPI_sleep = sleep
+    PyMPI_sleep(delay)
+    if delay < PyMPI_IDLE_MIN: return PyMPI_IDLE_MIN
+    if delay < PyMPI_IDLE_MAX / 2: return 2 * delay
+    return PyMPI_IDLE_MAX
+
+cdef inline bint PyMPI_pending(object buf):
+    return type(buf) is _p_irecv or isinstance(buf, _p_icoll)
+
+cdef inline int PyMPI_progress(Request request, bint block) except -1:
+    cdef object state = request.ob_buf
+    if type(state) is _p_irecv:
+        return (<_p_irecv>state).progress(block)
+    if isinstance(state, _p_icoll):
+        return (<_p_icoll>state).progress(block)
+    return 0
+
+cdef int PyMPI_progress_all(requests, bint block) except -1:
+    # returns whether any request is still waiting for a message
+    cdef int pending = 0
+    for request in requests:
+        if request is None: continue
+        if not PyMPI_pending((<Request?>request).ob_buf): continue
+        if not PyMPI_progress(<Request>request, block): pending = 1
+    return pending
+
+
 cdef object PyMPI_irecv(object obj, int dest, int tag,
-                        MPI_Comm comm, MPI_Request *request):
-    cdef _p_Pickle pickle = PyMPI_pickle()
-    #
+                        MPI_Comm comm, Request request):
     cdef void *rbuf = NULL
     cdef MPI_Aint rlen = 0
     cdef int rcount = 0
     cdef MPI_Datatype rtype = MPI_BYTE
     #
-    cdef object rmsg = None
+    cdef object rmsg = None, rtmp = None
+    cdef _p_irecv state = None
     cdef int dorecv = (dest != MPI_PROC_NULL)
     if dorecv:
         if obj is None:
-            rcount = <int>(1<<15)
-            obj = pickle.alloc(&rbuf, rcount)
-            rmsg = getbuffer_r(obj, NULL, NULL)
+            state = <_p_irecv>_p_irecv.__new__(_p_irecv)
+            state.request = request
+            state.comm = comm
+            state.source = dest
+            state.tag = tag
+            request.ob_buf = state
+            state.post()
+            if state.ready(): state.probe(0)
+            return request.ob_buf
         #elif is_int(obj):
         #    rcount = <int> obj
         #    obj = pickle.alloc(&rbuf, rcount)
         #    rmsg = getbuffer_r(obj, NULL, NULL)
         else:
             rmsg = getbuffer_w(obj, &rbuf, &rlen)
-            rcount = <int> rlen # XXX overflow?
+            rtmp = PyMPI_msgbytes(rmsg, rbuf, rlen,
+                                  &rbuf, &rcount, &rtype)
     with nogil: CHKERR( MPI_Irecv(rbuf, rcount, rtype,
-                                  dest, tag, comm, request) )
+                                  dest, tag, comm, &request.ob_mpi) )
     return rmsg
 
 
+cdef object PyMPI_result(object buf, MPI_Status *status):
+    if isinstance(buf, _p_icoll): return (<_p_icoll>buf).result
+    if type(buf) is not _p_buffer and type(buf) is not bytearray:
+        return None
+    if PyMPI_Get_bytes(status) <= 0: return None
+    return PyMPI_pickle().load(buf)
+
+
 cdef object PyMPI_wait(Request request, Status status):
-    cdef _p_Pickle pickle = PyMPI_pickle()
     cdef object buf
     #
     cdef MPI_Status rsts
+    PyMPI_progress(request, 1)
     with nogil: CHKERR( MPI_Wait(&request.ob_mpi, &rsts) )
     buf = request.ob_buf
     if status is not None:
@@ -404,19 +1517,14 @@ cdef object PyMPI_wait(Request request, Status status):
     if request.ob_mpi == MPI_REQUEST_NULL:
         request.ob_buf = None
     #
-    cdef int rcount = 0
-    cdef MPI_Datatype rtype = MPI_BYTE
-    if type(buf) is not _p_buffer: return None
-    CHKERR( MPI_Get_count(&rsts, rtype, &rcount) )
-    if rcount <= 0: return None
-    return pickle.load(buf)
+    return PyMPI_result(buf, &rsts)
 
 
 cdef object PyMPI_test(Request request, int *flag, Status status):
-    cdef _p_Pickle pickle = PyMPI_pickle()
     cdef object buf
     #
     cdef MPI_Status rsts
+    PyMPI_progress(request, 0)
     with nogil: CHKERR( MPI_Test(&request.ob_mpi, flag, &rsts) )
     if flag[0]:
         buf = request.ob_buf
@@ -426,22 +1534,23 @@ cdef object PyMPI_test(Request request, int *flag, Status status):
         request.ob_buf = None
     #
     if not flag[0]: return None
-    cdef int rcount = 0
-    cdef MPI_Datatype rtype = MPI_BYTE
-    if type(buf) is not _p_buffer: return None
-    CHKERR( MPI_Get_count(&rsts, rtype, &rcount) )
-    if rcount <= 0: return None
-    return pickle.load(buf)
+    return PyMPI_result(buf, &rsts)
 
 
 cdef object PyMPI_waitany(requests, int *index, Status status):
-    cdef _p_Pickle pickle = PyMPI_pickle()
     cdef object buf
     #
     cdef int count = 0
     cdef MPI_Request *irequests = NULL
     cdef MPI_Status rsts
     #
+    cdef int flag = 0
+    cdef double delay = 0
+    while PyMPI_progress_all(requests, 0):
+        buf = PyMPI_testany(requests, index, &flag, status)
+        if flag: return buf
+        delay = PyMPI_idle(delay)
+    #
     cdef tmp = acquire_rs(requests, None, &count, &irequests, NULL)
     try:
         with nogil: CHKERR( MPI_Waitany(count, irequests, index, &rsts) )
@@ -453,22 +1562,17 @@ cdef object PyMPI_waitany(requests, int *index, Status status):
         release_rs(requests, None, count, irequests, NULL)
     #
     if index[0] == MPI_UNDEFINED: return None
-    cdef int rcount = 0
-    cdef MPI_Datatype rtype = MPI_BYTE
-    if type(buf) is not _p_buffer: return None
-    CHKERR( MPI_Get_count(&rsts, rtype, &rcount) )
-    if rcount <= 0: return None
-    return pickle.load(buf)
+    return PyMPI_result(buf, &rsts)
 
 
 cdef object PyMPI_testany(requests, int *index, int *flag, Status status):
-    cdef _p_Pickle pickle = PyMPI_pickle()
     cdef object buf
     #
     cdef int count = 0
     cdef MPI_Request *irequests = NULL
     cdef MPI_Status rsts
     #
+    PyMPI_progress_all(requests, 0)
     cdef tmp = acquire_rs(requests, None, &count, &irequests, NULL)
     try:
         with nogil: CHKERR( MPI_Testany(count, irequests, index, flag, &rsts) )
@@ -481,68 +1585,106 @@ cdef object PyMPI_testany(requests, int *index, int *flag, Status status):
     #
     if index[0] == MPI_UNDEFINED: return None
     if not flag[0]: return None
-    cdef int rcount = 0
-    cdef MPI_Datatype rtype = MPI_BYTE
-    if type(buf) is not _p_buffer: return None
-    CHKERR( MPI_Get_count(&rsts, rtype, &rcount) )
-    if rcount <= 0: return None
-    return pickle.load(buf)
+    return PyMPI_result(buf, &rsts)
 
 
 cdef object PyMPI_waitall(requests, statuses):
-    cdef _p_Pickle pickle = PyMPI_pickle()
-    cdef object buf, bufs
+    cdef object bufs
     #
     cdef Py_ssize_t i = 0
     cdef int count = 0
     cdef MPI_Request *irequests = NULL
     cdef MPI_Status *istatuses = MPI_STATUSES_IGNORE
     #
+    PyMPI_progress_all(requests, 1)
     cdef tmp = acquire_rs(requests, True, &count, &irequests, &istatuses)
     try:
         with nogil: CHKERR( MPI_Waitall(count, irequests, istatuses) )
         bufs = [(<Request>requests[i]).ob_buf for i from 0 <= i < count]
     finally:
-        release_rs(requests, statuses, count, irequests, NULL)
+        release_rs(requests, statuses, count, irequests, istatuses)
     #
-    cdef int rcount = 0
-    cdef MPI_Datatype rtype = MPI_BYTE
-    for i from 0 <= i < count:
-        if type(bufs[i]) is not _p_buffer:
-            bufs[i] = None; continue
-        rcount = 0
-        CHKERR( MPI_Get_count(&istatuses[i], rtype, &rcount) )
-        if rcount <= 0: bufs[i] = None
-    return [pickle.load(buf) for buf in bufs]
+    return [PyMPI_result(bufs[i], &istatuses[i]) for i in range(count)]
 
 
 cdef object PyMPI_testall(requests, int *flag, statuses):
-    cdef _p_Pickle pickle = PyMPI_pickle()
-    cdef object buf, bufs
+    cdef object bufs
     #
     cdef Py_ssize_t i = 0
     cdef int count = 0
     cdef MPI_Request *irequests = NULL
     cdef MPI_Status *istatuses = MPI_STATUSES_IGNORE
     #
+    PyMPI_progress_all(requests, 0)
     cdef tmp = acquire_rs(requests, True, &count, &irequests, &istatuses)
     try:
         with nogil: CHKERR( MPI_Testall(count, irequests, flag, istatuses) )
         if flag[0]:
             bufs = [(<Request>requests[i]).ob_buf for i from 0 <= i < count]
     finally:
-        release_rs(requests, statuses, count, irequests, NULL)
+        release_rs(requests, statuses, count, irequests, istatuses)
     #
     if not flag[0]: return None
-    cdef int rcount = 0
-    cdef MPI_Datatype rtype = MPI_BYTE
-    for i from 0 <= i < count:
-        if type(bufs[i]) is not _p_buffer:
-            bufs[i] = None; continue
-        rcount = 0
-        CHKERR( MPI_Get_count(&istatuses[i], rtype, &rcount) )
-        if rcount <= 0: bufs[i] = None
-    return [pickle.load(buf) for buf in bufs]
+    return [PyMPI_result(bufs[i], &istatuses[i]) for i in range(count)]
+
+
+cdef object PyMPI_waitsome(requests, statuses):
+    cdef object bufs, indices, objects
+    #
+    cdef Py_ssize_t i = 0
+    cdef int incount = 0
+    cdef MPI_Request *irequests = NULL
+    cdef int outcount = MPI_UNDEFINED, *iindices = NULL
+    cdef MPI_Status *istatuses = MPI_STATUSES_IGNORE
+    #
+    cdef double delay = 0
+    while PyMPI_progress_all(requests, 0):
+        indices, objects = PyMPI_testsome(requests, statuses)
+        if indices is None or indices: return (indices, objects)
+        delay = PyMPI_idle(delay)
+    #
+    cdef tmp1 = acquire_rs(requests, True, &incount, &irequests, &istatuses)
+    cdef tmp2 = allocate_int(incount, &iindices)
+    try:
+        with nogil: CHKERR( MPI_Waitsome(
+            incount, irequests, &outcount, iindices, istatuses) )
+        if outcount != MPI_UNDEFINED:
+            bufs = [(<Request>requests[iindices[i]]).ob_buf
+                    for i in range(outcount)]
+    finally:
+        release_rs(requests, statuses, incount, irequests, istatuses)
+    #
+    if outcount == MPI_UNDEFINED: return (None, None)
+    indices = [iindices[i] for i in range(outcount)]
+    objects = [PyMPI_result(bufs[i], &istatuses[i]) for i in range(outcount)]
+    return (indices, objects)
+
+
+cdef object PyMPI_testsome(requests, statuses):
+    cdef object bufs, indices, objects
+    #
+    cdef Py_ssize_t i = 0
+    cdef int incount = 0
+    cdef MPI_Request *irequests = NULL
+    cdef int outcount = MPI_UNDEFINED, *iindices = NULL
+    cdef MPI_Status *istatuses = MPI_STATUSES_IGNORE
+    #
+    PyMPI_progress_all(requests, 0)
+    cdef tmp1 = acquire_rs(requests, True, &incount, &irequests, &istatuses)
+    cdef tmp2 = allocate_int(incount, &iindices)
+    try:
+        with nogil: CHKERR( MPI_Testsome(
+            incount, irequests, &outcount, iindices, istatuses) )
+        if outcount != MPI_UNDEFINED:
+            bufs = [(<Request>requests[iindices[i]]).ob_buf
+                    for i in range(outcount)]
+    finally:
+        release_rs(requests, statuses, incount, irequests, istatuses)
+    #
+    if outcount == MPI_UNDEFINED: return (None, None)
+    indices = [iindices[i] for i in range(outcount)]
+    objects = [PyMPI_result(bufs[i], &istatuses[i]) for i in range(outcount)]
+    return (indices, objects)
 
 # -----------------------------------------------------------------------------
 
@@ -550,28 +1692,24 @@ cdef object PyMPI_mprobe(int source, int tag, MPI_Comm comm,
                          MPI_Message *message, MPI_Status *status):
     cdef _p_Pickle pickle = PyMPI_pickle()
     cdef void* rbuf = NULL
-    cdef int rcount = 0
-    cdef MPI_Datatype rtype = MPI_BYTE
     cdef MPI_Status rsts
     if (status == MPI_STATUS_IGNORE): status = &rsts
     with nogil: CHKERR( MPI_Mprobe(source, tag, comm, message, status) )
     if message[0] == MPI_MESSAGE_NO_PROC: return None
-    CHKERR( MPI_Get_count(status, rtype, &rcount) )
-    cdef object rmsg = pickle.alloc(&rbuf, rcount)
+    cdef MPI_Count rlen = PyMPI_Get_bytes(status)
+    cdef object rmsg = pickle.alloc(&rbuf, rlen)
     return rmsg
 
 cdef object PyMPI_improbe(int source, int tag, MPI_Comm comm, int *flag,
                           MPI_Message *message, MPI_Status *status):
     cdef _p_Pickle pickle = PyMPI_pickle()
     cdef void* rbuf = NULL
-    cdef int rcount = 0
-    cdef MPI_Datatype rtype = MPI_BYTE
     cdef MPI_Status rsts
     if (status == MPI_STATUS_IGNORE): status = &rsts
     with nogil: CHKERR( MPI_Improbe(source, tag, comm, flag, message, status) )
     if flag[0] == 0 or message[0] == MPI_MESSAGE_NO_PROC: return None
-    CHKERR( MPI_Get_count(status, rtype, &rcount) )
-    cdef object rmsg = pickle.alloc(&rbuf, rcount)
+    cdef MPI_Count rlen = PyMPI_Get_bytes(status)
+    cdef object rmsg = pickle.alloc(&rbuf, rlen)
     return rmsg
 
 cdef object PyMPI_mrecv(object rmsg,
@@ -588,9 +1726,11 @@ cdef object PyMPI_mrecv(object rmsg,
         getbuffer_r(rmsg, &rbuf, &rlen)
     else:
         rmsg = getbuffer_w(rmsg, &rbuf, &rlen)
-    cdef int rcount = <int> rlen # XXX overflow?
+    cdef int rcount = 0
+    cdef object rtmp = PyMPI_msgbytes(rmsg, rbuf, rlen,
+                                      &rbuf, &rcount, &rtype)
     with nogil: CHKERR( MPI_Mrecv(rbuf, rcount, rtype, message, status) )
-    rmsg = pickle.load(rmsg)
+    rmsg = pickle.loadr(rmsg)
     return rmsg
 
 cdef object PyMPI_imrecv(object rmsg,
@@ -607,12 +1747,529 @@ cdef object PyMPI_imrecv(object rmsg,
         rmsg = getbuffer_r(rmsg, &rbuf, &rlen)
     else:
         rmsg = getbuffer_w(rmsg, &rbuf, &rlen)
-    cdef int rcount = <int> rlen # XXX overflow?
+    cdef int rcount = 0
+    cdef object rtmp = PyMPI_msgbytes(rmsg, rbuf, rlen,
+                                      &rbuf, &rcount, &rtype)
     with nogil: CHKERR( MPI_Imrecv(rbuf, rcount, rtype, message, request) )
     return rmsg
 
 # -----------------------------------------------------------------------------
 
+# Pickling sessions. Objects sent through a session are pickled with
+# persistent ids in place of the classes, functions and short interned
+# strings (attribute names, keywords) the session has already sent,
+# thus streams of similar objects do not carry class paths and
+# attribute names over and over. A message starts
+# with the length of a pickled list of the objects entering the table,
+# which the receiver appends to its own table before loading the rest.
+# Messages from a process with a given tag are received in the order
+# they were sent, thus the tables at both ends stay in sync.
+
+cdef object PyBytesIO_New = None
+cdef object PyFunctionType = None
+from io import BytesIO as PyBytesIO_New
+from types import FunctionType as PyFunctionType
+
+cdef extern from "Python.h":
+    bint PyType_Check(object)
+
+cdef extern from *:
+    bint PyMPIString_CHECK_INTERNED(object)
+
+cdef enum:
+    PyMPI_SESSION_MINSTR = 2
+    PyMPI_SESSION_MAXSTR = 64
+    PyMPI_SESSION_MAXOBJ = 1<<16
+
+cdef object PyMPI_sendraw(object msg, int dest, int tag, MPI_Comm comm):
+    cdef void *sbuf = NULL
+    cdef int scount = 0
+    cdef MPI_Datatype stype = MPI_BYTE
+    cdef object smsg = PyMPI_msgbytes(msg, PyBytes_AsString(msg),
+                                      PyBytes_Size(msg),
+                                      &sbuf, &scount, &stype)
+    with nogil: CHKERR( MPI_Send(sbuf, scount, stype,
+                                 dest, tag, comm) )
+    return None
+
+cdef object PyMPI_recvraw(int source, int tag,
+                          MPI_Comm comm, MPI_Status *status):
+    cdef _p_Pickle pickle = PyMPI_pickle()
+    cdef void *rbuf = NULL
+    cdef int rcount = 0
+    cdef MPI_Datatype rtype = MPI_BYTE
+    cdef object rmsg = None, rtmp = None
+    cdef MPI_Message match = MPI_MESSAGE_NULL
+    cdef MPI_Status rsts
+    with nogil:
+        if USE_MATCHED_RECV:
+            CHKERR( MPI_Mprobe(source, tag, comm, &match, &rsts) )
+        else:
+            CHKERR( MPI_Probe(source, tag, comm, &rsts) )
+    cdef MPI_Aint rlen = <MPI_Aint> PyMPI_Get_bytes(&rsts)
+    rmsg = pickle.alloc(&rbuf, rlen)
+    rtmp = PyMPI_msgbytes(rmsg, rbuf, rlen, &rbuf, &rcount, &rtype)
+    with nogil:
+        if match != MPI_MESSAGE_NULL:
+            CHKERR( MPI_Mrecv(rbuf, rcount, rtype, &match, status) )
+        else:
+            CHKERR( MPI_Recv(rbuf, rcount, rtype,
+                             rsts.MPI_SOURCE, rsts.MPI_TAG, comm, status) )
+    return rmsg
+
+
+cdef class _p_session:
+
+    cdef Comm comm
+    cdef int peer
+    cdef int tag
+    cdef dict sids
+    cdef list snew
+    cdef list robjs
+
+    def __cinit__(self, Comm comm not None, int peer, int tag):
+        self.comm = comm
+        self.peer = peer
+        self.tag = tag
+        self.sids = {}
+        self.snew = []
+        self.robjs = []
+
+    def persistent_id(self, obj):
+        cdef object t = type(obj)
+        if t is str:
+            if len(obj) < PyMPI_SESSION_MINSTR: return None
+            if len(obj) > PyMPI_SESSION_MAXSTR: return None
+            if not PyMPIString_CHECK_INTERNED(obj): return None
+        elif t is not PyFunctionType and not PyType_Check(obj):
+            return None
+        cdef object index = self.sids.get(obj)
+        if index is None:
+            if len(self.sids) >= PyMPI_SESSION_MAXOBJ: return None
+            index = len(self.sids)
+            self.sids[obj] = index
+            self.snew.append(obj)
+        return index
+
+    def dumps(self, obj):
+        """Pickle an object for the peer process"""
+        cdef _p_Pickle pickle = PyMPI_pickle()
+        cdef object protocol = pickle.ob_PROTOCOL
+        if protocol is None or protocol < 0:
+            protocol = PyPickle_HIGHEST_PROTOCOL
+        if protocol < 1: protocol = 1
+        cdef object data = PyBytesIO_New()
+        cdef object pickler = PyPickle_Pickler(data, protocol)
+        pickler.persistent_id = self.persistent_id
+        cdef object head = b''
+        try:
+            pickler.dump(obj)
+            if self.snew: head = PyPickle_dumps(self.snew, protocol)
+        except:
+            for item in self.snew: del self.sids[item]
+            raise
+        finally:
+            del self.snew[:]
+        cdef long long hlen = PyBytes_Size(head)
+        cdef object hdr = PyBytes_FromStringAndSize(<char*>&hlen,
+                                                    sizeof(long long))
+        return b''.join([hdr, head, data.getvalue()])
+
+    def loads(self, buf):
+        """Unpickle an object from the peer process"""
+        cdef char *p = NULL
+        cdef MPI_Aint n = 0
+        cdef long long hlen = 0
+        buf = getbuffer_r(buf, <void**>&p, &n)
+        if n >= <MPI_Aint>sizeof(long long):
+            memcpy(&hlen, p, sizeof(long long))
+            p += sizeof(long long)
+            n -= sizeof(long long)
+        if hlen < 0 or hlen > n or n == 0:
+            raise ValueError("invalid session message")
+        if hlen > 0:
+            self.robjs.extend(PyPickle_loads(
+                PyBytes_FromStringAndSize(p, <Py_ssize_t>hlen)))
+        cdef object data = PyBytes_FromStringAndSize(
+            p + hlen, <Py_ssize_t>(n - hlen))
+        cdef object unpickler = PyPickle_Unpickler(PyBytesIO_New(data))
+        unpickler.persistent_load = self.robjs.__getitem__
+        return unpickler.load()
+
+    def send(self, obj):
+        """Send an object to the peer process"""
+        if self.peer == MPI_PROC_NULL: return None
+        PyMPI_sendraw(self.dumps(obj), self.peer, self.tag, self.comm.ob_mpi)
+        return None
+
+    def recv(self, Status status=None):
+        """Receive an object from the peer process"""
+        cdef MPI_Status *statusp = arg_Status(status)
+        if self.peer == MPI_PROC_NULL:
+            if statusp != MPI_STATUS_IGNORE:
+                CHKERR( MPI_Recv(NULL, 0, MPI_BYTE, MPI_PROC_NULL,
+                                 self.tag, self.comm.ob_mpi, statusp) )
+            return None
+        cdef object rmsg = PyMPI_recvraw(self.peer, self.tag,
+                                         self.comm.ob_mpi, statusp)
+        return self.loads(rmsg)
+
+# -----------------------------------------------------------------------------
+
+# Collective operations partially or fully implemented with point-to-
+# point messages use a private duplicate of the user communicator,
+# cached as an attribute and freed along with it. Collective calls are
+# issued in the same order at all processes and every receive names
+# its source, thus a single tag value is enough to match messages.
+# Sparse exchanges receive from any source, so they use two other tags
+# alternately, see PyMPI_sparse_exchange(). Nonblocking collectives use
+# another private duplicate, created the first time one is started.
+
+cdef int PyMPI_Commctx_KEYVAL = MPI_KEYVAL_INVALID
+cdef int PyMPI_Commctx_TAG = 0
+
+cdef struct PyMPI_Commctx_t:
+    MPI_Comm comm
+    MPI_Comm icomm
+    unsigned int exchanges
+
+@cython.callspec("PyMPIAPI")
+cdef int PyMPI_Commctx_free_fn(MPI_Comm comm,
+                               int keyval,
+                               void *attrval,
+                               void *extra_state) nogil:
+    cdef PyMPI_Commctx_t *ctx = <PyMPI_Commctx_t*>attrval
+    cdef int ierr = MPI_SUCCESS
+    if ctx == NULL: return MPI_SUCCESS
+    if ctx.comm != MPI_COMM_NULL:
+        ierr = MPI_Comm_free(&ctx.comm)
+    if ctx.icomm != MPI_COMM_NULL and ierr == MPI_SUCCESS:
+        ierr = MPI_Comm_free(&ctx.icomm)
+    free(ctx)
+    return ierr
+
+cdef PyMPI_Commctx_t *PyMPI_Commctx_get(MPI_Comm comm) except NULL:
+    global PyMPI_Commctx_KEYVAL
+    cdef PyMPI_Commctx_t *attrval = NULL
+    cdef int found = 0
+    if PyMPI_Commctx_KEYVAL == MPI_KEYVAL_INVALID:
+        CHKERR( MPI_Comm_create_keyval(MPI_COMM_NULL_COPY_FN,
+                                       PyMPI_Commctx_free_fn,
+                                       &PyMPI_Commctx_KEYVAL, NULL) )
+    CHKERR( MPI_Comm_get_attr(comm, PyMPI_Commctx_KEYVAL,
+                              <void*>&attrval, &found) )
+    if not found:
+        attrval = <PyMPI_Commctx_t*>malloc(sizeof(PyMPI_Commctx_t))
+        if attrval == NULL: raise MemoryError
+        attrval.comm = MPI_COMM_NULL
+        attrval.icomm = MPI_COMM_NULL
+        attrval.exchanges = 0
+        try:
+            CHKERR( MPI_Comm_dup(comm, &attrval.comm) )
+            CHKERR( MPI_Comm_set_attr(comm, PyMPI_Commctx_KEYVAL,
+                                      <void*>attrval) )
+        except:
+            if attrval.comm != MPI_COMM_NULL:
+                MPI_Comm_free(&attrval.comm)
+            free(attrval)
+            raise
+    return attrval
+
+cdef int PyMPI_Commctx(MPI_Comm comm, MPI_Comm *ctx) except -1:
+    ctx[0] = PyMPI_Commctx_get(comm).comm
+    return 0
+
+cdef int PyMPI_Commctx_icoll(MPI_Comm comm, MPI_Comm *ctx) except -1:
+    cdef PyMPI_Commctx_t *attrval = PyMPI_Commctx_get(comm)
+    if attrval.icomm == MPI_COMM_NULL:
+        CHKERR( MPI_Comm_dup(comm, &attrval.icomm) )
+    ctx[0] = attrval.icomm
+    return 0
+
+# -----------------------------------------------------------------------------
+
+# Eager protocol. The length of a message travels in a fixed-size block
+# along with the message itself whenever it fits, thus collectives on
+# small objects complete in a single round. Larger messages take a
+# second round, which every process can tell from the block lengths.
+
+cdef extern from "string.h":
+    void *memcpy(void*, void*, size_t) nogil
+    void *memchr(void*, int, size_t) nogil
+
+cdef enum:
+    PyMPI_EAGER_BCAST  = 1024
+    PyMPI_EAGER_VECTOR = 256
+    PyMPI_EAGER_ERROR  = -PyMPI_MSG_CHUNK_MAX-1
+
+cdef inline bint PyMPI_eager_fits(long long nbytes, int bsize):
+    return nbytes <= bsize - <int>sizeof(long long)
+
+cdef inline long long PyMPI_eager_len(char *block):
+    cdef long long nbytes = 0
+    memcpy(&nbytes, block, sizeof(long long))
+    return nbytes
+
+cdef int PyMPI_eager_put(object msg, char *block, int bsize) except -1:
+    cdef long long nbytes = PyMPI_msgsize(msg)
+    memcpy(block, &nbytes, sizeof(long long))
+    if nbytes == 0 or not PyMPI_eager_fits(nbytes, bsize): return 0
+    if type(msg) is _p_msgtype: msg = (<_p_msgtype>msg).ob
+    memcpy(block + sizeof(long long), PyBytes_AsString(msg), <size_t>nbytes)
+    return 0
+
+cdef object PyMPI_eager_get(_p_Pickle pickle, char *block):
+    cdef long long nbytes = PyMPI_eager_len(block)
+    cdef void *p = NULL
+    cdef object msg = pickle.alloc(&p, nbytes)
+    if nbytes > 0: memcpy(p, block + sizeof(long long), <size_t>nbytes)
+    return msg
+
+# -----------------------------------------------------------------------------
+
+# Segmented broadcast. When pickle.BCAST_CHUNK is set, the root pickles
+# objects into a writer that broadcasts the stream in segments as soon
+# as they are known, while the other processes unpickle from a reader
+# that receives segments as they are needed. The eager block carries
+# the size of the first segment as a negative length, and every
+# segment starts with the size of the next one, zero after the last.
+# A negative size signals that pickling failed at the root, as does
+# PyMPI_EAGER_ERROR in the eager block if it failed before the first
+# segment. Segments are at most pickle.MSG_CHUNK long, whatever the
+# value of pickle.BCAST_CHUNK. The root drops segments once sent, and
+# then unpickles its copy of the object from a new pickle stream. Time
+# spent broadcasting segments is not charged to pickling.
+
+#@cython.internal
+cdef class _p_bcast_writer:
+
+    cdef MPI_Comm comm
+    cdef int root
+    cdef long long chunk
+    cdef list pieces
+    cdef Py_ssize_t index
+    cdef Py_ssize_t offset
+    cdef long long pending
+    cdef long long segment
+    cdef long long header
+    cdef long long nbytes
+    cdef double wait
+
+    def __cinit__(self, long long chunk):
+        self.comm = MPI_COMM_NULL
+        self.root = MPI_PROC_NULL
+        self.chunk = chunk
+        self.pieces = []
+        self.index = 0
+        self.offset = 0
+        self.pending = 0
+        self.segment = -1
+        self.header = 0
+        self.nbytes = 0
+        self.wait = 0
+
+    def write(self, data):
+        cdef _p_buffer buf = getbuffer_r(data, NULL, NULL)
+        self.pieces.append(buf)
+        self.pending += buf.view.len
+        self.nbytes += buf.view.len
+        self.flush(0)
+        return buf.view.len
+
+    cdef int flush(self, bint final) except -1:
+        cdef char eager[PyMPI_EAGER_BCAST]
+        cdef long long nbytes = 0
+        cdef double start = 0
+        if self.segment < 0:
+            if final or self.pending < self.chunk: return 0
+            self.segment = self.chunk
+            nbytes = -self.segment
+            memcpy(eager, &nbytes, sizeof(long long))
+            start = MPI_Wtime()
+            with nogil: CHKERR( MPI_Bcast(eager, PyMPI_EAGER_BCAST, MPI_BYTE,
+                                          self.root, self.comm) )
+            self.wait += MPI_Wtime() - start
+        while self.segment > 0:
+            if self.pending - self.segment >= self.chunk:
+                self.send(self.chunk)
+            elif final:
+                self.send(self.pending - self.segment)
+            else:
+                break
+        return 0
+
+    cdef int send(self, long long nxt) except -1:
+        cdef _p_msgtype msg = _p_msgtype()
+        cdef _p_buffer buf
+        cdef Py_ssize_t k = 0, n = <Py_ssize_t>self.segment
+        self.header = nxt
+        msg.add(&self.header, sizeof(long long))
+        while n > 0:
+            buf = <_p_buffer>self.pieces[self.index]
+            k = buf.view.len - self.offset
+            if k > n: k = n
+            msg.add(<char*>buf.view.buf + self.offset, k)
+            self.offset += k
+            n -= k
+            if self.offset == buf.view.len:
+                self.index += 1
+                self.offset = 0
+        msg.commit()
+        cdef double start = MPI_Wtime()
+        with nogil: CHKERR( MPI_Bcast(MPI_BOTTOM, 1, msg.dtype,
+                                      self.root, self.comm) )
+        self.wait += MPI_Wtime() - start
+        del self.pieces[:self.index]
+        self.index = 0
+        self.pending -= self.segment
+        self.segment = nxt
+        return 0
+
+    cdef int abort(self) except -1:
+        cdef char eager[PyMPI_EAGER_BCAST]
+        cdef long long nbytes = PyMPI_EAGER_ERROR
+        if self.segment > 0:
+            self.send(-1)
+        elif self.segment < 0:
+            self.segment = 0
+            memcpy(eager, &nbytes, sizeof(long long))
+            with nogil: CHKERR( MPI_Bcast(eager, PyMPI_EAGER_BCAST, MPI_BYTE,
+                                          self.root, self.comm) )
+        return 0
+
+    cdef object tobytes(self):
+        cdef object data = PyBytes_FromStringAndSize(NULL, self.pending)
+        cdef char *p = PyBytes_AsString(data)
+        cdef _p_buffer buf
+        for buf in self.pieces:
+            memcpy(p, buf.view.buf, <size_t>buf.view.len)
+            p += buf.view.len
+        return data
+
+
+#@cython.internal
+cdef class _p_bcast_reader:
+
+    cdef MPI_Comm comm
+    cdef int root
+    cdef long long segment
+    cdef object buf
+    cdef char *base
+    cdef Py_ssize_t pos
+    cdef Py_ssize_t end
+    cdef long long nbytes
+    cdef double wait
+
+    def __cinit__(self):
+        self.comm = MPI_COMM_NULL
+        self.root = MPI_PROC_NULL
+        self.segment = 0
+        self.buf = None
+        self.base = NULL
+        self.pos = 0
+        self.end = 0
+        self.nbytes = 0
+        self.wait = 0
+
+    cdef int fetch(self) except -1:
+        cdef void *p = NULL
+        cdef int n = 0
+        cdef long long header = 0
+        self.pos = self.end = 0
+        if self.segment <= 0: return 0
+        n = <int>(sizeof(long long) + self.segment)
+        if self.buf is None: self.buf = allocate(n, 1, <void**>&self.base)
+        p = self.base
+        cdef double start = MPI_Wtime()
+        with nogil: CHKERR( MPI_Bcast(p, n, MPI_BYTE,
+                                      self.root, self.comm) )
+        self.wait += MPI_Wtime() - start
+        memcpy(&header, p, sizeof(long long))
+        self.base = <char*>p
+        if header < 0:
+            self.segment = 0
+            raise RuntimeError("pickling failed at the root process")
+        self.pos = sizeof(long long)
+        self.end = n
+        self.nbytes += self.segment
+        self.segment = header
+        return 1
+
+    cdef int drain(self) except -1:
+        while self.segment > 0:
+            self.fetch()
+        return 0
+
+    cdef Py_ssize_t readn(self, char *p, Py_ssize_t n) except -1:
+        cdef Py_ssize_t k = 0, count = 0
+        while count < n:
+            if self.pos == self.end:
+                if not self.fetch(): break
+                continue
+            k = self.end - self.pos
+            if k > n - count: k = n - count
+            memcpy(p + count, self.base + self.pos, <size_t>k)
+            self.pos += k
+            count += k
+        return count
+
+    def read(self, Py_ssize_t n=-1):
+        cdef list chunks = []
+        if n < 0:
+            while self.pos < self.end or self.fetch():
+                chunks.append(self.read(self.end - self.pos))
+            return b''.join(chunks)
+        cdef object data = PyBytes_FromStringAndSize(NULL, n)
+        cdef Py_ssize_t count = self.readn(PyBytes_AsString(data), n)
+        if count < n: data = data[:count]
+        return data
+
+    def readinto(self, b):
+        cdef void *p = NULL
+        cdef MPI_Aint n = 0
+        cdef _p_buffer buf = getbuffer_w(b, &p, &n)
+        return self.readn(<char*>p, n)
+
+    def readline(self):
+        cdef list chunks = []
+        cdef char *q = NULL
+        cdef Py_ssize_t k = 0
+        while True:
+            if self.pos == self.end:
+                if not self.fetch(): break
+                continue
+            k = self.end - self.pos
+            q = <char*>memchr(self.base + self.pos, c'\n', <size_t>k)
+            if q != NULL: k = q - (self.base + self.pos) + 1
+            chunks.append(PyBytes_FromStringAndSize(self.base + self.pos, k))
+            self.pos += k
+            if q != NULL: break
+        return b''.join(chunks)
+
+
+cdef object PyMPI_bcast_load(_p_Pickle pickle, _p_bcast_reader reader):
+    # a custom loads() gets the whole pickle stream, otherwise objects
+    # are unpickled as segments arrive
+    cdef double start = 0
+    cdef object obj = None
+    cdef _p_stat stat = None
+    try:
+        if pickle.ob_loads is not None:
+            return pickle.load(reader.read())
+        if pickle.stats is None:
+            return PyPickle_Unpickler(reader).load()
+        start = MPI_Wtime()
+        obj = PyPickle_Unpickler(reader).load()
+        stat = pickle.stats.current()
+        stat.loads += 1
+        stat.bytes_in += reader.nbytes
+        stat.loads_time += MPI_Wtime() - start - reader.wait
+        return obj
+    finally:
+        reader.drain()
+
+# -----------------------------------------------------------------------------
+
 cdef object PyMPI_barrier(MPI_Comm comm):
     with nogil: CHKERR( MPI_Barrier(comm) )
     return None
@@ -625,6 +2282,8 @@ cdef object PyMPI_bcast(object obj,
     cdef void *buf = NULL
     cdef int count = 0
     cdef MPI_Datatype dtype = MPI_BYTE
+    cdef char eager[PyMPI_EAGER_BCAST]
+    cdef int esize = PyMPI_EAGER_BCAST
     #
     cdef int dosend=0, dorecv=0
     cdef int inter=0, rank=0
@@ -643,18 +2302,106 @@ cdef object PyMPI_bcast(object obj,
         else:
             dosend=0; dorecv=1;
     #
+    # in intercommunicators, the processes in the root group other
+    # than the root cannot tell the length, so there is always a
+    # second round, and the first one carries only the length
+    if inter: esize = sizeof(long long)
     cdef object smsg = None
-    if dosend: smsg = pickle.dump(obj, &buf, &count)
-    with nogil: CHKERR( MPI_Bcast(&count, 1, MPI_INT,
+    cdef _p_bcast_writer writer = None
+    cdef _p_bcast_reader reader = None
+    cdef double start = 0
+    cdef _p_stat stat = None
+    if dosend and not inter and pickle.segmented(obj):
+        chunk = min(pickle.ob_BCAST_CHUNK, PyMPI_MSG_CHUNK)
+        writer = _p_bcast_writer(chunk)
+        writer.comm = comm
+        writer.root = root
+        start = MPI_Wtime()
+        try:
+            PyPickle_Pickler(writer, pickle.ob_PROTOCOL).dump(obj)
+            writer.flush(1)
+        except:
+            writer.abort()
+            raise
+        if pickle.stats is not None:
+            stat = pickle.stats.current()
+            stat.dumps += 1
+            stat.bytes_out += writer.nbytes
+            stat.dumps_time += MPI_Wtime() - start - writer.wait
+        if writer.segment == 0:
+            writer = None
+            smsg = pickle.dumpm(obj, &buf, &count, &dtype)
+            return pickle.load(smsg)
+        smsg = writer.tobytes()
+        smsg = PyMPI_msgbytes(smsg, PyBytes_AsString(smsg), PyBytes_Size(smsg),
+                              &buf, &count, &dtype)
+    elif dosend:
+        smsg = pickle.dump(obj, &buf, &count, &dtype)
+    PyMPI_eager_put(smsg, eager, esize)
+    with nogil: CHKERR( MPI_Bcast(eager, esize, MPI_BYTE,
                                   root, comm) )
-    cdef object rmsg = None
-    if dorecv and dosend: rmsg = smsg
-    elif dorecv: rmsg = pickle.alloc(&buf, count)
+    cdef long long nbytes = PyMPI_eager_len(eager)
+    if nbytes == PyMPI_EAGER_ERROR:
+        raise RuntimeError("pickling failed at the root process")
+    if nbytes < 0:
+        reader = _p_bcast_reader()
+        reader.comm = comm
+        reader.root = root
+        reader.segment = -nbytes
+        return PyMPI_bcast_load(pickle, reader)
+    cdef object rmsg = None, rtmp = None
+    if not inter and PyMPI_eager_fits(nbytes, esize):
+        if dorecv and dosend: return pickle.load(smsg)
+        if dorecv: rmsg = PyMPI_eager_get(pickle, eager)
+        if dorecv: rmsg = pickle.loadr(rmsg)
+        return rmsg
+    if dorecv and not dosend:
+        rmsg = pickle.alloc(&buf, nbytes)
+        rtmp = PyMPI_msgbytes(rmsg, buf, nbytes, &buf, &count, &dtype)
     with nogil: CHKERR( MPI_Bcast(buf, count, dtype,
                                   root, comm) )
-    if dorecv: rmsg = pickle.load(rmsg)
+    if dorecv and dosend: return pickle.load(smsg)
+    if dorecv: rmsg = pickle.loadr(rmsg)
     return rmsg
 
+# -----------------------------------------------------------------------------
+
+# Vector collectives exchange the per-process message lengths in eager
+# blocks. In gather() and scatter(), messages not fitting in their block
+# are then sent point-to-point on the private communicator of the
+# process group. In allgather() and alltoall(), messages longer than
+# MSG_LIMIT/size bytes (which every party involved can tell on its own)
+# are left out of the vector collective, so counts and displacements
+# always fit in an int, and are sent point-to-point instead.
+
+cdef MPI_Count PyMPI_msglimit(MPI_Comm comm) except -1:
+    cdef int inter=0, size=0, rsize=0
+    CHKERR( MPI_Comm_test_inter(comm, &inter) )
+    CHKERR( MPI_Comm_size(comm, &size) )
+    if inter:
+        CHKERR( MPI_Comm_remote_size(comm, &rsize) )
+        if rsize > size: size = rsize
+    return PyMPI_MSG_LIMIT // size
+
+cdef int PyMPI_sendmsg(object msg, int dest, int tag,
+                       MPI_Comm comm) except -1:
+    cdef void *buf = NULL
+    cdef int count = 0
+    cdef MPI_Datatype dtype = MPI_BYTE
+    PyMPI_msgspec(msg, &buf, &count, &dtype)
+    with nogil: CHKERR( MPI_Send(buf, count, dtype, dest, tag, comm) )
+    return 0
+
+cdef int PyMPI_isendmsg(object msg, int dest, int tag,
+                        MPI_Comm comm, MPI_Request *request) except -1:
+    cdef void *buf = NULL
+    cdef int count = 0
+    cdef MPI_Datatype dtype = MPI_BYTE
+    PyMPI_msgspec(msg, &buf, &count, &dtype)
+    with nogil: CHKERR( MPI_Isend(buf, count, dtype,
+                                  dest, tag, comm, request) )
+    return 0
+
 
 cdef object PyMPI_gather(object sendobj, object recvobj,
                          int root, MPI_Comm comm):
@@ -663,10 +2410,11 @@ cdef object PyMPI_gather(object sendobj, object recvobj,
     cdef void *sbuf = NULL
     cdef int scount = 0
     cdef MPI_Datatype stype = MPI_BYTE
-    cdef void *rbuf = NULL
+    cdef char sblock[PyMPI_EAGER_VECTOR]
+    cdef char *rblocks = NULL
     cdef int *rcounts = NULL
     cdef int *rdispls = NULL
-    cdef MPI_Datatype rtype = MPI_BYTE
+    cdef int esize = PyMPI_EAGER_VECTOR
     #
     cdef int dosend=0, dorecv=0
     cdef int inter=0, size=0, rank=0
@@ -687,21 +2435,46 @@ cdef object PyMPI_gather(object sendobj, object recvobj,
         else:
             dosend=1; dorecv=0;
     #
-    cdef object tmp1=None, tmp2=None
-    if dorecv: tmp1 = allocate_int(size, &rcounts)
-    if dorecv: tmp2 = allocate_int(size, &rdispls)
+    cdef object tmp1=None, tmp2=None, tmp3=None
+    if dorecv: tmp1 = pickle.alloc(<void**>&rblocks, size * esize)
+    if dorecv: tmp2 = allocate_int(size, &rcounts)
+    if dorecv: tmp3 = allocate_int(size, &rdispls)
     #
+    cdef MPI_Comm ctx = MPI_COMM_NULL
+    PyMPI_Commctx(comm, &ctx)
     cdef object smsg = None
-    if dosend: smsg = pickle.dump(sendobj, &sbuf, &scount)
-    with nogil: CHKERR( MPI_Gather(&scount, 1, MPI_INT,
-                                   rcounts, 1, MPI_INT,
+    cdef long long nbytes = 0
+    if dosend: smsg = pickle.dump(sendobj, &sbuf, &scount, &stype)
+    if dosend: nbytes = PyMPI_msgsize(smsg)
+    if dosend: PyMPI_eager_put(smsg, sblock, esize)
+    with nogil: CHKERR( MPI_Gather(sblock,  esize, MPI_BYTE,
+                                   rblocks, esize, MPI_BYTE,
                                    root, comm) )
+    cdef bint sbig = dosend and not PyMPI_eager_fits(nbytes, esize)
+    cdef long long *rlens = NULL
+    cdef object tmp4 = None
+    cdef int i = 0
+    if dorecv:
+        tmp4 = allocate(size, sizeof(long long), <void**>&rlens)
+        for i from 0 <= i < size:
+            rlens[i] = PyMPI_eager_len(rblocks + i * esize)
+            rcounts[i] = 0
+            if PyMPI_eager_fits(rlens[i], esize):
+                rcounts[i] = <int>rlens[i]
+            rdispls[i] = i * esize + <int>sizeof(long long)
     cdef object rmsg = None
-    if dorecv: rmsg = pickle.allocv(&rbuf, size, rcounts, rdispls)
-    with nogil: CHKERR( MPI_Gatherv(sbuf, scount,           stype,
-                                    rbuf, rcounts, rdispls, rtype,
-                                    root, comm) )
-    if dorecv: rmsg = pickle.loadv(rmsg, size, rcounts, rdispls)
+    if dorecv: rmsg = pickle.loadv(tmp1, size, rcounts, rdispls)
+    #
+    cdef int tag = PyMPI_Commctx_TAG
+    if sbig and (inter or root != rank):
+        PyMPI_sendmsg(smsg, root, tag, ctx)
+    if dorecv:
+        for i from 0 <= i < size:
+            if PyMPI_eager_fits(rlens[i], esize): continue
+            if not inter and i == rank:
+                rmsg[i] = pickle.load(smsg)
+            else:
+                rmsg[i] = PyMPI_recv(None, i, tag, ctx, MPI_STATUS_IGNORE)
     return rmsg
 
 
@@ -709,13 +2482,9 @@ cdef object PyMPI_scatter(object sendobj, object recvobj,
                           int root, MPI_Comm comm):
     cdef _p_Pickle pickle = PyMPI_pickle()
     #
-    cdef void *sbuf = NULL
-    cdef int *scounts = NULL
-    cdef int *sdispls = NULL
-    cdef MPI_Datatype stype = MPI_BYTE
-    cdef void *rbuf = NULL
-    cdef int rcount = 0
-    cdef MPI_Datatype rtype = MPI_BYTE
+    cdef char *sblocks = NULL
+    cdef char rblock[PyMPI_EAGER_VECTOR]
+    cdef int esize = PyMPI_EAGER_VECTOR
     #
     cdef int dosend=0, dorecv=0
     cdef int inter=0, size=0, rank=0
@@ -736,21 +2505,46 @@ cdef object PyMPI_scatter(object sendobj, object recvobj,
         else:
             dosend=0; dorecv=1;
     #
-    cdef object tmp1=None, tmp2=None
-    if dosend: tmp1 = allocate_int(size, &scounts)
-    if dosend: tmp2 = allocate_int(size, &sdispls)
+    cdef object tmp1=None
+    if dosend: tmp1 = allocate(size, esize, <void**>&sblocks)
     #
-    cdef object smsg = None
-    if dosend: smsg = pickle.dumpv(sendobj, &sbuf, size, scounts, sdispls)
-    with nogil: CHKERR( MPI_Scatter(scounts, 1, MPI_INT,
-                                    &rcount, 1, MPI_INT,
+    cdef MPI_Comm ctx = MPI_COMM_NULL
+    PyMPI_Commctx(comm, &ctx)
+    cdef object items = None
+    cdef int i = 0
+    if dosend: items = pickle.dumpv(sendobj, size)
+    if dosend:
+        for i from 0 <= i < size:
+            PyMPI_eager_put(items[i], sblocks + i * esize, esize)
+    with nogil: CHKERR( MPI_Scatter(sblocks, esize, MPI_BYTE,
+                                    rblock,  esize, MPI_BYTE,
                                     root, comm) )
+    cdef long long nbytes = 0
+    if dorecv: nbytes = PyMPI_eager_len(rblock)
+    cdef bint rbig = dorecv and not PyMPI_eager_fits(nbytes, esize)
     cdef object rmsg = None
-    if dorecv: rmsg = pickle.alloc(&rbuf, rcount)
-    with nogil: CHKERR( MPI_Scatterv(sbuf, scounts, sdispls, stype,
-                                     rbuf, rcount,           rtype,
-                                     root, comm) )
-    if dorecv: rmsg = pickle.load(rmsg)
+    if dorecv and not rbig: rmsg = PyMPI_eager_get(pickle, rblock)
+    if dorecv: rmsg = pickle.loadr(rmsg)
+    #
+    cdef int tag = PyMPI_Commctx_TAG
+    cdef MPI_Request *sreqs = NULL
+    cdef object tmp2 = None
+    cdef int nreqs = 0
+    if dosend and root != <int>MPI_PROC_NULL:
+        for i from 0 <= i < size:
+            if PyMPI_eager_fits(PyMPI_msgsize(items[i]), esize): continue
+            if not inter and i == rank:
+                rmsg = pickle.load(items[i])
+                continue
+            if sreqs == NULL:
+                tmp2 = allocate(size, sizeof(MPI_Request), <void**>&sreqs)
+            PyMPI_isendmsg(items[i], i, tag, ctx, &sreqs[nreqs])
+            nreqs += 1
+    try:
+        if rbig and (inter or root != rank):
+            rmsg = PyMPI_recv(None, root, tag, ctx, MPI_STATUS_IGNORE)
+    finally:
+        with nogil: CHKERR( MPI_Waitall(nreqs, sreqs, MPI_STATUSES_IGNORE) )
     return rmsg
 
 
@@ -765,26 +2559,90 @@ cdef object PyMPI_allgather(object sendobj, object recvobj,
     cdef int *rcounts = NULL
     cdef int *rdispls = NULL
     cdef MPI_Datatype rtype = MPI_BYTE
+    cdef char sblock[PyMPI_EAGER_VECTOR]
+    cdef char *rblocks = NULL
+    cdef int esize = PyMPI_EAGER_VECTOR
     #
-    cdef int inter=0, size=0
+    cdef int inter=0, size=0, rank=0
     CHKERR( MPI_Comm_test_inter(comm, &inter) )
+    CHKERR( MPI_Comm_rank(comm, &rank) )
     if inter:
         CHKERR( MPI_Comm_remote_size(comm, &size) )
     else:
         CHKERR( MPI_Comm_size(comm, &size) )
     #
-    cdef object tmp1 = allocate_int(size, &rcounts)
-    cdef object tmp2 = allocate_int(size, &rdispls)
+    cdef object tmp2 = allocate_int(size, &rcounts)
+    cdef object tmp3 = allocate_int(size, &rdispls)
+    cdef object tmp4 = pickle.alloc(<void**>&rblocks, size * esize)
     #
-    cdef object smsg = pickle.dump(sendobj, &sbuf, &scount)
-    with nogil: CHKERR( MPI_Allgather(&scount, 1, MPI_INT,
-                                      rcounts, 1, MPI_INT,
+    cdef object smsg = pickle.dump(sendobj, &sbuf, &scount, &stype)
+    cdef long long nbytes = PyMPI_msgsize(smsg)
+    PyMPI_eager_put(smsg, sblock, esize)
+    with nogil: CHKERR( MPI_Allgather(sblock,  esize, MPI_BYTE,
+                                      rblocks, esize, MPI_BYTE,
                                       comm) )
-    cdef object rmsg = pickle.allocv(&rbuf, size, rcounts, rdispls)
+    cdef int i = 0
+    cdef long long rlen = 0
+    cdef bint more = inter
+    for i from 0 <= i < size:
+        rlen = PyMPI_eager_len(rblocks + i * esize)
+        rcounts[i] = 0
+        if PyMPI_eager_fits(rlen, esize):
+            rcounts[i] = <int>rlen
+        else:
+            more = 1
+        rdispls[i] = i * esize + <int>sizeof(long long)
+    if not more: return pickle.loadv(tmp4, size, rcounts, rdispls)
+    #
+    # second round, as some message did not fit in its block; in
+    # intercommunicators, the lengths of the local group are unknown
+    cdef long long *rlens = NULL
+    cdef object tmp1 = allocate(size, sizeof(long long), <void**>&rlens)
+    for i from 0 <= i < size:
+        rlens[i] = PyMPI_eager_len(rblocks + i * esize)
+    cdef object rmsg = pickle.loadv(tmp4, size, rcounts, rdispls)
+    cdef MPI_Count limit = PyMPI_msglimit(comm)
+    if PyMPI_eager_fits(nbytes, esize) or nbytes > limit:
+        sbuf = NULL; scount = 0; stype = MPI_BYTE
+    cdef object rtmp = None, items = None
+    cdef bint large = inter
+    for i from 0 <= i < size:
+        rcounts[i] = 0
+        if not PyMPI_eager_fits(rlens[i], esize) and rlens[i] <= limit:
+            rcounts[i] = <int>rlens[i]
+        large |= rlens[i] > limit
+    rtmp = pickle.allocv(&rbuf, size, rcounts, rdispls)
     with nogil: CHKERR( MPI_Allgatherv(sbuf, scount,           stype,
                                        rbuf, rcounts, rdispls, rtype,
                                        comm) )
-    rmsg = pickle.loadv(rmsg, size, rcounts, rdispls)
+    items = pickle.loadv(rtmp, size, rcounts, rdispls)
+    for i from 0 <= i < size:
+        if rcounts[i] > 0: rmsg[i] = items[i]
+    if not large: return rmsg
+    #
+    # messages longer than the limit go point-to-point; every process
+    # of an intracommunicator knows whether there are any
+    cdef MPI_Comm ctx = MPI_COMM_NULL
+    PyMPI_Commctx(comm, &ctx)
+    cdef int tag = PyMPI_Commctx_TAG
+    cdef MPI_Request *sreqs = NULL
+    cdef object tmp5 = None
+    cdef int nreqs = 0
+    if nbytes > limit:
+        tmp5 = allocate(size, sizeof(MPI_Request), <void**>&sreqs)
+        for i from 0 <= i < size:
+            if not inter and i == rank: continue
+            PyMPI_isendmsg(smsg, i, tag, ctx, &sreqs[nreqs])
+            nreqs += 1
+    try:
+        for i from 0 <= i < size:
+            if rlens[i] <= limit: continue
+            if not inter and i == rank:
+                rmsg[i] = pickle.load(smsg)
+            else:
+                rmsg[i] = PyMPI_recv(None, i, tag, ctx, MPI_STATUS_IGNORE)
+    finally:
+        with nogil: CHKERR( MPI_Waitall(nreqs, sreqs, MPI_STATUSES_IGNORE) )
     return rmsg
 
 
@@ -793,39 +2651,639 @@ cdef object PyMPI_alltoall(object sendobj, object recvobj,
     cdef _p_Pickle pickle = PyMPI_pickle()
     #
     cdef void *sbuf = NULL
+    cdef long long *slens = NULL
     cdef int *scounts = NULL
     cdef int *sdispls = NULL
-    cdef MPI_Datatype stype = MPI_BYTE
+    cdef MPI_Datatype *stypes = NULL
     cdef void *rbuf = NULL
+    cdef long long *rlens = NULL
     cdef int *rcounts = NULL
     cdef int *rdispls = NULL
-    cdef MPI_Datatype rtype = MPI_BYTE
+    cdef MPI_Datatype *rtypes = NULL
     #
-    cdef int inter=0, size=0
+    cdef int inter=0, size=0, rank=0
     CHKERR( MPI_Comm_test_inter(comm, &inter) )
+    CHKERR( MPI_Comm_rank(comm, &rank) )
     if inter:
         CHKERR( MPI_Comm_remote_size(comm, &size) )
     else:
         CHKERR( MPI_Comm_size(comm, &size) )
     #
-    cdef object stmp1 = allocate_int(size, &scounts)
-    cdef object stmp2 = allocate_int(size, &sdispls)
-    cdef object rtmp1 = allocate_int(size, &rcounts)
-    cdef object rtmp2 = allocate_int(size, &rdispls)
+    if pickle.ob_ALLTOALL_WINDOW is not None:
+        return PyMPI_alltoall_pairwise(sendobj, comm,
+                                       <int>pickle.ob_ALLTOALL_WINDOW)
+    #
+    cdef object tmp1 = allocate(2*size, sizeof(long long), <void**>&slens)
+    cdef object tmp2 = allocate_int(4*size, &scounts)
+    cdef object tmp3 = allocate(2*size, sizeof(MPI_Datatype), <void**>&stypes)
+    rlens = slens + size
+    sdispls = scounts + size
+    rcounts = scounts + 2*size
+    rdispls = scounts + 3*size
+    rtypes = stypes + size
     #
-    cdef object smsg = pickle.dumpv(sendobj, &sbuf, size, scounts, sdispls)
-    with nogil: CHKERR( MPI_Alltoall(scounts, 1, MPI_INT,
-                                     rcounts, 1, MPI_INT,
+    cdef MPI_Count limit = PyMPI_msglimit(comm)
+    cdef MPI_Comm ctx = MPI_COMM_NULL
+    PyMPI_Commctx(comm, &ctx)
+    cdef object items = pickle.dumpv(sendobj, size)
+    cdef object smsg = pickle.joinw(items, &sbuf, size,
+                                    slens, scounts, sdispls, stypes, limit)
+    with nogil: CHKERR( MPI_Alltoall(slens, 1, MPI_LONG_LONG,
+                                     rlens, 1, MPI_LONG_LONG,
                                      comm) )
+    cdef int i = 0
+    for i from 0 <= i < size:
+        rcounts[i] = <int>rlens[i] if rlens[i] <= limit else 0
+        rtypes[i] = MPI_BYTE
     cdef object rmsg = pickle.allocv(&rbuf, size, rcounts, rdispls)
-    with nogil: CHKERR( MPI_Alltoallv(sbuf, scounts, sdispls, stype,
-                                      rbuf, rcounts, rdispls, rtype,
-                                      comm) )
+    if type(smsg) is list:
+        with nogil: CHKERR( MPI_Alltoallw(
+            sbuf, scounts, sdispls, stypes,
+            rbuf, rcounts, rdispls, rtypes,
+            comm) )
+    else:
+        with nogil: CHKERR( MPI_Alltoallv(
+            sbuf, scounts, sdispls, MPI_BYTE,
+            rbuf, rcounts, rdispls, MPI_BYTE,
+            comm) )
     rmsg = pickle.loadv(rmsg, size, rcounts, rdispls)
+    #
+    cdef int tag = PyMPI_Commctx_TAG
+    cdef MPI_Request *sreqs = NULL
+    cdef object stmp5 = None
+    cdef int nreqs = 0
+    for i from 0 <= i < size:
+        if slens[i] <= limit: continue
+        if not inter and i == rank: continue
+        if sreqs == NULL:
+            stmp5 = allocate(size, sizeof(MPI_Request), <void**>&sreqs)
+        PyMPI_isendmsg(items[i], i, tag, ctx, &sreqs[nreqs])
+        nreqs += 1
+    try:
+        for i from 0 <= i < size:
+            if rlens[i] <= limit: continue
+            if not inter and i == rank:
+                rmsg[i] = pickle.load(items[i])
+            else:
+                rmsg[i] = PyMPI_recv(None, i, tag, ctx, MPI_STATUS_IGNORE)
+    finally:
+        with nogil: CHKERR( MPI_Waitall(nreqs, sreqs, MPI_STATUSES_IGNORE) )
+    return rmsg
+
+# Pairwise alltoall. When pickle.ALLTOALL_WINDOW is set, objects are
+# exchanged point-to-point in rounds, pickling the outgoing object and
+# unpickling the incoming one for a single peer per round, with at most
+# ALLTOALL_WINDOW rounds in flight. Peak memory is then bounded by the
+# window rather than by the total amount of data. In round r, every
+# process sends to (rank+r) % n and receives from (rank-r) % n, with n
+# the size of the larger group; in intercommunicators, rounds naming a
+# process beyond the size of a group have nothing to send or receive.
+
+cdef object PyMPI_alltoall_pairwise(object sendobj, MPI_Comm comm,
+                                    int window):
+    cdef _p_Pickle pickle = PyMPI_pickle()
+    #
+    cdef void *sbuf = NULL
+    cdef int scount = 0
+    cdef MPI_Datatype stype = MPI_BYTE
+    #
+    cdef int inter=0, size=0, rsize=0, rank=0
+    CHKERR( MPI_Comm_test_inter(comm, &inter) )
+    CHKERR( MPI_Comm_rank(comm, &rank) )
+    CHKERR( MPI_Comm_size(comm, &size) )
+    if inter:
+        CHKERR( MPI_Comm_remote_size(comm, &rsize) )
+    else:
+        rsize = size
+    cdef int nrounds = size if size > rsize else rsize
+    if window > nrounds: window = nrounds
+    #
+    cdef list items
+    if sendobj is None:
+        items = [None] * rsize
+    else:
+        items = list(sendobj)
+        if len(items) != rsize: raise ValueError(
+            "expecting %d items, got %d" % (rsize, len(items)))
+    cdef list rmsg = [None] * rsize
+    #
+    cdef MPI_Comm ctx = MPI_COMM_NULL
+    PyMPI_Commctx(comm, &ctx)
+    cdef int tag = PyMPI_Commctx_TAG
+    cdef MPI_Request *sreqs = NULL
+    cdef object tmp = allocate(window, sizeof(MPI_Request), <void**>&sreqs)
+    cdef list smsgs = [None] * window
+    cdef int i = 0
+    for i from 0 <= i < window: sreqs[i] = MPI_REQUEST_NULL
+    #
+    cdef int r = 0, j = 0, k = 0, dest = 0, source = 0
+    try:
+        for r from 0 <= r < nrounds + window - 1:
+            if r < nrounds:
+                k = r % window
+                with nogil: CHKERR( MPI_Wait(&sreqs[k], MPI_STATUS_IGNORE) )
+                smsgs[k] = None
+                dest = (rank + r) % nrounds
+                if dest < rsize:
+                    smsgs[k] = pickle.dump(items[dest], &sbuf, &scount, &stype)
+                    with nogil: CHKERR( MPI_Isend(sbuf, scount, stype,
+                                                  dest, tag, ctx, &sreqs[k]) )
+            j = r - window + 1
+            if j >= 0:
+                source = (rank - j + nrounds) % nrounds
+                if source < rsize:
+                    rmsg[source] = PyMPI_recv(None, source, tag, ctx,
+                                              MPI_STATUS_IGNORE)
+    finally:
+        with nogil: CHKERR( MPI_Waitall(window, sreqs, MPI_STATUSES_IGNORE) )
     return rmsg
 
 # -----------------------------------------------------------------------------
 
+# Sparse dynamic data exchange with the nonblocking consensus algorithm
+# (NBX). Every process sends its messages with synchronous sends, and
+# receives messages from any source until all its sends have been
+# matched; it then enters a nonblocking barrier and keeps receiving
+# until the barrier completes, which happens once every message has
+# been received. A process may start the next exchange before others
+# notice the barrier completed, but never two exchanges ahead, thus
+# consecutive exchanges on a communicator alternate between two tags.
+
+cdef object PyMPI_sparse_exchange(object sendobj, MPI_Comm comm):
+    cdef _p_Pickle pickle = PyMPI_pickle()
+    #
+    cdef void *sbuf = NULL
+    cdef int scount = 0
+    cdef MPI_Datatype stype = MPI_BYTE
+    #
+    cdef PyMPI_Commctx_t *cctx = PyMPI_Commctx_get(comm)
+    cdef MPI_Comm ctx = cctx.comm
+    cdef int tag = PyMPI_Commctx_TAG + 1 + <int>(cctx.exchanges & 1)
+    #
+    cdef list dests = []
+    cdef list items = []
+    if sendobj is not None:
+        for key, obj in dict(sendobj).items():
+            dests.append(<int>key)
+            items.append(obj)
+    cdef int i = 0, n = <int>len(items)
+    cdef MPI_Request *sreqs = NULL
+    cdef object tmp = allocate(n, sizeof(MPI_Request), <void**>&sreqs)
+    for i from 0 <= i < n:
+        items[i] = pickle.dump(items[i], &sbuf, &scount, &stype)
+    cctx.exchanges += 1
+    #
+    cdef int dest = MPI_PROC_NULL, nreqs = 0
+    try:
+        for i from 0 <= i < n:
+            dest = dests[i]
+            PyMPI_msgspec(items[i], &sbuf, &scount, &stype)
+            with nogil: CHKERR( MPI_Issend(sbuf, scount, stype,
+                                           dest, tag, ctx, &sreqs[i]) )
+            nreqs += 1
+    except:
+        # Cancelled sends still have to complete before being freed.
+        for i from 0 <= i < nreqs:
+            MPI_Cancel(&sreqs[i])
+            with nogil: MPI_Wait(&sreqs[i], MPI_STATUS_IGNORE)
+        raise
+    #
+    cdef dict recvobj = {}
+    cdef MPI_Request breq = MPI_REQUEST_NULL
+    cdef MPI_Status rsts
+    cdef int flag = 0, done = 0, barrier = 0
+    cdef double delay = 0
+    while True:
+        with nogil: CHKERR( MPI_Iprobe(MPI_ANY_SOURCE, tag, ctx,
+                                       &flag, &rsts) )
+        if flag:
+            recvobj[rsts.MPI_SOURCE] = PyMPI_recv(None, rsts.MPI_SOURCE,
+                                                  tag, ctx, MPI_STATUS_IGNORE)
+            delay = 0
+            continue
+        if not barrier:
+            with nogil: CHKERR( MPI_Testall(n, sreqs, &done,
+                                            MPI_STATUSES_IGNORE) )
+            if done:
+                with nogil: CHKERR( MPI_Ibarrier(ctx, &breq) )
+                barrier = 1
+                delay = 0
+                continue
+        else:
+            with nogil: CHKERR( MPI_Test(&breq, &done, MPI_STATUS_IGNORE) )
+            if done: break
+        delay = PyMPI_idle(delay)
+    return recvobj
+
+# -----------------------------------------------------------------------------
+
+# Nonblocking collectives on Python objects run the eager protocol in
+# stages. The first stage is a nonblocking collective on eager blocks,
+# started right away on the user communicator. Messages not fitting in
+# their blocks are sent point-to-point in a second stage, started when
+# the request is tested or waited for, on a private communicator used
+# only for this purpose. Later stages of a request are never started
+# before all requests started earlier on the same communicator have
+# completed, thus all processes start them in the same order. Until
+# the last stage completes, the request handle is a generalized request.
+
+cdef list PyMPI_icoll_queue = []
+cdef object PyMPI_icoll_self = object()
+
+cdef class _p_icoll:
+
+    cdef Request request
+    cdef MPI_Request grequest
+    cdef MPI_Comm ctx
+    cdef int inter, size, rank
+    cdef int stage
+    cdef MPI_Request *reqs
+    cdef int nreqs
+    cdef list bufs
+    cdef char *rblocks
+    cdef object rbuf
+    cdef list items
+    cdef object result
+
+    def __cinit__(self):
+        self.request = None
+        self.grequest = MPI_REQUEST_NULL
+        self.ctx = MPI_COMM_NULL
+        self.inter = 0
+        self.size = 0
+        self.rank = 0
+        self.stage = 0
+        self.reqs = NULL
+        self.nreqs = 0
+        self.bufs = []
+        self.rblocks = NULL
+        self.rbuf = None
+        self.items = None
+        self.result = None
+
+    cdef int setup(self, MPI_Comm comm) except -1:
+        CHKERR( MPI_Comm_test_inter(comm, &self.inter) )
+        CHKERR( MPI_Comm_rank(comm, &self.rank) )
+        if self.inter:
+            CHKERR( MPI_Comm_remote_size(comm, &self.size) )
+        else:
+            CHKERR( MPI_Comm_size(comm, &self.size) )
+        PyMPI_Commctx_icoll(comm, &self.ctx)
+        self.bufs.append(allocate(2 * self.size + 1, sizeof(MPI_Request),
+                                  <void**>&self.reqs))
+        return 0
+
+    cdef int post(self, Request request) except -1:
+        cdef _p_greq state = _p_greq(None, None, None, None, None)
+        with nogil: CHKERR( MPI_Grequest_start(
+            greq_query_fn, greq_free_fn, greq_cancel_fn,
+            <void*>state, &self.grequest) )
+        Py_INCREF(state)
+        self.request = request
+        request.ob_mpi = self.grequest
+        request.ob_buf = self
+        PyMPI_icoll_queue.append(self)
+        return 0
+
+    cdef int isend(self, object msg, int dest) except -1:
+        PyMPI_isendmsg(msg, dest, PyMPI_Commctx_TAG, self.ctx,
+                       &self.reqs[self.nreqs])
+        self.nreqs += 1
+        self.bufs.append(msg)
+        return 0
+
+    cdef object irecv(self, int source, long long nbytes):
+        cdef _p_Pickle pickle = PyMPI_pickle()
+        cdef void *rbuf = NULL
+        cdef int rcount = 0
+        cdef MPI_Datatype rtype = MPI_BYTE
+        cdef object rmsg = pickle.alloc(&rbuf, nbytes)
+        cdef object rtmp = PyMPI_msgbytes(rmsg, rbuf, nbytes,
+                                          &rbuf, &rcount, &rtype)
+        with nogil: CHKERR( MPI_Irecv(rbuf, rcount, rtype,
+                                      source, PyMPI_Commctx_TAG, self.ctx,
+                                      &self.reqs[self.nreqs]) )
+        self.nreqs += 1
+        self.bufs.append(rtmp)
+        return rmsg
+
+    cdef int sendv(self, object smsg, int dest, int esize) except -1:
+        # send a message not fitting in its block
+        if PyMPI_eager_fits(PyMPI_msgsize(smsg), esize): return 0
+        self.isend(smsg, dest)
+        return 0
+
+    cdef int recvv(self, int esize) except -1:
+        # receive the messages not fitting in their blocks
+        cdef int i = 0
+        cdef long long rlen = 0
+        if self.rblocks == NULL: return 0
+        self.items = [None] * self.size
+        for i from 0 <= i < self.size:
+            rlen = PyMPI_eager_len(self.rblocks + i * esize)
+            if PyMPI_eager_fits(rlen, esize): continue
+            if not self.inter and i == self.rank:
+                self.items[i] = PyMPI_icoll_self
+            else:
+                self.items[i] = self.irecv(i, rlen)
+        return 0
+
+    cdef object loadv(self, object smsg, int esize):
+        cdef _p_Pickle pickle = PyMPI_pickle()
+        if self.rblocks == NULL: return None
+        cdef int *rcounts = NULL, *rdispls = NULL
+        cdef object tmp1 = allocate_int(self.size, &rcounts)
+        cdef object tmp2 = allocate_int(self.size, &rdispls)
+        cdef long long rlen = 0
+        cdef int i = 0
+        for i from 0 <= i < self.size:
+            rlen = PyMPI_eager_len(self.rblocks + i * esize)
+            rcounts[i] = <int>rlen if PyMPI_eager_fits(rlen, esize) else 0
+            rdispls[i] = i * esize + <int>sizeof(long long)
+        self.rblocks = NULL
+        cdef object rbuf = self.rbuf
+        self.rbuf = None
+        cdef list rmsg = pickle.loadv(rbuf, self.size, rcounts, rdispls)
+        cdef list items = self.items
+        self.items = None
+        if items is None: return rmsg
+        for i from 0 <= i < self.size:
+            if items[i] is None: continue
+            if items[i] is PyMPI_icoll_self:
+                rmsg[i] = pickle.load(smsg)
+            else:
+                rmsg[i] = pickle.loadr(items[i])
+        return rmsg
+
+    cdef int advance(self) except -1:
+        return 1
+
+    cdef int finish(self) except -1:
+        PyMPI_icoll_queue.remove(self)
+        self.request = None
+        self.bufs = None
+        CHKERR( MPI_Grequest_complete(self.grequest) )
+        return 0
+
+    cdef int run(self, bint block) except -1:
+        cdef int flag = 1, done = 0
+        while self.request is not None:
+            if self.nreqs > 0:
+                with nogil:
+                    if block:
+                        CHKERR( MPI_Waitall(self.nreqs, self.reqs,
+                                            MPI_STATUSES_IGNORE) )
+                    else:
+                        CHKERR( MPI_Testall(self.nreqs, self.reqs, &flag,
+                                            MPI_STATUSES_IGNORE) )
+                if not flag: return 0
+                self.nreqs = 0
+            self.stage += 1
+            try:
+                done = self.advance()
+            except:
+                if self.nreqs == 0: self.finish()
+                raise
+            if done: self.finish()
+        return 1
+
+    cdef int progress(self, bint block) except -1:
+        # requests started earlier on the same communicator go first
+        cdef _p_icoll state
+        if self.request is None: return 1
+        for state in list(PyMPI_icoll_queue):
+            if state.ctx != self.ctx: continue
+            if not state.run(block): return 0
+            if state is self: break
+        return 1
+
+
+cdef class _p_ibcast(_p_icoll):
+
+    # In intercommunicators, the root sends to every process in the
+    # remote group, and the eager blocks use another tag, as they are
+    # sent as soon as the request is started.
+
+    cdef int dosend, dorecv
+    cdef int root
+    cdef char *eager
+    cdef object smsg, rmsg
+
+    cdef int advance(self) except -1:
+        cdef _p_Pickle pickle = PyMPI_pickle()
+        cdef void *buf = NULL
+        cdef int count = 0
+        cdef MPI_Datatype dtype = MPI_BYTE
+        cdef long long nbytes = PyMPI_eager_len(self.eager)
+        cdef int i = 0
+        if self.stage == 1:
+            if PyMPI_eager_fits(nbytes, PyMPI_EAGER_BCAST):
+                if self.dorecv and not self.dosend:
+                    self.rmsg = PyMPI_eager_get(pickle, self.eager)
+            elif self.inter and self.dosend:
+                for i from 0 <= i < self.size:
+                    self.isend(self.smsg, i)
+                return 0
+            elif self.inter and self.dorecv:
+                self.rmsg = self.irecv(self.root, nbytes)
+                return 0
+            elif not self.inter:
+                if self.dosend:
+                    PyMPI_msgspec(self.smsg, &buf, &count, &dtype)
+                else:
+                    self.rmsg = pickle.alloc(&buf, nbytes)
+                    self.bufs.append(PyMPI_msgbytes(self.rmsg, buf, nbytes,
+                                                    &buf, &count, &dtype))
+                with nogil: CHKERR( MPI_Ibcast(buf, count, dtype,
+                                               self.root, self.ctx,
+                                               &self.reqs[0]) )
+                self.nreqs = 1
+                return 0
+        cdef object rmsg = self.rmsg
+        self.smsg = self.rmsg = None
+        if self.dorecv and self.dosend: self.result = pickle.load(rmsg)
+        elif self.dorecv: self.result = pickle.loadr(rmsg)
+        return 1
+
+cdef object PyMPI_ibcast(object obj, int root,
+                         MPI_Comm comm, Request request):
+    cdef _p_Pickle pickle = PyMPI_pickle()
+    cdef _p_ibcast state = <_p_ibcast>_p_ibcast.__new__(_p_ibcast)
+    cdef int esize = PyMPI_EAGER_BCAST
+    state.setup(comm)
+    state.root = root
+    if state.inter:
+        if root == <int>MPI_PROC_NULL:
+            state.dosend=0; state.dorecv=0;
+        elif root == <int>MPI_ROOT:
+            state.dosend=1; state.dorecv=0;
+        else:
+            state.dosend=0; state.dorecv=1;
+    elif root == state.rank:
+        state.dosend=1; state.dorecv=1;
+    else:
+        state.dosend=0; state.dorecv=1;
+    #
+    cdef void *buf = NULL
+    cdef int count = 0
+    cdef MPI_Datatype dtype = MPI_BYTE
+    cdef int i = 0, tag = PyMPI_Commctx_TAG + 1
+    state.bufs.append(allocate(esize, 1, <void**>&state.eager))
+    if state.dosend: state.smsg = pickle.dump(obj, &buf, &count, &dtype)
+    if state.dosend: state.rmsg = state.smsg
+    PyMPI_eager_put(state.smsg, state.eager, esize)
+    if not state.inter:
+        with nogil: CHKERR( MPI_Ibcast(state.eager, esize, MPI_BYTE,
+                                       root, comm, &state.reqs[0]) )
+        state.nreqs = 1
+    elif state.dosend:
+        for i from 0 <= i < state.size:
+            with nogil: CHKERR( MPI_Isend(state.eager, esize, MPI_BYTE,
+                                          i, tag, state.ctx,
+                                          &state.reqs[i]) )
+            state.nreqs += 1
+    elif state.dorecv:
+        with nogil: CHKERR( MPI_Irecv(state.eager, esize, MPI_BYTE,
+                                      root, tag, state.ctx,
+                                      &state.reqs[0]) )
+        state.nreqs = 1
+    state.post(request)
+    return state
+
+
+cdef class _p_igather(_p_icoll):
+
+    cdef int root
+    cdef object smsg
+
+    cdef int advance(self) except -1:
+        if self.stage == 1:
+            if self.inter or self.root != self.rank:
+                self.sendv(self.smsg, self.root, PyMPI_EAGER_VECTOR)
+            self.recvv(PyMPI_EAGER_VECTOR)
+            return 0
+        self.result = self.loadv(self.smsg, PyMPI_EAGER_VECTOR)
+        self.smsg = None
+        return 1
+
+cdef object PyMPI_igather(object sendobj, int root,
+                          MPI_Comm comm, Request request):
+    cdef _p_Pickle pickle = PyMPI_pickle()
+    cdef _p_igather state = <_p_igather>_p_igather.__new__(_p_igather)
+    cdef int esize = PyMPI_EAGER_VECTOR
+    cdef int dosend=0, dorecv=0
+    state.setup(comm)
+    if state.inter:
+        if root == <int>MPI_PROC_NULL:
+            dosend=0; dorecv=0;
+        elif root == <int>MPI_ROOT:
+            dosend=0; dorecv=1;
+        else:
+            dosend=1; dorecv=0;
+    elif root == state.rank:
+        dosend=1; dorecv=1;
+    else:
+        dosend=1; dorecv=0;
+    state.root = root
+    #
+    cdef void *sbuf = NULL
+    cdef int scount = 0
+    cdef MPI_Datatype stype = MPI_BYTE
+    cdef char *sblock = NULL
+    state.bufs.append(allocate(esize, 1, <void**>&sblock))
+    if dosend: state.smsg = pickle.dump(sendobj, &sbuf, &scount, &stype)
+    if dosend: PyMPI_eager_put(state.smsg, sblock, esize)
+    if dorecv: state.rbuf = pickle.alloc(<void**>&state.rblocks,
+                                         state.size * esize)
+    with nogil: CHKERR( MPI_Igather(sblock, esize, MPI_BYTE,
+                                    state.rblocks, esize, MPI_BYTE,
+                                    root, comm, &state.reqs[0]) )
+    state.nreqs = 1
+    state.post(request)
+    return state
+
+
+cdef class _p_iallgather(_p_icoll):
+
+    cdef object smsg
+
+    cdef int advance(self) except -1:
+        cdef int i = 0
+        if self.stage == 1:
+            for i from 0 <= i < self.size:
+                if not self.inter and i == self.rank: continue
+                self.sendv(self.smsg, i, PyMPI_EAGER_VECTOR)
+            self.recvv(PyMPI_EAGER_VECTOR)
+            return 0
+        self.result = self.loadv(self.smsg, PyMPI_EAGER_VECTOR)
+        self.smsg = None
+        return 1
+
+cdef object PyMPI_iallgather(object sendobj,
+                             MPI_Comm comm, Request request):
+    cdef _p_Pickle pickle = PyMPI_pickle()
+    cdef _p_iallgather state = <_p_iallgather>_p_iallgather.__new__(_p_iallgather)
+    cdef int esize = PyMPI_EAGER_VECTOR
+    state.setup(comm)
+    #
+    cdef void *sbuf = NULL
+    cdef int scount = 0
+    cdef MPI_Datatype stype = MPI_BYTE
+    cdef char *sblock = NULL
+    state.bufs.append(allocate(esize, 1, <void**>&sblock))
+    state.smsg = pickle.dump(sendobj, &sbuf, &scount, &stype)
+    PyMPI_eager_put(state.smsg, sblock, esize)
+    state.rbuf = pickle.alloc(<void**>&state.rblocks, state.size * esize)
+    with nogil: CHKERR( MPI_Iallgather(sblock, esize, MPI_BYTE,
+                                       state.rblocks, esize, MPI_BYTE,
+                                       comm, &state.reqs[0]) )
+    state.nreqs = 1
+    state.post(request)
+    return state
+
+
+cdef class _p_ialltoall(_p_icoll):
+
+    cdef list smsgs
+
+    cdef int advance(self) except -1:
+        cdef object smsg = None
+        cdef int i = 0
+        if self.stage == 1:
+            for i from 0 <= i < self.size:
+                if not self.inter and i == self.rank: continue
+                self.sendv(self.smsgs[i], i, PyMPI_EAGER_VECTOR)
+            self.recvv(PyMPI_EAGER_VECTOR)
+            return 0
+        if not self.inter: smsg = self.smsgs[self.rank]
+        self.result = self.loadv(smsg, PyMPI_EAGER_VECTOR)
+        self.smsgs = None
+        return 1
+
+cdef object PyMPI_ialltoall(object sendobj,
+                            MPI_Comm comm, Request request):
+    cdef _p_Pickle pickle = PyMPI_pickle()
+    cdef _p_ialltoall state = <_p_ialltoall>_p_ialltoall.__new__(_p_ialltoall)
+    cdef int esize = PyMPI_EAGER_VECTOR
+    state.setup(comm)
+    #
+    cdef char *sblocks = NULL
+    cdef int i = 0
+    state.smsgs = pickle.dumpv(sendobj, state.size)
+    state.bufs.append(allocate(state.size * esize, 1, <void**>&sblocks))
+    for i from 0 <= i < state.size:
+        PyMPI_eager_put(state.smsgs[i], sblocks + i * esize, esize)
+    state.rbuf = pickle.alloc(<void**>&state.rblocks, state.size * esize)
+    with nogil: CHKERR( MPI_Ialltoall(sblocks, esize, MPI_BYTE,
+                                      state.rblocks, esize, MPI_BYTE,
+                                      comm, &state.reqs[0]) )
+    state.nreqs = 1
+    state.post(request)
+    return state
+
+
+# -----------------------------------------------------------------------------
+
 cdef inline object _py_reduce(object seq, object op):
     if seq is None: return None
     cdef object res
@@ -840,49 +3298,300 @@ cdef inline object _py_reduce(object seq, object op):
             res = op(res, seq[i])
     return res
 
-cdef inline object _py_scan(object seq, object op):
-    if seq is None: return None
-    cdef Py_ssize_t i=0, n=len(seq)
+cdef inline bint PyMPI_op_commute(object op) except -1:
+    if not isinstance(op, Op): return 0
+    if op is __REPLACE__ or op is __NO_OP__: return 0
+    if (<Op>op).ob_mpi == MPI_OP_NULL: return 0
+    return (<Op>op).Is_commutative()
+
+cdef inline object PyMPI_op_init(object sendobj, object op, int rank):
     if op is __MAXLOC__ or op is __MINLOC__:
-        seq[0] = (seq[0], 0)
-        for i from 1 <= i < n:
-            seq[i] = op((seq[i], i), seq[i-1])
+        return (sendobj, rank)
+    return sendobj
+
+
+cdef object PyMPI_reduce_p2p(object sendobj, object op,
+                             int root, MPI_Comm comm):
+    cdef int size=0, rank=0
+    CHKERR( MPI_Comm_size(comm, &size) )
+    CHKERR( MPI_Comm_rank(comm, &rank) )
+    if root < 0 or root >= size: CHKERR( MPI_ERR_ROOT )
+    cdef object result = PyMPI_op_init(sendobj, op, rank)
+    if size == 1: return result
+    cdef MPI_Comm ctx = MPI_COMM_NULL
+    PyMPI_Commctx(comm, &ctx)
+    cdef int tag = PyMPI_Commctx_TAG
+    # binomial tree, combining in rank order unless the op commutes
+    cdef int vroot = root if PyMPI_op_commute(op) else 0
+    cdef int vrank = (rank - vroot + size) % size
+    cdef int mask = 1, peer = 0
+    while mask < size:
+        if (vrank & mask) == 0:
+            peer = vrank | mask
+            if peer < size:
+                peer = (peer + vroot) % size
+                result = op(result, PyMPI_recv(None, peer, tag, ctx,
+                                               MPI_STATUS_IGNORE))
+        else:
+            peer = ((vrank & ~mask) + vroot) % size
+            PyMPI_send(result, peer, tag, ctx)
+            result = None
+            break
+        mask <<= 1
+    if vroot != root:
+        if rank == vroot:
+            PyMPI_send(result, root, tag, ctx)
+            result = None
+        elif rank == root:
+            result = PyMPI_recv(None, vroot, tag, ctx, MPI_STATUS_IGNORE)
+    return result
+
+
+cdef object PyMPI_allreduce_p2p(object sendobj, object op,
+                                MPI_Comm comm):
+    cdef int size=0, rank=0
+    CHKERR( MPI_Comm_size(comm, &size) )
+    CHKERR( MPI_Comm_rank(comm, &rank) )
+    cdef object result = PyMPI_op_init(sendobj, op, rank)
+    if size == 1: return result
+    cdef MPI_Comm ctx = MPI_COMM_NULL
+    PyMPI_Commctx(comm, &ctx)
+    cdef int tag = PyMPI_Commctx_TAG
+    # recursive doubling on the largest power of two not above size,
+    # the remaining processes fold into (and unfold from) their
+    # neighbors; every process holds a contiguous range of ranks and
+    # values are always combined in rank order
+    cdef int pof2 = 1
+    while pof2 <= size // 2: pof2 <<= 1
+    cdef int rem = size - pof2
+    cdef int vrank = 0, vpeer = 0, peer = 0, mask = 1
+    cdef object other = None
+    if rank < 2 * rem:
+        if rank % 2 == 0:
+            PyMPI_send(result, rank + 1, tag, ctx)
+            vrank = -1
+        else:
+            other = PyMPI_recv(None, rank - 1, tag, ctx, MPI_STATUS_IGNORE)
+            result = op(other, result)
+            vrank = rank // 2
     else:
-        for i from 1 <= i < n:
-            seq[i] = op(seq[i], seq[i-1])
-    return seq
+        vrank = rank - rem
+    if vrank >= 0:
+        while mask < pof2:
+            vpeer = vrank ^ mask
+            peer = vpeer * 2 + 1 if vpeer < rem else vpeer + rem
+            other = PyMPI_sendrecv(result, peer, tag, None, peer, tag,
+                                   ctx, MPI_STATUS_IGNORE)
+            if peer < rank:
+                result = op(other, result)
+            else:
+                result = op(result, other)
+            mask <<= 1
+    if rank < 2 * rem:
+        if rank % 2 == 0:
+            result = PyMPI_recv(None, rank + 1, tag, ctx, MPI_STATUS_IGNORE)
+        else:
+            PyMPI_send(result, rank - 1, tag, ctx)
+    return result
+
+
+# Reductions with predefined operations on NumPy arrays and on int,
+# float and complex scalars may run as MPI reductions on memory buffers
+# (if enabled, as it costs an extra collective call). All the processes
+# first agree on the typecode and shape of their values, if any process
+# holds something else the pickle-based path is taken. Integers are
+# reduced as C longs only if no partial result can overflow.
+
+from sys import modules as PySys_modules
+
+cdef enum:
+    PyMPI_REDUCE    = 0
+    PyMPI_ALLREDUCE = 1
+    PyMPI_SCAN      = 2
+    PyMPI_EXSCAN    = 3
+
+cdef inline str PyMPI_reduce_typecodes(object op):
+    if op is __SUM__ or op is __PROD__:
+        return "bhilqBHILQfdgFDG"
+    if op is __MAX__ or op is __MIN__:
+        return "bhilqBHILQfdg"
+    if op is __BAND__ or op is __BOR__ or op is __BXOR__:
+        return "bhilqBHILQ"
+    return None
 
-cdef inline object _py_exscan(object seq, object op):
-    if seq is None: return None
-    seq = _py_scan(seq, op)
-    seq.pop(-1)
-    seq.insert(0, None)
-    return seq
+cdef bint PyMPI_reduce_long(object value, object op, int size):
+    cdef object bound = LONG_MAX
+    if op is __SUM__:
+        bound = LONG_MAX // size
+    elif op is __PROD__:
+        bound = int(LONG_MAX ** (1.0 / size))
+        while bound > 1 and bound ** size > LONG_MAX: bound -= 1
+    return -bound <= value <= bound
+
+cdef object PyMPI_reduce_buf(object sendobj, object op, int root,
+                             MPI_Comm comm, int kind):
+    if not PyMPI_pickle().reduce_buffers: return None
+    cdef str typecodes = PyMPI_reduce_typecodes(op)
+    if typecodes is None: return None
+    # local typecode, count, rank and shape hash (-1 rank for scalars)
+    cdef object numpy = None, typecode = None, count = 1
+    cdef object ndim = -1, shash = 0
+    cdef long key[8]
+    cdef int i = 0
+    cdef object t = type(sendobj)
+    cdef int size = 0
+    if t is int:
+        CHKERR( MPI_Comm_size(comm, &size) )
+        if PyMPI_reduce_long(sendobj, op, size):
+            typecode = "l"
+    elif t is float:
+        typecode = "d"
+    elif t is complex:
+        typecode = "D"
+    else:
+        numpy = PySys_modules.get('numpy')
+        if (numpy is not None and t is numpy.ndarray and
+            sendobj.dtype.isnative):
+            typecode = sendobj.dtype.char
+            count = sendobj.size
+            ndim = sendobj.ndim
+            for dim in sendobj.shape:
+                shash = ((shash * 1000003) ^ dim) & 0x3FFFFFFF
+    if (typecode is None or len(typecode) != 1 or
+        typecode not in typecodes or typecode not in TypeDict or
+        count > INT_MAX):
+        typecode, count, ndim, shash = None, 0, 0, 0
+    key[0] = ord(typecode) if typecode is not None else 0
+    key[1] = count
+    key[2] = ndim
+    key[3] = shash
+    for i from 0 <= i < 4:
+        key[4+i] = -key[i]
+    with nogil: CHKERR( MPI_Allreduce(MPI_IN_PLACE, key, 8,
+                                      MPI_LONG, MPI_MAX, comm) )
+    if key[0] == 0: return None
+    for i from 0 <= i < 4:
+        if key[i] != -key[4+i]: return None
+    # reduce memory buffers
+    cdef MPI_Datatype dtype = (<Datatype>TypeDict[typecode]).ob_mpi
+    cdef MPI_Op mpiop = (<Op>op).ob_mpi
+    cdef int rank = 0
+    CHKERR( MPI_Comm_rank(comm, &rank) )
+    cdef double sval[2], rval[2]
+    cdef long slong = 0, rlong = 0
+    cdef void *sbuf = NULL, *rbuf = NULL
+    cdef object rarray = None, stmp = None, rtmp = None
+    if numpy is None and typecode == "l":
+        slong = sendobj
+        sbuf = &slong
+        rbuf = &rlong
+    elif numpy is None:
+        sval[0] = sendobj.real
+        sval[1] = sendobj.imag
+        sbuf = sval
+        rbuf = rval
+    else:
+        if not sendobj.flags.c_contiguous:
+            sendobj = numpy.ascontiguousarray(sendobj)
+        stmp = getbuffer_r(sendobj, &sbuf, NULL)
+        if kind != PyMPI_REDUCE or rank == root:
+            rarray = numpy.empty_like(sendobj)
+            rtmp = getbuffer_w(rarray, &rbuf, NULL)
+    cdef int n = count
+    with nogil:
+        if kind == PyMPI_REDUCE:
+            CHKERR( MPI_Reduce(sbuf, rbuf, n, dtype, mpiop, root, comm) )
+        elif kind == PyMPI_ALLREDUCE:
+            CHKERR( MPI_Allreduce(sbuf, rbuf, n, dtype, mpiop, comm) )
+        elif kind == PyMPI_SCAN:
+            CHKERR( MPI_Scan(sbuf, rbuf, n, dtype, mpiop, comm) )
+        elif kind == PyMPI_EXSCAN:
+            CHKERR( MPI_Exscan(sbuf, rbuf, n, dtype, mpiop, comm) )
+    if kind == PyMPI_REDUCE and rank != root:
+        return (None,)
+    if kind == PyMPI_EXSCAN and rank == 0:
+        return (None,)
+    if numpy is not None:
+        return (rarray,)
+    if typecode == "l":
+        return (rlong,)
+    if typecode == "D":
+        return (complex(rval[0], rval[1]),)
+    return (rval[0],)
 
 
 cdef object PyMPI_reduce(object sendobj, object recvobj,
                          object op, int root, MPI_Comm comm):
+    cdef int inter = 0
+    CHKERR( MPI_Comm_test_inter(comm, &inter) )
+    cdef object result = None
+    if not inter:
+        result = PyMPI_reduce_buf(sendobj, op, root, comm, PyMPI_REDUCE)
+        if result is not None: return result[0]
+        return PyMPI_reduce_p2p(sendobj, op, root, comm)
     cdef object items = PyMPI_gather(sendobj, recvobj, root, comm)
     return _py_reduce(items, op)
 
 
 cdef object PyMPI_allreduce(object sendobj, object recvobj,
                             object op, MPI_Comm comm):
+    cdef int inter = 0
+    CHKERR( MPI_Comm_test_inter(comm, &inter) )
+    cdef object result = None
+    if not inter:
+        result = PyMPI_reduce_buf(sendobj, op, 0, comm, PyMPI_ALLREDUCE)
+        if result is not None: return result[0]
+        return PyMPI_allreduce_p2p(sendobj, op, comm)
     cdef object items = PyMPI_allgather(sendobj, recvobj, comm)
     return _py_reduce(items, op)
 
 
+cdef object PyMPI_scan_p2p(object sendobj, object op,
+                           MPI_Comm comm, bint exclusive):
+    cdef int size=0, rank=0
+    CHKERR( MPI_Comm_size(comm, &size) )
+    CHKERR( MPI_Comm_rank(comm, &rank) )
+    cdef object partial = PyMPI_op_init(sendobj, op, rank)
+    cdef object result = None if exclusive else partial
+    if size == 1: return result
+    cdef MPI_Comm ctx = MPI_COMM_NULL
+    PyMPI_Commctx(comm, &ctx)
+    cdef int tag = PyMPI_Commctx_TAG
+    # recursive doubling, 'partial' holds the reduction over a block
+    # of consecutive ranks containing the calling process, 'result'
+    # accumulates the blocks received from lower ranks
+    cdef bint defined = not exclusive
+    cdef int mask = 1, peer = 0
+    cdef object other = None
+    while mask < size:
+        peer = rank ^ mask
+        if peer < size:
+            other = PyMPI_sendrecv(partial, peer, tag, None, peer, tag,
+                                   ctx, MPI_STATUS_IGNORE)
+            if peer < rank:
+                partial = op(other, partial)
+                if defined:
+                    result = op(other, result)
+                else:
+                    result = other
+                    defined = 1
+            else:
+                partial = op(partial, other)
+        mask <<= 1
+    return result
+
+
 cdef object PyMPI_scan(object sendobj, object recvobj,
                        object op, MPI_Comm comm):
-    cdef object items = PyMPI_gather(sendobj, None, 0, comm)
-    items = _py_scan(items, op)
-    return PyMPI_scatter(items, None, 0, comm)
+    cdef object result = PyMPI_reduce_buf(sendobj, op, 0, comm, PyMPI_SCAN)
+    if result is not None: return result[0]
+    return PyMPI_scan_p2p(sendobj, op, comm, 0)
 
 
 cdef object PyMPI_exscan(object sendobj, object recvobj,
                          object op, MPI_Comm comm):
-    cdef object items = PyMPI_gather(sendobj, None, 0, comm)
-    items = _py_exscan(items, op)
-    return PyMPI_scatter(items, None, 0, comm)
+    cdef object result = PyMPI_reduce_buf(sendobj, op, 0, comm, PyMPI_EXSCAN)
+    if result is not None: return result[0]
+    return PyMPI_scan_p2p(sendobj, op, comm, 1)
 
 # -----------------------------------------------------------------------------
@@ -19,7 +19,13 @@ cdef object acquire_rs(object requests,
      for i from 0 <= i < n:
          array_r[i] = (<Request?>requests[i]).ob_mpi
      rp[0] = array_r
-     if statuses is not None:
+     if isinstance(statuses, StatusArray):
+         (<StatusArray>statuses).resize(n)
+         array_s = (<StatusArray>statuses).ob_mpi
+         for i from 0 <= i < n:
+             array_s[i] = empty_status
+         sp[0] = array_s
+     elif statuses is not None:
          ob_s = allocate(n, sizeof(MPI_Status), <void**>&array_s)
          for i from 0 <= i < n:
              array_s[i] = empty_status
@@ -38,13 +44,21 @@ cdef int release_rs(object requests,
         req.ob_mpi = rp[i]
         if rp[i] == MPI_REQUEST_NULL:
             req.ob_buf = None
-    if statuses is not None:
+    cdef MPI_Status *array_s = NULL
+    if isinstance(statuses, StatusArray):
+        (<StatusArray>statuses).resize(nr)
+        array_s = (<StatusArray>statuses).ob_mpi
+        if array_s != sp:
+            for i from 0 <= i < nr:
+                array_s[i] = sp[i]
+    elif statuses is not None:
         ns = len(statuses)
         if nr > ns :
             if isinstance(statuses, list):
                 statuses += [Status.__new__(Status)
                              for i from ns <= i < nr]
                 ns = nr
+        if ns > nr: ns = nr
         for i from 0 <= i < ns:
             (<Status?>statuses[i]).ob_mpi = sp[i]
     return 0
@@ -6,4 +6,8 @@ cdef extern from * nogil: # "stdio.h"
     int fprintf(FILE *, char *, ...)
     int fflush(FILE *)
 
+cdef extern from * nogil: # "stdlib.h"
+    void *malloc(size_t)
+    void free(void *)
+
 #---------------------------------------------------------------------
@@ -121,3 +121,104 @@ AddTypeMap(FTypeDict, "c16" , __COMPLEX16__ )
 AddTypeMap(FTypeDict, "c32" , __COMPLEX32__ )
 
 # -----------------------------------------------------------------------------
+
+# NumPy data types, including structured (record) ones, are mapped
+# to MPI datatypes built from their fields, offsets, and item size;
+# the resulting datatypes are cached per data type, keeping the most
+# recently used ones; evicted datatypes are freed once no message
+# references them
+
+cdef enum:
+    PyMPI_DTYPE_CACHE = 256
+
+cdef object PyMPI_dtype_cache = None
+
+cdef object PyMPI_as_dtype(object dtype):
+    if (hasattr(dtype, 'fields') and
+        hasattr(dtype, 'subdtype') and
+        hasattr(dtype, 'itemsize')):
+        return dtype
+    from numpy import dtype as as_dtype
+    return as_dtype(dtype)
+
+cdef MPI_Datatype PyMPI_dtype_build(object dtype) except *:
+    cdef MPI_Datatype result = MPI_DATATYPE_NULL
+    cdef MPI_Datatype base = MPI_DATATYPE_NULL
+    cdef MPI_Datatype tmp = MPI_DATATYPE_NULL
+    cdef Datatype datatype = None
+    cdef MPI_Aint extent = dtype.itemsize
+    cdef int i = 0, n = 0, count = 1
+    cdef int *blocklengths = NULL
+    cdef MPI_Aint *displacements = NULL
+    cdef MPI_Datatype *types = NULL
+    cdef object tmp1, tmp2, tmp3
+    # subarray: a fixed-shape array of a base data type
+    if dtype.subdtype is not None:
+        subdtype, shape = dtype.subdtype
+        for i in shape: count *= i
+        base = PyMPI_dtype_build(subdtype)
+        try: CHKERR( MPI_Type_contiguous(count, base, &result) )
+        finally: MPI_Type_free(&base)
+        return result
+    # structured: a struct of the fields at their offsets
+    if dtype.fields is not None:
+        names = dtype.names
+        n = <int>len(names)
+        tmp1 = allocate(n, sizeof(int), <void**>&blocklengths)
+        tmp2 = allocate(n, sizeof(MPI_Aint), <void**>&displacements)
+        tmp3 = allocate(n, sizeof(MPI_Datatype), <void**>&types)
+        for i from 0 <= i < n:
+            blocklengths[i] = 1
+            displacements[i] = 0
+            types[i] = MPI_DATATYPE_NULL
+        try:
+            for i from 0 <= i < n:
+                field = dtype.fields[names[i]]
+                displacements[i] = field[1]
+                types[i] = PyMPI_dtype_build(field[0])
+            CHKERR( MPI_Type_create_struct(n, blocklengths, displacements,
+                                           types, &tmp) )
+        finally:
+            for i from 0 <= i < n:
+                if types[i] != MPI_DATATYPE_NULL:
+                    MPI_Type_free(&types[i])
+        # trailing padding, as in C structs with alignment
+        try: CHKERR( MPI_Type_create_resized(tmp, 0, extent, &result) )
+        finally: MPI_Type_free(&tmp)
+        return result
+    # scalar: native byte order is required
+    if not dtype.isnative: raise ValueError(
+        "dtype: non-native byte order is not supported")
+    kind = dtype.kind
+    if kind in ('b', 'i', 'u', 'f', 'c') and dtype.char in TypeDict:
+        datatype = TypeDict[dtype.char]
+        CHKERR( MPI_Type_dup(datatype.ob_mpi, &result) )
+    elif kind == 'S':
+        CHKERR( MPI_Type_contiguous(<int>extent, MPI_CHAR, &result) )
+    elif kind in ('U', 'V', 'M', 'm'):
+        CHKERR( MPI_Type_contiguous(<int>extent, MPI_BYTE, &result) )
+    else:
+        raise ValueError("dtype: cannot map '%s' data type" % dtype.str)
+    return result
+
+cdef Datatype PyMPI_dtype_type(object dtype):
+    global PyMPI_dtype_cache
+    if PyMPI_dtype_cache is None:
+        from collections import OrderedDict
+        PyMPI_dtype_cache = OrderedDict()
+    cdef Datatype datatype = PyMPI_dtype_cache.pop(dtype, None)
+    if datatype is not None:
+        PyMPI_dtype_cache[dtype] = datatype
+        return datatype
+    datatype = <Datatype>Datatype.__new__(Datatype)
+    datatype.ob_mpi = PyMPI_dtype_build(dtype)
+    datatype.flags |= PyMPI_OWNED
+    CHKERR( MPI_Type_commit(&datatype.ob_mpi) )
+    cdef Datatype evicted = None
+    if len(PyMPI_dtype_cache) >= PyMPI_DTYPE_CACHE:
+        evicted = PyMPI_dtype_cache.popitem(last=False)[1]
+        PyMPI_strided_purge(evicted.ob_mpi)
+    PyMPI_dtype_cache[dtype] = datatype
+    return datatype
+
+# -----------------------------------------------------------------------------
@@ -0,0 +1,124 @@
+# Author:  Lisandro Dalcin
+# Contact: dalcinl@gmail.com
+"""
+Integration of MPI requests with asyncio event loops
+"""
+
+import asyncio
+import weakref
+from mpi4py import MPI
+
+__all__ = ['Progress', 'get_progress', 'wait']
+
+
+class Progress(object):
+    """
+    Event loop progress driver
+
+    Outstanding requests are completed with a single ``testsome()``
+    call per event loop iteration; while no request completes, the
+    polling delay doubles up to `max_delay`.
+    """
+
+    min_delay = 0.00005
+    """Polling delay (in seconds) after the first idle iteration"""
+
+    max_delay = 0.01
+    """Maximum polling delay (in seconds)"""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.requests = []
+        self.futures = []
+        self.delay = 0.0
+        self.handle = None
+
+    def add(self, request):
+        """
+        Add a request, return a future for its result
+        """
+        try:
+            future = self.loop.create_future()
+        except AttributeError:
+            future = asyncio.Future(loop=self.loop)
+        self.requests.append(request)
+        self.futures.append(future)
+        if self.delay > 0.0 and self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+        self.delay = 0.0
+        if self.handle is None:
+            self.schedule()
+        return future
+
+    def schedule(self):
+        if self.delay > 0.0:
+            self.handle = self.loop.call_later(self.delay, self.poll)
+        else:
+            self.handle = self.loop.call_soon(self.poll)
+
+    def poll(self):
+        """
+        Test for completion of the outstanding requests
+        """
+        self.handle = None
+        requests, futures = self.requests, self.futures
+        try:
+            indices, objects = MPI.Request.testsome(requests)
+        except Exception as exc:
+            self.requests, self.futures = [], []
+            for future in futures:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        if indices is None:
+            # no active requests (completed elsewhere)
+            indices = range(len(requests))
+            objects = [None] * len(requests)
+        if indices:
+            for i, obj in zip(indices, objects):
+                if not futures[i].done():
+                    futures[i].set_result(obj)
+            done = set(indices)
+            self.requests = [requests[i] for i in range(len(requests))
+                             if i not in done]
+            self.futures = [futures[i] for i in range(len(futures))
+                            if i not in done]
+            self.delay = 0.0
+        else:
+            self.delay = min(self.delay * 2 or self.min_delay,
+                             self.max_delay)
+        if self.requests:
+            self.schedule()
+
+
+_progress = weakref.WeakKeyDictionary()
+
+def _get_loop():
+    try:
+        return asyncio.get_running_loop()
+    except (AttributeError, RuntimeError):
+        return asyncio.get_event_loop()
+
+def get_progress(loop=None):
+    """
+    Return the progress driver of an event loop
+    (by default, the running or current one)
+    """
+    if loop is None:
+        loop = _get_loop()
+    try:
+        return _progress[loop]
+    except KeyError:
+        progress = _progress[loop] = Progress(loop)
+        return progress
+
+def wait(request, loop=None):
+    """
+    Return a future for the completion of a request; its result is
+    the received object for object requests, otherwise ``None``.
+
+    .. note:: Cancelling the future does not cancel the request, it
+       is still completed by the progress driver.
+    """
+    return get_progress(loop).add(request)
@@ -216,6 +216,14 @@ PyMPIString_AsStringAndSize(PyObject *ob, const char **s, Py_ssize_t *n)
 #define PyMPIString_FromStringAndSize PyString_FromStringAndSize
 #endif
 
+#if defined(PYPY_VERSION)
+#define PyMPIString_CHECK_INTERNED(ob) 1
+#elif PY_MAJOR_VERSION >= 3
+#define PyMPIString_CHECK_INTERNED(ob) PyUnicode_CHECK_INTERNED(ob)
+#else
+#define PyMPIString_CHECK_INTERNED(ob) PyString_CHECK_INTERNED(ob)
+#endif
+
 /* ------------------------------------------------------------------------- */
 
 #if PY_VERSION_HEX < 0x02040000
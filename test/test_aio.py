@@ -0,0 +1,96 @@
+from mpi4py import MPI
+import mpiunittest as unittest
+
+try:
+    import asyncio
+    from mpi4py import aio
+except ImportError:
+    asyncio = None
+
+
+class BaseTestAIO(object):
+
+    COMM = MPI.COMM_NULL
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def run_until_complete(self, future):
+        return self.loop.run_until_complete(future)
+
+    def testSendRecv(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        dest = (rank + 1) % size
+        source = (rank - 1) % size
+        for smess in (None, 7, 'mpi4py', [1] * 1000):
+            rfuture = aio.wait(self.COMM.irecv(None, source, 1), self.loop)
+            sfuture = aio.wait(self.COMM.isend(smess, dest, 1), self.loop)
+            rmess = self.run_until_complete(rfuture)
+            self.assertEqual(self.run_until_complete(sfuture), None)
+            self.assertEqual(rmess, smess)
+
+    def testSendRecvBuf(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        dest = (rank + 1) % size
+        source = (rank - 1) % size
+        sbuf = bytearray([rank] * 10)
+        rbuf = bytearray(10)
+        futures = [aio.wait(self.COMM.Irecv(rbuf, source, 2), self.loop),
+                   aio.wait(self.COMM.Isend(sbuf, dest, 2), self.loop)]
+        results = self.run_until_complete(asyncio.gather(*futures))
+        self.assertEqual(results, [None, None])
+        self.assertEqual(rbuf, bytearray([source] * 10))
+
+    def testAwait(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        dest = (rank + 1) % size
+        source = (rank - 1) % size
+        request = self.COMM.irecv(None, source, 3)
+        self.COMM.send(rank, dest, 3)
+        future = asyncio.ensure_future(request, loop=self.loop)
+        self.assertEqual(self.run_until_complete(future), source)
+
+    def testCommMethods(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        dest = (rank + 1) % size
+        source = (rank - 1) % size
+        asyncio.set_event_loop(self.loop)
+        try:
+            futures = [self.COMM.arecv(None, source, 4),
+                       self.COMM.asend(rank, dest, 4)]
+            results = self.run_until_complete(asyncio.gather(*futures))
+            self.assertEqual(results, [source, None])
+        finally:
+            asyncio.set_event_loop(None)
+
+    def testProgress(self):
+        progress = aio.get_progress(self.loop)
+        self.assertTrue(progress is aio.get_progress(self.loop))
+        self.assertEqual(len(progress.requests), 0)
+        future = progress.add(MPI.Request())
+        self.assertEqual(self.run_until_complete(future), None)
+        self.assertEqual(len(progress.requests), 0)
+        self.assertEqual(progress.delay, 0.0)
+
+
+class TestAIOSelf(BaseTestAIO, unittest.TestCase):
+    COMM = MPI.COMM_SELF
+
+class TestAIOWorld(BaseTestAIO, unittest.TestCase):
+    COMM = MPI.COMM_WORLD
+
+
+if asyncio is None:
+    del BaseTestAIO
+    del TestAIOSelf
+    del TestAIOWorld
+
+if __name__ == '__main__':
+    unittest.main()
@@ -333,6 +333,51 @@ class BaseTestCCOBuf(object):
                             else:
                                 self.assertEqual(value, i)
 
+    def testLargeCount(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        datatype = MPI.BYTE.Create_contiguous(0).Commit()
+        buf = bytearray(8)
+        for count in (2**31, 2**32 + 5):
+            for root in range(size):
+                self.COMM.Bcast([buf, count, datatype], root=root)
+                counts = [count] * size
+                displs = [count * i for i in range(size)]
+                self.COMM.Gatherv([buf, count, datatype],
+                                  [buf, (counts, displs), datatype],
+                                  root=root)
+            self.COMM.Alltoallv([buf, (counts, displs), datatype],
+                                [buf, (counts, None), datatype])
+        counts = [3] * size
+        displs = [2**40 + i for i in range(size)]
+        self.assertRaises(OverflowError, self.COMM.Alltoallv,
+                          [buf, (counts, displs), datatype],
+                          [buf, (counts, None), datatype])
+        datatype.Free()
+
+    def testBufferSpec(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        for array in arrayimpl.ArrayTypes:
+            for typecode in arrayimpl.TypeMap:
+                buf = array(-1, typecode, 2 * size)
+                sbuf = MPI.BufferSpec(buf.as_mpi())
+                rbuf = array(-1, typecode, 2)
+                rmsg = MPI.BufferSpec(rbuf.as_mpi())
+                for root in range(size):
+                    if rank == root:
+                        for i in range(2 * size): buf[i] = root
+                    self.COMM.Scatter(sbuf, rmsg, root=root)
+                    for value in rbuf:
+                        self.assertEqual(value, root)
+                    self.COMM.Bcast(sbuf, root=root)
+                    for value in buf:
+                        self.assertEqual(value, root)
+                gbuf = array(-1, typecode, 2 * size)
+                self.COMM.Allgather(rmsg, MPI.BufferSpec(gbuf.as_mpi()))
+                for value in gbuf:
+                    self.assertEqual(value, size - 1)
+
 
 class BaseTestCCOBufInplace(object):
 
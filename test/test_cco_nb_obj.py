@@ -0,0 +1,254 @@
+from mpi4py import MPI
+import mpiunittest as unittest
+
+_basic = [None,
+          True, False,
+          -7, 0, 7, 2**31,
+          -2**63, 2**63-1,
+          -2.17, 0.0, 3.14,
+          1+2j, 2-3j,
+          'mpi4py',
+          ]
+messages = _basic
+messages += [ list(_basic),
+              tuple(_basic),
+              dict([('k%d' % key, val)
+                    for key, val in enumerate(_basic)])
+              ]
+messages += [ 'x' * 100000, [b'y' * 1000] * 100 ]
+
+class BaseTestCCONBObj(object):
+
+    COMM = MPI.COMM_NULL
+
+    def testIbcast(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        for smess in messages:
+            for root in range(size):
+                if rank == root:
+                    request = self.COMM.ibcast(smess, root=root)
+                else:
+                    request = self.COMM.ibcast(None, root=root)
+                rmess = request.wait()
+                self.assertEqual(rmess, smess)
+
+    def testIgather(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        for smess in messages + [messages]:
+            for root in range(size):
+                request = self.COMM.igather(smess, root=root)
+                rmess = request.wait()
+                if rank == root:
+                    self.assertEqual(rmess, [smess] * size)
+                else:
+                    self.assertEqual(rmess, None)
+
+    def testIallgather(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        for smess in messages + [messages]:
+            request = self.COMM.iallgather(smess)
+            rmess = request.wait()
+            self.assertEqual(rmess, [smess] * size)
+
+    def testIalltoall(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        for smess in messages + [messages]:
+            request = self.COMM.ialltoall([smess] * size)
+            rmess = request.wait()
+            self.assertEqual(rmess, [smess] * size)
+        smess = [str(rank) * (i * 10000) or None for i in range(size)]
+        request = self.COMM.ialltoall(smess)
+        rmess = request.wait()
+        self.assertEqual(rmess, [str(i) * (rank * 10000) or None
+                                 for i in range(size)])
+
+    def testTest(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        smess = str(rank) * (rank * 10000)
+        request = self.COMM.iallgather(smess)
+        flag, rmess = request.test()
+        while not flag:
+            flag, rmess = request.test()
+        self.assertEqual(rmess, [str(i) * (i * 10000)
+                                 for i in range(size)])
+
+    def testMany(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        smess = str(rank) * (rank * 10000)
+        requests = [self.COMM.iallgather(smess),
+                    self.COMM.ibcast(smess, root=size-1),
+                    self.COMM.igather(smess, root=0),
+                    self.COMM.ialltoall([smess] * size)]
+        self.assertEqual(self.COMM.allgather(rank), list(range(size)))
+        flag = False
+        while not flag:
+            flag, rmess = requests[-1].test()
+        self.assertEqual(rmess, [str(i) * (i * 10000)
+                                 for i in range(size)])
+        rmess = MPI.Request.waitall(requests[:-1])
+        self.assertEqual(rmess[0], [str(i) * (i * 10000)
+                                    for i in range(size)])
+        self.assertEqual(rmess[1], str(size-1) * ((size-1) * 10000))
+        if rank == 0:
+            self.assertEqual(rmess[2], rmess[0])
+        else:
+            self.assertEqual(rmess[2], None)
+
+    def testCompletion(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        smess = str(rank) * (rank * 10000)
+        def start():
+            return [self.COMM.ialltoall([smess] * size),
+                    self.COMM.iallgather(smess),
+                    self.COMM.ibcast(smess, root=size-1),
+                    self.COMM.igather(smess, root=0)]
+        requests = start()
+        MPI.Request.waitall(requests)
+        self.assertFalse(any(requests))
+        requests = start()
+        flag = False
+        while not flag:
+            flag, _ = MPI.Request.testall(requests)
+        self.assertFalse(any(requests))
+        requests = start()
+        for i in range(len(requests)):
+            index, _ = MPI.Request.waitany(requests)
+            self.assertFalse(requests[index])
+        self.assertEqual(MPI.Request.waitany(requests),
+                         (MPI.UNDEFINED, None))
+        requests = start()
+        while any(requests):
+            MPI.Request.testany(requests)
+        requests = start()
+        while MPI.Request.waitsome(requests)[0] is not None:
+            pass
+        self.assertFalse(any(requests))
+        requests = start()
+        while any(requests):
+            MPI.Request.testsome(requests)
+
+
+class TestCCONBObjSelf(BaseTestCCONBObj, unittest.TestCase):
+    COMM = MPI.COMM_SELF
+
+class TestCCONBObjWorld(BaseTestCCONBObj, unittest.TestCase):
+    COMM = MPI.COMM_WORLD
+
+class TestCCONBObjSelfDup(BaseTestCCONBObj, unittest.TestCase):
+    def setUp(self):
+        self.COMM = MPI.COMM_SELF.Dup()
+    def tearDown(self):
+        self.COMM.Free()
+
+class TestCCONBObjWorldDup(BaseTestCCONBObj, unittest.TestCase):
+    def setUp(self):
+        self.COMM = MPI.COMM_WORLD.Dup()
+    def tearDown(self):
+        self.COMM.Free()
+
+
+class TestCCONBObjInter(unittest.TestCase):
+
+    BASECOMM  = MPI.COMM_WORLD
+    INTRACOMM = MPI.COMM_NULL
+    INTERCOMM = MPI.COMM_NULL
+
+    def setUp(self):
+        BASE_SIZE = self.BASECOMM.Get_size()
+        BASE_RANK = self.BASECOMM.Get_rank()
+        if BASE_SIZE < 2:
+            return
+        if BASE_RANK < BASE_SIZE // 2 :
+            self.COLOR = 0
+            self.LOCAL_LEADER = 0
+            self.REMOTE_LEADER = BASE_SIZE // 2
+        else:
+            self.COLOR = 1
+            self.LOCAL_LEADER = 0
+            self.REMOTE_LEADER = 0
+        self.INTRACOMM = self.BASECOMM.Split(self.COLOR, key=0)
+        self.INTERCOMM = self.INTRACOMM.Create_intercomm(self.LOCAL_LEADER,
+                                                         self.BASECOMM,
+                                                         self.REMOTE_LEADER)
+
+    def tearDown(self):
+        if self.INTRACOMM != MPI.COMM_NULL:
+            self.INTRACOMM.Free()
+            del self.INTRACOMM
+        if self.INTERCOMM != MPI.COMM_NULL:
+            self.INTERCOMM.Free()
+            del self.INTERCOMM
+
+    def testIbcast(self):
+        if self.INTERCOMM == MPI.COMM_NULL: return
+        rank = self.INTERCOMM.Get_rank()
+        size = self.INTERCOMM.Get_size()
+        rsize = self.INTERCOMM.Get_remote_size()
+        for smess in messages + [messages]:
+            for color in [0, 1]:
+                if self.COLOR == color:
+                    for root in range(size):
+                        if root == rank:
+                            request = self.INTERCOMM.ibcast(smess, root=MPI.ROOT)
+                        else:
+                            request = self.INTERCOMM.ibcast(None, root=MPI.PROC_NULL)
+                        self.assertEqual(request.wait(), None)
+                else:
+                    for root in range(rsize):
+                        request = self.INTERCOMM.ibcast(None, root=root)
+                        self.assertEqual(request.wait(), smess)
+
+    def testIgather(self):
+        if self.INTERCOMM == MPI.COMM_NULL: return
+        rank = self.INTERCOMM.Get_rank()
+        size = self.INTERCOMM.Get_size()
+        rsize = self.INTERCOMM.Get_remote_size()
+        for smess in messages + [messages]:
+            for color in [0, 1]:
+                if self.COLOR == color:
+                    for root in range(size):
+                        if root == rank:
+                            request = self.INTERCOMM.igather(smess, root=MPI.ROOT)
+                            self.assertEqual(request.wait(), [smess] * rsize)
+                        else:
+                            request = self.INTERCOMM.igather(None, root=MPI.PROC_NULL)
+                            self.assertEqual(request.wait(), None)
+                else:
+                    for root in range(rsize):
+                        request = self.INTERCOMM.igather(smess, root=root)
+                        self.assertEqual(request.wait(), None)
+
+    def testIallgather(self):
+        if self.INTERCOMM == MPI.COMM_NULL: return
+        rsize = self.INTERCOMM.Get_remote_size()
+        for smess in messages + [messages]:
+            request = self.INTERCOMM.iallgather(smess)
+            self.assertEqual(request.wait(), [smess] * rsize)
+
+    def testIalltoall(self):
+        if self.INTERCOMM == MPI.COMM_NULL: return
+        rsize = self.INTERCOMM.Get_remote_size()
+        for smess in messages + [messages]:
+            request = self.INTERCOMM.ialltoall([smess] * rsize)
+            self.assertEqual(request.wait(), [smess] * rsize)
+
+
+try:
+    MPI.COMM_SELF.Ibarrier().Wait()
+except NotImplementedError:
+    del BaseTestCCONBObj
+    del TestCCONBObjSelf
+    del TestCCONBObjWorld
+    del TestCCONBObjSelfDup
+    del TestCCONBObjWorldDup
+    del TestCCONBObjInter
+
+if __name__ == '__main__':
+    unittest.main()
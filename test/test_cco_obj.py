@@ -8,6 +8,11 @@ except NameError:
 cumsum  = lambda seq: _reduce(lambda x, y: x+y, seq, 0)
 cumprod = lambda seq: _reduce(lambda x, y: x*y, seq, 1)
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 _basic = [None,
           True, False,
           -7, 0, 7, 2**31,
@@ -72,6 +77,67 @@ class BaseTestCCOObj(object):
             rmess = self.COMM.alltoall([smess] * size, None)
             self.assertEqual(rmess, [smess] * size)
 
+    def testBcastLarge(self):
+        size = self.COMM.Get_size()
+        for n in (100, 1000, 100000):
+            for root in range(size):
+                smess = str(root) * n
+                rmess = self.COMM.bcast(smess, root=root)
+                self.assertEqual(rmess, smess)
+
+    def testGatherLarge(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        for root in range(size):
+            smess = str(rank) * (rank * 10000) or None
+            rmess = self.COMM.gather(smess, root=root)
+            if rank == root:
+                self.assertEqual(rmess, [str(i) * (i * 10000) or None
+                                         for i in range(size)])
+            else:
+                self.assertEqual(rmess, None)
+
+    def testScatterLarge(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        for root in range(size):
+            smess = None
+            if rank == root:
+                smess = [str(i) * (i * 10000) or None for i in range(size)]
+            rmess = self.COMM.scatter(smess, root=root)
+            self.assertEqual(rmess, str(rank) * (rank * 10000) or None)
+
+    def testAllgatherLarge(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        smess = str(rank) * (rank * 10000) or None
+        rmess = self.COMM.allgather(smess)
+        self.assertEqual(rmess, [str(i) * (i * 10000) or None
+                                 for i in range(size)])
+
+    def testAlltoallLarge(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        smess = [str(rank) * (i * 10000) or None for i in range(size)]
+        rmess = self.COMM.alltoall(smess, None)
+        self.assertEqual(rmess, [str(i) * (rank * 10000) or None
+                                 for i in range(size)])
+
+    def testSparseExchange(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        for smess in (None, {}):
+            rmess = self.COMM.sparse_exchange(smess)
+            self.assertEqual(rmess, {})
+        for k in range(3):
+            dests = set([rank, (rank+1) % size, (rank+k) % size])
+            smess = dict((d, [rank, d, str(d) * (k * 10000)])
+                         for d in dests)
+            rmess = self.COMM.sparse_exchange(smess)
+            sources = set([rank, (rank-1) % size, (rank-k) % size])
+            self.assertEqual(rmess, dict((s, [s, rank, str(rank) * (k * 10000)])
+                                         for s in sources))
+
     def testReduce(self):
         size = self.COMM.Get_size()
         rank = self.COMM.Get_rank()
@@ -116,6 +182,154 @@ class BaseTestCCOObj(object):
             elif op == MPI.MINLOC:
                 self.assertEqual(value[1], 0)
 
+    def testReduceNonCommutative(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        concat = lambda x, y: x + y
+        for root in range(size):
+            value = self.COMM.reduce([rank], op=concat, root=root)
+            if rank != root:
+                self.assertTrue(value is None)
+            else:
+                self.assertEqual(value, list(range(size)))
+        value = self.COMM.allreduce([rank], op=concat)
+        self.assertEqual(value, list(range(size)))
+
+    def testReduceDict(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        def merge(x, y):
+            z = dict(x)
+            for k, v in y.items():
+                z[k] = z.get(k, 0) + v
+            return z
+        value = self.COMM.allreduce({'a': 1, rank: rank}, op=merge)
+        expected = dict((r, r) for r in range(size))
+        expected['a'] = size
+        self.assertEqual(value, expected)
+
+    def withReduceBuffers(self, check):
+        pickle = MPI._p_pickle
+        self.assertFalse(pickle.REDUCE_BUFFERS)
+        try:
+            for flag in (False, True):
+                pickle.REDUCE_BUFFERS = flag
+                check()
+        finally:
+            pickle.REDUCE_BUFFERS = False
+
+    def testReduceScalar(self):
+        self.withReduceBuffers(self.checkReduceScalar)
+
+    def checkReduceScalar(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        for root in range(size):
+            value = self.COMM.reduce(rank + 0.5, op=MPI.SUM, root=root)
+            if rank != root:
+                self.assertTrue(value is None)
+            else:
+                self.assertEqual(value, cumsum(range(size)) + size * 0.5)
+        value = self.COMM.allreduce(float(rank), op=MPI.MAX)
+        self.assertEqual(value, float(size-1))
+        value = self.COMM.allreduce(complex(rank, 1), op=MPI.SUM)
+        self.assertEqual(value, complex(cumsum(range(size)), size))
+        value = self.COMM.scan(2.0, op=MPI.PROD)
+        self.assertEqual(value, 2.0 ** (rank + 1))
+        value = self.COMM.exscan(1.0, op=MPI.SUM)
+        if rank == 0:
+            self.assertTrue(value is None)
+        else:
+            self.assertEqual(value, float(rank))
+        value = self.COMM.allreduce(1.0 if rank else 1, op=MPI.SUM)
+        self.assertEqual(value, size)
+
+    def testReduceInt(self):
+        pickle = MPI._p_pickle
+        comm = self.COMM
+        size = comm.Get_size()
+        rank = comm.Get_rank()
+        stats = pickle.STATS
+        pickle.REDUCE_BUFFERS = True
+        pickle.STATS = True
+        try:
+            pickle.reset_stats()
+            value = comm.allreduce(rank + 1, op=MPI.SUM)
+            self.assertEqual(type(value), int)
+            self.assertEqual(value, cumsum(range(1, size+1)))
+            value = comm.allreduce(-rank, op=MPI.MIN)
+            self.assertEqual(type(value), int)
+            self.assertEqual(value, 1 - size)
+            value = comm.allreduce(1 << rank, op=MPI.BOR)
+            self.assertEqual(value, (1 << size) - 1)
+            value = comm.scan(2, op=MPI.PROD)
+            self.assertEqual(type(value), int)
+            self.assertEqual(value, 2 ** (rank + 1))
+            value = comm.reduce(rank, op=MPI.MAX, root=0)
+            if rank == 0:
+                self.assertEqual(type(value), int)
+                self.assertEqual(value, size - 1)
+            else:
+                self.assertTrue(value is None)
+            counters = pickle.get_stats().values()
+            self.assertEqual(sum(c['dumps'] for c in counters), 0)
+            self.assertEqual(sum(c['loads'] for c in counters), 0)
+            for big in (1 << 70, -(1 << 70), 1 << 62):
+                value = comm.allreduce(big, op=MPI.SUM)
+                self.assertEqual(value, big * size)
+            value = comm.allreduce(1 << 40, op=MPI.PROD)
+            self.assertEqual(value, (1 << 40) ** size)
+        finally:
+            pickle.REDUCE_BUFFERS = False
+            pickle.STATS = stats
+
+    if numpy is not None:
+        def testReduceArray(self):
+            self.withReduceBuffers(self.checkReduceArray)
+
+        def checkReduceArray(self):
+            size = self.COMM.Get_size()
+            rank = self.COMM.Get_rank()
+            for typecode in 'ilfdD':
+                array = numpy.arange(10, dtype=typecode) * (rank + 1)
+                for root in range(size):
+                    value = self.COMM.reduce(array, op=MPI.SUM, root=root)
+                    if rank != root:
+                        self.assertTrue(value is None)
+                    else:
+                        self.assertEqual(value.dtype, array.dtype)
+                        self.assertEqual(value.tolist(),
+                                         (numpy.arange(10) *
+                                          cumsum(range(1, size+1))).tolist())
+                value = self.COMM.allreduce(array[::2], op=MPI.SUM)
+                self.assertEqual(value.tolist(),
+                                 (numpy.arange(0, 10, 2) *
+                                  cumsum(range(1, size+1))).tolist())
+                value = self.COMM.scan(array, op=MPI.SUM)
+                self.assertEqual(value.tolist(),
+                                 (numpy.arange(10) *
+                                  cumsum(range(1, rank+2))).tolist())
+                value = self.COMM.exscan(array, op=MPI.SUM)
+                if rank == 0:
+                    self.assertTrue(value is None)
+                else:
+                    self.assertEqual(value.tolist(),
+                                     (numpy.arange(10) *
+                                      cumsum(range(1, rank+1))).tolist())
+            array = numpy.arange(10, dtype='i') * (rank + 1)
+            if MPI._p_pickle.REDUCE_BUFFERS:
+                value = self.COMM.allreduce(array, op=MPI.MAX)
+                self.assertEqual(value.tolist(),
+                                 list(range(0, 10 * size, size)))
+            value = self.COMM.allreduce(array if rank else list(array),
+                                        op=MPI.SUM)
+            self.assertEqual(list(value),
+                             (numpy.arange(10) *
+                              cumsum(range(1, size+1))).tolist())
+            value = self.COMM.allreduce(array if rank else
+                                        array.reshape(1, 10),
+                                        op=MPI.SUM)
+            self.assertEqual(value.shape, (1, 10))
 
     def testScan(self):
         size = self.COMM.Get_size()
@@ -132,6 +346,17 @@ class BaseTestCCOObj(object):
         self.assertEqual(minloc, (0, 0))
         self.assertEqual(maxloc, (rank, rank))
 
+    def testScanNonCommutative(self):
+        rank = self.COMM.Get_rank()
+        concat = lambda x, y: x + y
+        value = self.COMM.scan([rank], op=concat)
+        self.assertEqual(value, list(range(rank+1)))
+        value = self.COMM.exscan([rank], op=concat)
+        if rank == 0:
+            self.assertTrue(value is None)
+        else:
+            self.assertEqual(value, list(range(rank)))
+
     def testExscan(self):
         size = self.COMM.Get_size()
         rank = self.COMM.Get_rank()
@@ -141,6 +141,17 @@ class BaseTestCCOObjInter(object):
             rmess = self.INTERCOMM.alltoall([smess] * rsize)
             self.assertEqual(rmess, [smess] * rsize)
 
+    def testSparseExchange(self):
+        if self.INTRACOMM == MPI.COMM_NULL: return
+        if self.INTERCOMM == MPI.COMM_NULL: return
+        rank = self.INTERCOMM.Get_rank()
+        size = self.INTERCOMM.Get_size()
+        rsize = self.INTERCOMM.Get_remote_size()
+        smess = dict((d, (rank, d)) for d in range(rsize) if d % size == rank)
+        rmess = self.INTERCOMM.sparse_exchange(smess)
+        self.assertEqual(rmess, dict((s, (s, rank)) for s in range(rsize)
+                                     if rank % rsize == s))
+
     def testReduce(self):
         if self.INTRACOMM == MPI.COMM_NULL: return
         if self.INTERCOMM == MPI.COMM_NULL: return
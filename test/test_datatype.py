@@ -1,6 +1,11 @@
 from mpi4py import MPI
 import mpiunittest as unittest
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 datatypes_c = [
 MPI.CHAR, MPI.WCHAR,
 MPI.SIGNED_CHAR, MPI.SHORT, MPI.INT, MPI.LONG,
@@ -252,6 +257,33 @@ class TestDatatype(unittest.TestCase):
         for dtype in datatypes:
             dtype.Commit()
 
+    if numpy is not None:
+        def testFromNumPyDtype(self):
+            for typecode in ('b', 'i', 'l', 'f', 'd', 'D', 'S5', 'V3'):
+                dtype = numpy.dtype(typecode)
+                newtype = MPI.Datatype.from_numpy_dtype(dtype)
+                self.assertEqual(newtype.size, dtype.itemsize)
+                self.assertEqual(newtype.extent, dtype.itemsize)
+                newtype.Free()
+            fields = [('a', 'i1'), ('b', 'f8'), ('c', 'i4', (3,)),
+                      ('d', [('x', 'f4'), ('y', 'S3')])]
+            for align in (False, True):
+                dtype = numpy.dtype(fields, align=align)
+                newtype = MPI.Datatype.from_numpy_dtype(dtype)
+                self.assertEqual(newtype.size, 1 + 8 + 12 + 4 + 3)
+                self.assertEqual(newtype.lb, 0)
+                self.assertEqual(newtype.extent, dtype.itemsize)
+                newtype.Free()
+            newtype = MPI.Datatype.from_numpy_dtype(fields[:2])
+            self.assertEqual(newtype.size, 9)
+            newtype.Free()
+            self.assertRaises(ValueError, MPI.Datatype.from_numpy_dtype,
+                              numpy.dtype('d').newbyteorder())
+            self.assertRaises(ValueError, MPI.Datatype.from_numpy_dtype,
+                              numpy.dtype(object))
+            self.assertRaises(ValueError, MPI.Datatype.from_numpy_dtype,
+                              numpy.dtype('e'))
+
 
 class TestGetAddress(unittest.TestCase):
 
@@ -2,6 +2,11 @@ from mpi4py import MPI
 import mpiunittest as unittest
 import arrayimpl
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 class BaseTestP2PBuf(object):
 
@@ -23,6 +28,44 @@ class BaseTestP2PBuf(object):
                         self.assertEqual(value, s)
                     self.assertEqual(rbuf[-1], -1)
 
+    def testSendrecvBufferSpec(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        dest = (rank + 1) % size
+        source = (rank - 1) % size
+        for array in arrayimpl.ArrayTypes:
+            for typecode in arrayimpl.TypeMap:
+                sbuf = array(rank, typecode, 5)
+                rbuf = array(-1, typecode, 6)
+                smsg = MPI.BufferSpec(sbuf.as_mpi())
+                rmsg = MPI.BufferSpec(rbuf.as_mpi_c(5))
+                self.assertEqual(smsg.count, 5)
+                self.assertEqual(rmsg.count, 5)
+                self.assertEqual(rmsg.datatype, smsg.datatype)
+                for i in range(3):
+                    request = self.COMM.Isend(smsg, dest, i)
+                    self.COMM.Recv(rmsg, source, i)
+                    request.Wait()
+                    for value in rbuf[:-1]:
+                        self.assertEqual(value, source)
+                    self.assertEqual(rbuf[-1], -1)
+        smsg = MPI.BufferSpec(b"abc")
+        self.assertTrue(smsg.readonly)
+        self.assertEqual(smsg.count, 3)
+        self.assertRaises(ValueError, self.COMM.Irecv, smsg, rank, 0)
+
+    def testSendrecvLargeCount(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        dest = (rank + 1) % size
+        source = (rank - 1) % size
+        datatype = MPI.BYTE.Create_contiguous(0).Commit()
+        buf = bytearray(8)
+        for count in (2**31, 2**32 + 5):
+            self.COMM.Sendrecv([buf, count, datatype], dest, 0,
+                               [buf, count, datatype], source, 0)
+        datatype.Free()
+
     def testSendRecv(self):
         size = self.COMM.Get_size()
         rank = self.COMM.Get_rank()
@@ -130,6 +173,118 @@ class BaseTestP2PBuf(object):
         finally:
             comm.Free()
 
+    if numpy is not None:
+        def testSendRecvStrided(self):
+            size = self.COMM.Get_size()
+            rank = self.COMM.Get_rank()
+            dest = (rank + 1) % size
+            source = (rank - 1) % size
+            array = numpy.arange(12 * 10, dtype='d').reshape(12, 10)
+            for typecode in ('i', 'd', 'D'):
+                array = array.astype(typecode)
+                for index in (numpy.s_[:, 3],
+                              numpy.s_[::2],
+                              numpy.s_[1::3, 2:7],
+                              numpy.s_[::-1, ::-2],
+                              numpy.s_[:0, 1]):
+                    sbuf = array[index]
+                    for i in range(2):
+                        rbuf = numpy.zeros_like(sbuf, order='C')
+                        self.COMM.Sendrecv(sbuf, dest, 0,
+                                           rbuf, source, 0)
+                        self.assertTrue(numpy.all(rbuf == sbuf))
+                        target = numpy.zeros_like(array)
+                        self.COMM.Sendrecv(sbuf, dest, 0,
+                                           target[index], source, 0)
+                        self.assertTrue(numpy.all(target[index] == sbuf))
+                        target[index] = 0
+                        self.assertTrue(numpy.all(target == 0))
+            sbuf = numpy.arange(12 * 10, dtype='d').reshape(12, 10)[:, 3]
+            rbuf = numpy.zeros(12, dtype='d')
+            request = self.COMM.Isend([sbuf, MPI.DOUBLE], dest, 0)
+            self.COMM.Recv(rbuf, source, 0)
+            request.Wait()
+            self.assertTrue(numpy.all(rbuf == sbuf))
+            self.assertRaises(ValueError, self.COMM.Isend,
+                              [sbuf, MPI.BYTE], dest, 0)
+            self.assertRaises(ValueError, self.COMM.Isend,
+                              [sbuf, 12, MPI.DOUBLE], dest, 0)
+
+        def testSendRecvManyStrided(self):
+            size = self.COMM.Get_size()
+            rank = self.COMM.Get_rank()
+            dest = (rank + 1) % size
+            source = (rank - 1) % size
+            array = numpy.arange(300 * 4, dtype='i').reshape(300, 4)
+            target = numpy.zeros_like(array)
+            request = self.COMM.Irecv(target[:, 1], source, 1)
+            for n in range(2, 300):
+                sbuf = array[:n, 2]
+                rbuf = numpy.zeros_like(array)
+                self.COMM.Sendrecv(sbuf, dest, 0,
+                                   rbuf[:n, 3], source, 0)
+                self.assertTrue(numpy.all(rbuf[:n, 3] == sbuf))
+                self.assertTrue(numpy.all(rbuf[:, :3] == 0))
+            self.COMM.Send(array[:, 0], dest, 1)
+            request.Wait()
+            self.assertTrue(numpy.all(target[:, 1] == array[:, 0]))
+            target[:, 1] = 0
+            self.assertTrue(numpy.all(target == 0))
+
+        def testSendRecvStructured(self):
+            size = self.COMM.Get_size()
+            rank = self.COMM.Get_rank()
+            dest = (rank + 1) % size
+            source = (rank - 1) % size
+            fields = [('a', 'i1'), ('b', 'f8'), ('c', 'i4', (3,)),
+                      ('d', [('x', 'f4'), ('y', 'S3')])]
+            for align in (False, True):
+                dtype = numpy.dtype(fields, align=align)
+                sbuf = numpy.zeros(10, dtype=dtype)
+                sbuf['a'] = numpy.arange(10)
+                sbuf['b'] = rank + 0.5
+                sbuf['c'] = [1, 2, 3]
+                sbuf['d']['x'] = -1
+                sbuf['d']['y'] = b'abc'
+                for index in (numpy.s_[:], numpy.s_[::3]):
+                    rbuf = numpy.zeros_like(sbuf)
+                    self.COMM.Sendrecv(sbuf[index], dest, 0,
+                                       rbuf[index], source, 0)
+                    self.assertEqual(rbuf[index]['a'].tolist(),
+                                     sbuf[index]['a'].tolist())
+                    self.assertTrue(numpy.all(rbuf[index]['b'] ==
+                                              source + 0.5))
+                    self.assertTrue(numpy.all(rbuf[index]['c'] ==
+                                              [1, 2, 3]))
+                    self.assertTrue(numpy.all(rbuf[index]['d']['x'] == -1))
+                    self.assertTrue(numpy.all(rbuf[index]['d']['y'] ==
+                                              b'abc'))
+
+        def testSendRecvManyStructured(self):
+            size = self.COMM.Get_size()
+            rank = self.COMM.Get_rank()
+            dest = (rank + 1) % size
+            source = (rank - 1) % size
+            def make(n):
+                dtype = numpy.dtype([('a', 'i4'), ('b', 'S%d' % n)])
+                buf = numpy.zeros(10, dtype=dtype)
+                buf['a'] = numpy.arange(10) + n
+                buf['b'] = b'x' * n
+                return buf
+            first = make(1)
+            target = numpy.zeros_like(first)
+            request = self.COMM.Irecv(target[::2], source, 1)
+            for n in range(2, 300):
+                sbuf = make(n)
+                rbuf = numpy.zeros_like(sbuf)
+                self.COMM.Sendrecv(sbuf[::3], dest, 0,
+                                   rbuf[::3], source, 0)
+                self.assertTrue(numpy.all(rbuf[::3] == sbuf[::3]))
+            self.COMM.Send(first[::2], dest, 1)
+            request.Wait()
+            self.assertTrue(numpy.all(target[::2] == first[::2]))
+            self.assertTrue(numpy.all(target[1::2]['a'] == 0))
+
 class TestP2PBufSelf(BaseTestP2PBuf, unittest.TestCase):
     COMM = MPI.COMM_SELF
 
@@ -26,6 +26,16 @@ messages += [ list(_basic),
                     for key, val in enumerate(_basic)])
               ]
 
+class Record(object):
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+    def __eq__(self, other):
+        return (type(self) is type(other) and
+                self.__dict__ == other.__dict__)
+    def __ne__(self, other):
+        return not self == other
+
 class BaseTestP2PObj(object):
 
     COMM = MPI.COMM_NULL
@@ -154,6 +164,102 @@ class BaseTestP2PObj(object):
                     self.assertEqual(rmess, smess)
                     break
 
+    def testIRecvNoBuffer(self):
+        comm = self.COMM
+        size = comm.Get_size()
+        rank = comm.Get_rank()
+        dst = (rank+1)%size
+        src = (rank-1)%size
+        for smess in messages + [b'x' * (1<<16), list(range(1<<14))]:
+            rreq = comm.irecv(None, src, 0)
+            sreq = comm.isend(smess, dst, 0)
+            rmess = rreq.wait()
+            sreq.wait()
+            self.assertFalse(rreq)
+            self.assertEqual(rmess, smess)
+            rreq = comm.irecv(None, src, 0)
+            sreq = comm.isend(smess, dst, 0)
+            flag = False
+            while not flag:
+                flag, rmess = rreq.test()
+            sreq.wait()
+            self.assertFalse(rreq)
+            self.assertEqual(rmess, smess)
+            rreq = comm.irecv(None, src, 0)
+            sreq = comm.isend(smess, dst, 0)
+            index, rmess = MPI.Request.waitany([rreq])
+            sreq.wait()
+            self.assertEqual(index, 0)
+            self.assertFalse(rreq)
+            self.assertEqual(rmess, smess)
+            rreq = comm.irecv(None, src, 0)
+            sreq = comm.isend(smess, dst, 0)
+            index, rmess = MPI.Request.waitany([sreq, rreq])
+            if index == 0:
+                index, rmess = MPI.Request.waitany([sreq, rreq])
+            self.assertEqual(index, 1)
+            self.assertEqual(rmess, smess)
+            MPI.Request.waitall([sreq, rreq])
+
+    def testWaitsomeTestsome(self):
+        comm = self.COMM
+        size = comm.Get_size()
+        rank = comm.Get_rank()
+        dst = (rank+1)%size
+        src = (rank-1)%size
+        for buf in (None, allocate(512)):
+            smess = [(rank, i) for i in range(5)]
+            rreqs = [comm.irecv(buf and allocate(512), src, i)
+                     for i in range(5)]
+            sreqs = [comm.isend(msg, dst, msg[1]) for msg in smess]
+            rmess = [None] * 5
+            statuses = []
+            indices, objs = MPI.Request.testsome(rreqs, statuses)
+            while indices is not None:
+                self.assertEqual(len(indices), len(objs))
+                for i, obj in zip(indices, objs):
+                    self.assertEqual(rmess[i], None)
+                    rmess[i] = obj
+                for i, status in zip(indices, statuses):
+                    self.assertEqual(status.Get_source(), src)
+                    self.assertEqual(status.Get_tag(), i)
+                indices, objs = MPI.Request.waitsome(rreqs, statuses)
+            self.assertEqual(rmess, [(src, i) for i in range(5)])
+            self.assertEqual(MPI.Request.waitsome(rreqs), (None, None))
+            self.assertEqual(MPI.Request.testsome(rreqs), (None, None))
+            statuses = [MPI.Status() for i in range(5)]
+            rmess = MPI.Request.waitall(sreqs, statuses)
+            self.assertEqual(rmess, [None] * 5)
+
+    def testIRecvNoBufferOrder(self):
+        comm = self.COMM
+        size = comm.Get_size()
+        rank = comm.Get_rank()
+        dst = (rank+1)%size
+        src = (rank-1)%size
+        smess = list(range(10))
+        rreqs = [comm.irecv(None, src, MPI.ANY_TAG),
+                 comm.irecv(None, MPI.ANY_SOURCE, 1),
+                 comm.irecv(None, src, 2)]
+        sreqs = [comm.isend(msg, dst, 1+msg%2) for msg in smess]
+        rmess = [rreqs[2].wait(), rreqs[1].wait(), rreqs[0].wait()]
+        self.assertEqual(rmess, [1, 2, 0])
+        for msg in smess[3:]:
+            rmess = comm.recv(None, src, 1+msg%2)
+            self.assertEqual(rmess, msg)
+        MPI.Request.waitall(sreqs)
+
+    def testIRecvNoBufferCancel(self):
+        comm = self.COMM
+        rreq = comm.irecv(None, MPI.ANY_SOURCE, 7)
+        self.assertTrue(rreq)
+        rreq.Cancel()
+        status = MPI.Status()
+        rmess = rreq.wait(status)
+        self.assertFalse(rreq)
+        self.assertTrue(status.Is_cancelled())
+        self.assertEqual(rmess, None)
+
     def testManyISendAndRecv(self):
         size = self.COMM.Get_size()
         rank = self.COMM.Get_rank()
@@ -306,6 +412,35 @@ class BaseTestP2PObj(object):
                 rmess = smess
             self.assertEqual(rmess, smess)
 
+    def testSession(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        session = self.COMM.session(MPI.PROC_NULL)
+        for smess in messages:
+            session.send(smess)
+            rmess = session.recv()
+            self.assertEqual(rmess, None)
+        dest = (rank + 1) % size
+        source = (rank - 1) % size
+        ssession = self.COMM.session(dest, tag=7)
+        rsession = self.COMM.session(source, tag=7)
+        for smess in messages + [Record('mpi4py', i) for i in range(5)]:
+            request = self.COMM.isend(smess, dest, 0)
+            ssession.send(smess)
+            rmess = self.COMM.recv(None, source, 0)
+            self.assertEqual(rsession.recv(), rmess)
+            self.assertEqual(rmess, smess)
+            request.wait()
+        session = self.COMM.session(rank)
+        smess = [Record('name', i) for i in range(3)]
+        sizes = []
+        for i in range(3):
+            buf = session.dumps(smess)
+            self.assertEqual(session.loads(buf), smess)
+            sizes.append(len(buf))
+        self.assertTrue(sizes[0] > sizes[1])
+        self.assertEqual(sizes[1], sizes[2])
+
 class BaseTestP2PObjDup(BaseTestP2PObj):
     def setUp(self):
         self.COMM = self.COMM.Dup()
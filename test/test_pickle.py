@@ -1,7 +1,7 @@
 from mpi4py import MPI
 import mpiunittest as unittest
 
-import sys
+import sys, os
 
 try:
     import marshal
@@ -94,6 +94,866 @@ class TestPickle(unittest.TestCase):
             self.do_pickle(OBJS2, pickle)
 
 
+try:
+    from pickle import PickleBuffer
+except ImportError:
+    PickleBuffer = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class TestPickleOOB(unittest.TestCase):
+
+    COMM = MPI.COMM_WORLD
+
+    def setUp(self):
+        pickle = MPI._p_pickle
+        self._backup = (pickle.PROTOCOL,
+                        pickle.THRESHOLD)
+        pickle.PROTOCOL = -1
+        pickle.THRESHOLD = 1024
+
+    def tearDown(self):
+        pickle = MPI._p_pickle
+        (pickle.PROTOCOL,
+         pickle.THRESHOLD) = self._backup
+
+    def testThreshold(self):
+        pickle = MPI._p_pickle
+        pickle.THRESHOLD = None
+        self.assertEqual(pickle.THRESHOLD, None)
+        pickle.THRESHOLD = 0
+        self.assertEqual(pickle.THRESHOLD, 0)
+        self.assertRaises(ValueError, setattr, pickle, 'THRESHOLD', -1)
+
+    def makeobjs(self):
+        objs = []
+        for n in (0, 7, 1024, 1<<16):
+            ba = bytearray(b'abc' * n)
+            if PickleBuffer is not None:
+                objs.append(PickleBuffer(ba))
+            objs.append(ba)
+            if numpy is not None:
+                objs.append(numpy.arange(n, dtype='d'))
+        objs.append([b'x' * 4096, list(objs), {'a': list(objs)}])
+        return objs
+
+    def assertSame(self, a, b):
+        if PickleBuffer is not None and isinstance(a, PickleBuffer):
+            a = bytearray(a)
+        if numpy is not None and isinstance(a, numpy.ndarray):
+            self.assertTrue(numpy.all(a == b))
+        elif isinstance(a, (list, tuple)):
+            self.assertEqual(len(a), len(b))
+            for x, y in zip(a, b):
+                self.assertSame(x, y)
+        elif isinstance(a, dict):
+            self.assertEqual(sorted(a), sorted(b))
+            for k in a:
+                self.assertSame(a[k], b[k])
+        else:
+            self.assertEqual(a, b)
+
+    def testSendrecv(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        dest = (rank + 1) % size
+        source = (rank - 1) % size
+        for obj in self.makeobjs():
+            o = self.COMM.sendrecv(obj, dest=dest, source=source)
+            self.assertSame(obj, o)
+
+    def testSendRecvSelf(self):
+        comm = MPI.COMM_SELF
+        for obj in self.makeobjs():
+            req = comm.isend(obj, 0, 0)
+            o = comm.recv(None, 0, 0)
+            req.wait()
+            self.assertSame(obj, o)
+
+    if numpy is not None:
+        def testWritable(self):
+            obj = numpy.arange(1<<12, dtype='i')
+            o = MPI.COMM_SELF.sendrecv(obj)
+            o[0] = -1
+            self.assertEqual(o[0], -1)
+            self.assertEqual(obj[0], 0)
+
+        def testNoAlias(self):
+            comm = MPI.COMM_SELF
+            obj = {'a': numpy.arange(1000.)}
+            buf = bytearray(1<<14)
+            req = comm.isend(obj, 0, 0)
+            o = comm.recv(buf, 0, 0)
+            req.wait()
+            buf[:] = b'\0' * len(buf)
+            self.assertTrue(numpy.all(o['a'] == obj['a']))
+            req = comm.irecv(buf, 0, 0)
+            comm.send(obj, 0, 0)
+            o = req.wait()
+            buf[:] = b'\0' * len(buf)
+            self.assertTrue(numpy.all(o['a'] == obj['a']))
+
+    def testBcast(self):
+        size = self.COMM.Get_size()
+        for obj in self.makeobjs():
+            for root in range(size):
+                o = self.COMM.bcast(obj, root=root)
+                self.assertSame(obj, o)
+
+    def testGather(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        for obj in self.makeobjs():
+            for root in range(size):
+                o = self.COMM.gather(obj, root=root)
+                if rank == root:
+                    self.assertSame([obj] * size, o)
+                else:
+                    self.assertEqual(o, None)
+
+    def testScatter(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        for obj in self.makeobjs():
+            for root in range(size):
+                if rank == root:
+                    o = self.COMM.scatter([obj] * size, root=root)
+                else:
+                    o = self.COMM.scatter(None, root=root)
+                self.assertSame(obj, o)
+
+    def testAllgather(self):
+        size = self.COMM.Get_size()
+        for obj in self.makeobjs():
+            o = self.COMM.allgather(obj)
+            self.assertSame([obj] * size, o)
+
+    def testAlltoall(self):
+        size = self.COMM.Get_size()
+        for obj in self.makeobjs():
+            o = self.COMM.alltoall([obj] * size)
+            self.assertSame([obj] * size, o)
+
+
+class TestPickleRaw(unittest.TestCase):
+
+    COMM = MPI.COMM_WORLD
+
+    def setUp(self):
+        pickle = MPI._p_pickle
+        self._backup = pickle.RAW
+        pickle.RAW = True
+
+    def tearDown(self):
+        pickle = MPI._p_pickle
+        pickle.RAW = self._backup
+
+    def testAttributes(self):
+        pickle = MPI._p_pickle
+        self.assertFalse(self._backup)
+        pickle.RAW = False
+        self.assertFalse(pickle.RAW)
+        pickle.RAW = True
+        self.assertTrue(pickle.RAW)
+
+    def testOptIn(self):
+        pickle = MPI._p_pickle
+        comm = MPI.COMM_SELF
+        obj = b'abc' * 4096
+        for sraw, rraw in ((False, False), (True, False), (False, True)):
+            pickle.RAW = sraw
+            req = comm.isend(obj, 0, 0)
+            status = MPI.Status()
+            comm.Probe(0, 0, status)
+            if sraw:
+                self.assertTrue(status.Get_count() < len(obj) + 128)
+            else:
+                self.assertEqual(status.Get_count(),
+                                 len(pickle.dumps(obj, pickle.PROTOCOL)))
+            pickle.RAW = rraw
+            self.assertEqual(comm.recv(None, 0, 0), obj)
+            req.wait()
+
+    def makeobjs(self):
+        objs = []
+        for n in (0, 7, 4096, 1<<16):
+            objs.append(b'a' * n)
+            objs.append(bytearray(b'b' * n))
+        if numpy is not None:
+            for dtype in ('b', 'i', 'f', 'd', 'D', '>i8', 'S3', 'U2', 'M8[s]'):
+                a = numpy.zeros(1<<12, dtype=dtype)
+                objs.append(a)
+                objs.append(a.reshape(64, 64))
+                objs.append(a.reshape(64, 64).T)
+            objs.append(numpy.arange(24).reshape(2, 3, 4)[:, 1, ::2])
+            objs.append(numpy.float64(3.14))
+            objs.append(numpy.array(7))
+            objs.append(numpy.zeros((0, 3)))
+            objs.append(numpy.zeros(8, dtype=object))
+            objs.append(numpy.zeros(8, dtype='i,d'))
+        return objs
+
+    def assertSame(self, a, b):
+        self.assertEqual(type(a), type(b))
+        if numpy is not None and isinstance(a, numpy.ndarray):
+            self.assertEqual(a.dtype, b.dtype)
+            self.assertEqual(a.shape, b.shape)
+            if a.flags.c_contiguous or a.flags.f_contiguous:
+                self.assertEqual(a.flags.c_contiguous, b.flags.c_contiguous)
+                self.assertEqual(a.flags.f_contiguous, b.flags.f_contiguous)
+            self.assertTrue(numpy.all(a == b))
+        else:
+            self.assertEqual(a, b)
+
+    def testSendrecv(self):
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        dest = (rank + 1) % size
+        source = (rank - 1) % size
+        for obj in self.makeobjs():
+            o = self.COMM.sendrecv(obj, dest=dest, source=source)
+            self.assertSame(obj, o)
+            req = self.COMM.irecv(None, source, 0)
+            sreq = self.COMM.isend(obj, dest, 0)
+            self.assertSame(obj, req.wait())
+            sreq.wait()
+
+    def testCollectives(self):
+        comm = self.COMM
+        size = comm.Get_size()
+        for obj in self.makeobjs():
+            self.assertSame(obj, comm.bcast(obj, root=0))
+            self.assertSame(obj, comm.scatter([obj] * size, root=0))
+            for o in comm.allgather(obj):
+                self.assertSame(obj, o)
+            for o in comm.alltoall([obj] * size):
+                self.assertSame(obj, o)
+
+    def testCopy(self):
+        obj = bytearray(b'abc' * 4096)
+        o = MPI.COMM_SELF.sendrecv(obj)
+        o[0] = ord('x')
+        self.assertEqual(obj[:1], b'a')
+        if numpy is not None:
+            obj = numpy.arange(4096, dtype='i')
+            o = MPI.COMM_SELF.sendrecv(obj)
+            o[0] = -1
+            self.assertEqual(o[0], -1)
+            self.assertEqual(obj[0], 0)
+
+    if numpy is not None:
+        def testNoAlias(self):
+            comm = MPI.COMM_SELF
+            for n in (7, 4096):
+                obj = numpy.arange(n, dtype='i')
+                buf = bytearray(4 * n + 1024)
+                req = comm.isend(obj, 0, 0)
+                o = comm.recv(buf, 0, 0)
+                req.wait()
+                buf[:] = b'\0' * len(buf)
+                o[0] = -1
+                self.assertEqual(o[1], 1)
+                req = comm.irecv(buf, 0, 0)
+                comm.send(obj, 0, 0)
+                o = req.wait()
+                buf[:] = b'\0' * len(buf)
+                o[0] = -1
+                self.assertEqual(o[1], 1)
+                o = comm.bcast(obj, root=0)
+                o[0] = -1
+                self.assertEqual(obj[0], 0)
+                self.assertEqual(o[1], 1)
+
+        def testMessageSize(self):
+            comm = MPI.COMM_SELF
+            obj = numpy.arange(1<<16, dtype='d')
+            req = comm.isend(obj, 0, 0)
+            status = MPI.Status()
+            comm.Probe(0, 0, status)
+            self.assertTrue(status.Get_count() < obj.nbytes + 128)
+            o = comm.recv(None, 0, 0)
+            req.wait()
+            self.assertSame(obj, o)
+
+    def testCustomDumps(self):
+        pickle = MPI._p_pickle
+        dumps, loads = pickle.dumps, pickle.loads
+        calls = []
+        def mydumps(obj, protocol):
+            calls.append(obj)
+            return dumps(obj, protocol)
+        pickle.dumps = mydumps
+        try:
+            obj = b'abc' * 4096
+            o = MPI.COMM_SELF.sendrecv(obj)
+            self.assertEqual(o, obj)
+            self.assertEqual(calls, [obj])
+        finally:
+            pickle.dumps = dumps
+
+
+CODECS = []
+for codec in ('zlib', 'bz2', 'lzma'):
+    try:
+        __import__(codec)
+    except ImportError:
+        continue
+    CODECS.append(codec)
+
+class TestPickleCompress(unittest.TestCase):
+
+    COMM = MPI.COMM_WORLD
+
+    def setUp(self):
+        pickle = MPI._p_pickle
+        self._backup = (pickle.COMPRESS,
+                        pickle.COMPRESS_THRESHOLD)
+        pickle.COMPRESS_THRESHOLD = 1024
+
+    def tearDown(self):
+        pickle = MPI._p_pickle
+        (pickle.COMPRESS,
+         pickle.COMPRESS_THRESHOLD) = self._backup
+
+    def makeobjs(self):
+        text = 'lorem ipsum dolor sit amet ' * 1000
+        return [None, 7, 'abc', text, [text] * 3,
+                {'a': text, 'b': list(range(1000))}]
+
+    def testAttributes(self):
+        pickle = MPI._p_pickle
+        self.assertEqual(pickle.COMPRESS, None)
+        for codec in CODECS:
+            pickle.COMPRESS = codec
+            self.assertEqual(pickle.COMPRESS, codec)
+        pickle.COMPRESS = None
+        self.assertEqual(pickle.COMPRESS, None)
+        self.assertRaises(ValueError, setattr, pickle, 'COMPRESS', 'foo')
+        pickle.COMPRESS_THRESHOLD = 0
+        self.assertEqual(pickle.COMPRESS_THRESHOLD, 0)
+        self.assertRaises(ValueError, setattr,
+                          pickle, 'COMPRESS_THRESHOLD', -1)
+
+    def testMessageSize(self):
+        pickle = MPI._p_pickle
+        comm = MPI.COMM_SELF
+        obj = self.makeobjs()[3]
+        size = len(pickle.dumps(obj, pickle.PROTOCOL))
+        for codec in CODECS:
+            pickle.COMPRESS = codec
+            for threshold, compressed in ((0, True),
+                                          (size, True),
+                                          (size+1, False)):
+                pickle.COMPRESS_THRESHOLD = threshold
+                req = comm.isend(obj, 0, 0)
+                status = MPI.Status()
+                comm.Probe(0, 0, status)
+                if compressed:
+                    self.assertTrue(status.Get_count() < size)
+                else:
+                    self.assertEqual(status.Get_count(), size)
+                pickle.COMPRESS = None
+                self.assertEqual(comm.recv(None, 0, 0), obj)
+                pickle.COMPRESS = codec
+                req.wait()
+
+    def testSendrecv(self):
+        pickle = MPI._p_pickle
+        size = self.COMM.Get_size()
+        rank = self.COMM.Get_rank()
+        dest = (rank + 1) % size
+        source = (rank - 1) % size
+        for codec in CODECS:
+            pickle.COMPRESS = codec
+            for obj in self.makeobjs():
+                o = self.COMM.sendrecv(obj, dest=dest, source=source)
+                self.assertEqual(obj, o)
+                req = self.COMM.irecv(None, source, 0)
+                sreq = self.COMM.isend(obj, dest, 0)
+                self.assertEqual(obj, req.wait())
+                sreq.wait()
+
+    def testCollectives(self):
+        pickle = MPI._p_pickle
+        comm = self.COMM
+        size = comm.Get_size()
+        for codec in CODECS:
+            pickle.COMPRESS = codec
+            for obj in self.makeobjs():
+                self.assertEqual(comm.bcast(obj, root=0), obj)
+                self.assertEqual(comm.scatter([obj] * size, root=0), obj)
+                o = comm.gather(obj, root=0)
+                if comm.Get_rank() == 0:
+                    self.assertEqual(o, [obj] * size)
+                self.assertEqual(comm.allgather(obj), [obj] * size)
+                self.assertEqual(comm.alltoall([obj] * size), [obj] * size)
+
+    if PickleBuffer is not None:
+        def testOutOfBand(self):
+            pickle = MPI._p_pickle
+            threshold = pickle.THRESHOLD
+            pickle.THRESHOLD = 1024
+            try:
+                text = self.makeobjs()[3]
+                buf = bytearray(b'abc' * 1024)
+                obj = [text, PickleBuffer(buf)]
+                for codec in CODECS:
+                    pickle.COMPRESS = codec
+                    o = MPI.COMM_SELF.sendrecv(obj)
+                    self.assertEqual(o[0], text)
+                    self.assertEqual(bytearray(o[1]), buf)
+            finally:
+                pickle.THRESHOLD = threshold
+
+
+# Messages above 2 GiB need several GiB of memory per process,
+# these tests only run when explicitly requested.
+if os.environ.get('MPI4PY_TEST_LARGE'):
+
+    class TestPickleLarge(unittest.TestCase):
+
+        COMM = MPI.COMM_SELF
+        SIZES = [(1<<31) - 64, (1<<31) + 64]
+
+        def assertLarge(self, obj, n):
+            self.assertEqual(len(obj), n)
+            self.assertEqual(obj[:1], b'a')
+            self.assertEqual(obj[-1:], b'z')
+
+        def makeobj(self, n):
+            obj = bytearray(n)
+            obj[:1] = b'a'
+            obj[-1:] = b'z'
+            return obj
+
+        def testSendrecv(self):
+            for n in self.SIZES:
+                o = self.COMM.sendrecv(self.makeobj(n))
+                self.assertLarge(o, n)
+
+        def testBcast(self):
+            for n in self.SIZES:
+                o = self.COMM.bcast(self.makeobj(n))
+                self.assertLarge(o, n)
+
+        def testGather(self):
+            for n in self.SIZES:
+                o = self.COMM.gather(self.makeobj(n))
+                self.assertLarge(o[0], n)
+
+        def testScatter(self):
+            for n in self.SIZES:
+                o = self.COMM.scatter([self.makeobj(n)])
+                self.assertLarge(o, n)
+
+
+# Lowering the message limit and chunk size takes the code paths for
+# messages above 2 GiB with small objects.
+class TestPickleLimits(unittest.TestCase):
+
+    COMM = MPI.COMM_WORLD
+
+    def setUp(self):
+        pickle = MPI._p_pickle
+        self._backup = (pickle.MSG_LIMIT,
+                        pickle.MSG_CHUNK)
+        pickle.MSG_LIMIT = 1000
+        pickle.MSG_CHUNK = 100
+
+    def tearDown(self):
+        pickle = MPI._p_pickle
+        (pickle.MSG_LIMIT,
+         pickle.MSG_CHUNK) = self._backup
+
+    def makeobj(self, rank, n):
+        return [rank, b'x' * n, 'abc' * (n // 3)]
+
+    def testAttributes(self):
+        pickle = MPI._p_pickle
+        pickle.MSG_LIMIT = 1
+        self.assertEqual(pickle.MSG_LIMIT, 1)
+        pickle.MSG_LIMIT = (1<<31) - 1
+        self.assertEqual(pickle.MSG_LIMIT, (1<<31) - 1)
+        self.assertRaises(ValueError, setattr, pickle, 'MSG_LIMIT', 0)
+        self.assertRaises(ValueError, setattr, pickle, 'MSG_LIMIT', 1<<31)
+        pickle.MSG_CHUNK = 1
+        self.assertEqual(pickle.MSG_CHUNK, 1)
+        pickle.MSG_CHUNK = 1<<30
+        self.assertEqual(pickle.MSG_CHUNK, 1<<30)
+        self.assertRaises(ValueError, setattr, pickle, 'MSG_CHUNK', 0)
+        self.assertRaises(ValueError, setattr, pickle, 'MSG_CHUNK', -1)
+        self.assertRaises(ValueError, setattr, pickle, 'MSG_CHUNK', 1<<31)
+
+    def testSendrecv(self):
+        comm = self.COMM
+        size = comm.Get_size()
+        rank = comm.Get_rank()
+        dest = (rank + 1) % size
+        source = (rank - 1) % size
+        for n in (10, 500, 5000):
+            o = comm.sendrecv(self.makeobj(rank, n), dest, 0, None, source, 0)
+            self.assertEqual(o, self.makeobj(source, n))
+
+    def testBcast(self):
+        comm = self.COMM
+        rank = comm.Get_rank()
+        for n in (10, 500, 5000):
+            for root in range(comm.Get_size()):
+                sobj = self.makeobj(root, n) if rank == root else None
+                o = comm.bcast(sobj, root=root)
+                self.assertEqual(o, self.makeobj(root, n))
+
+    def testGather(self):
+        comm = self.COMM
+        size = comm.Get_size()
+        rank = comm.Get_rank()
+        for n in (10, 500, 5000):
+            for root in range(size):
+                o = comm.gather(self.makeobj(rank, n * rank), root=root)
+                if rank == root:
+                    self.assertEqual(o, [self.makeobj(i, n * i)
+                                         for i in range(size)])
+                else:
+                    self.assertEqual(o, None)
+
+    def testScatter(self):
+        comm = self.COMM
+        size = comm.Get_size()
+        rank = comm.Get_rank()
+        for n in (10, 500, 5000):
+            for root in range(size):
+                sobj = None
+                if rank == root:
+                    sobj = [self.makeobj(i, n * i) for i in range(size)]
+                o = comm.scatter(sobj, root=root)
+                self.assertEqual(o, self.makeobj(rank, n * rank))
+
+    def testAllgather(self):
+        comm = self.COMM
+        size = comm.Get_size()
+        rank = comm.Get_rank()
+        for n in (10, 500, 5000):
+            o = comm.allgather(self.makeobj(rank, n * rank))
+            self.assertEqual(o, [self.makeobj(i, n * i)
+                                 for i in range(size)])
+
+    def testAlltoall(self):
+        comm = self.COMM
+        size = comm.Get_size()
+        rank = comm.Get_rank()
+        for n in (10, 500, 5000):
+            smess = [self.makeobj(rank, n * i) for i in range(size)]
+            o = comm.alltoall(smess)
+            self.assertEqual(o, [self.makeobj(i, n * rank)
+                                 for i in range(size)])
+
+
+class TestPickleBcast(unittest.TestCase):
+
+    COMM = MPI.COMM_WORLD
+
+    def setUp(self):
+        pickle = MPI._p_pickle
+        self._backup = pickle.BCAST_CHUNK
+        pickle.BCAST_CHUNK = 1000
+
+    def tearDown(self):
+        pickle = MPI._p_pickle
+        pickle.BCAST_CHUNK = self._backup
+
+    def makeobjs(self):
+        text = 'lorem ipsum dolor sit amet ' * 1000
+        return [None, 7, 'abc', text, [text] * 3,
+                list(range(10000)), b'x' * 100000,
+                {'a': text, 'b': [b'y' * 5000] * 10}]
+
+    def testAttributes(self):
+        pickle = MPI._p_pickle
+        pickle.BCAST_CHUNK = None
+        self.assertEqual(pickle.BCAST_CHUNK, None)
+        pickle.BCAST_CHUNK = 1
+        self.assertEqual(pickle.BCAST_CHUNK, 1)
+        pickle.BCAST_CHUNK = 1<<31
+        self.assertEqual(pickle.BCAST_CHUNK, 1<<31)
+        self.assertRaises(ValueError, setattr, pickle, 'BCAST_CHUNK', 0)
+        self.assertRaises(ValueError, setattr, pickle, 'BCAST_CHUNK', -1)
+
+    def testBcast(self):
+        pickle = MPI._p_pickle
+        comm = self.COMM
+        size = comm.Get_size()
+        rank = comm.Get_rank()
+        for chunk in (100, 1000, 1<<20):
+            pickle.BCAST_CHUNK = chunk
+            for root in range(size):
+                for obj in self.makeobjs():
+                    sobj = obj if rank == root else None
+                    o = comm.bcast(sobj, root=root)
+                    self.assertEqual(obj, o)
+
+    def testBcastRoot(self):
+        comm = self.COMM
+        rank = comm.Get_rank()
+        text = 'lorem ipsum dolor sit amet ' * 1000
+        for obj in ([text] * 3, {'a': [b'y' * 5000] * 10}, ['abc']):
+            for root in range(comm.Get_size()):
+                sobj = obj if rank == root else None
+                o = comm.bcast(sobj, root=root)
+                self.assertEqual(obj, o)
+                self.assertFalse(o is obj)
+
+    def testBcastLoads(self):
+        pickle = MPI._p_pickle
+        comm = self.COMM
+        rank = comm.Get_rank()
+        loads = pickle.loads
+        calls = []
+        def myloads(data):
+            calls.append(len(data))
+            return loads(data)
+        obj = ['lorem ipsum dolor sit amet ' * 1000] * 3
+        pickle.loads = myloads
+        try:
+            for root in range(comm.Get_size()):
+                del calls[:]
+                sobj = obj if rank == root else None
+                o = comm.bcast(sobj, root=root)
+                self.assertEqual(obj, o)
+                self.assertEqual(len(calls), 1)
+                self.assertTrue(calls[0] > 1000)
+        finally:
+            pickle.loads = loads
+
+    def testBcastStats(self):
+        pickle = MPI._p_pickle
+        comm = self.COMM
+        rank = comm.Get_rank()
+        stats = pickle.STATS
+        pickle.STATS = True
+        try:
+            obj = [b'x' * 5000] * 10
+            for root in range(comm.Get_size()):
+                pickle.reset_stats()
+                sobj = obj if rank == root else None
+                o = comm.bcast(sobj, root=root)
+                self.assertEqual(obj, o)
+                counters = pickle.get_stats()[(comm.py2f(), 'bcast')]
+                self.assertEqual(counters['calls'], 1)
+                self.assertEqual(counters['loads'], 1)
+                self.assertTrue(counters['bytes_in'] > 5000)
+                if rank == root:
+                    self.assertEqual(counters['dumps'], 1)
+                    self.assertTrue(counters['bytes_out'] > 5000)
+                else:
+                    self.assertEqual(counters['dumps'], 0)
+                    self.assertEqual(counters['bytes_out'], 0)
+        finally:
+            pickle.STATS = stats
+
+    if sys.version_info >= (3, 8):
+        def testBcastError(self):
+            comm = self.COMM
+            rank = comm.Get_rank()
+            for obj in ([b'x' * (1<<20), lambda: None],
+                        [lambda: None, b'x' * (1<<20)]):
+                if rank == 0:
+                    self.assertRaises(Exception, comm.bcast, obj, root=0)
+                else:
+                    self.assertRaises(RuntimeError, comm.bcast, None, root=0)
+                self.assertEqual(comm.bcast(rank, root=0), 0)
+
+
+class TestPickleBcastChunk(TestPickleBcast):
+
+    def setUp(self):
+        super(TestPickleBcastChunk, self).setUp()
+        pickle = MPI._p_pickle
+        self._chunk = pickle.MSG_CHUNK
+        pickle.MSG_CHUNK = 500
+
+    def tearDown(self):
+        pickle = MPI._p_pickle
+        pickle.MSG_CHUNK = self._chunk
+        super(TestPickleBcastChunk, self).tearDown()
+
+
+class TestPickleAlltoall(unittest.TestCase):
+
+    COMM = MPI.COMM_WORLD
+
+    def setUp(self):
+        pickle = MPI._p_pickle
+        self._backup = pickle.ALLTOALL_WINDOW
+        pickle.ALLTOALL_WINDOW = 1
+
+    def tearDown(self):
+        pickle = MPI._p_pickle
+        pickle.ALLTOALL_WINDOW = self._backup
+
+    def testAttributes(self):
+        pickle = MPI._p_pickle
+        pickle.ALLTOALL_WINDOW = None
+        self.assertEqual(pickle.ALLTOALL_WINDOW, None)
+        pickle.ALLTOALL_WINDOW = 4
+        self.assertEqual(pickle.ALLTOALL_WINDOW, 4)
+        self.assertRaises(ValueError, setattr, pickle, 'ALLTOALL_WINDOW', 0)
+        self.assertRaises(ValueError, setattr, pickle, 'ALLTOALL_WINDOW', -1)
+        self.assertRaises(ValueError, setattr, pickle, 'ALLTOALL_WINDOW', 1<<31)
+
+    def testAlltoall(self):
+        pickle = MPI._p_pickle
+        comm = self.COMM
+        size = comm.Get_size()
+        rank = comm.Get_rank()
+        smess = [(rank, i, b'x' * (i * 50000)) for i in range(size)]
+        for window in (1, 2, 3, 100):
+            pickle.ALLTOALL_WINDOW = window
+            rmess = comm.alltoall(smess)
+            self.assertEqual(rmess, [(i, rank, b'x' * (rank * 50000))
+                                     for i in range(size)])
+            rmess = comm.alltoall(None)
+            self.assertEqual(rmess, [None] * size)
+            self.assertRaises(ValueError, comm.alltoall, [None] * (size+1))
+
+
+class TestPickleBufferPool(unittest.TestCase):
+
+    COMM = MPI.COMM_WORLD
+
+    def setUp(self):
+        pickle = MPI._p_pickle
+        self._backup = (pickle.BUFFER_POOL,
+                        pickle.THRESHOLD)
+
+    def tearDown(self):
+        pickle = MPI._p_pickle
+        (pickle.BUFFER_POOL,
+         pickle.THRESHOLD) = self._backup
+
+    def testAttributes(self):
+        pickle = MPI._p_pickle
+        self.assertEqual(pickle.BUFFER_POOL, 1<<24)
+        pickle.BUFFER_POOL = None
+        self.assertEqual(pickle.BUFFER_POOL, None)
+        pickle.BUFFER_POOL = 0
+        self.assertEqual(pickle.BUFFER_POOL, 0)
+        pickle.BUFFER_POOL = 1<<20
+        self.assertEqual(pickle.BUFFER_POOL, 1<<20)
+        self.assertRaises(ValueError, setattr, pickle, 'BUFFER_POOL', -1)
+
+    def makeobjs(self, i):
+        objs = [[i] * 10000, bytearray([i]) * 20000,
+                {'a': 'x' * 30000, 'i': i}]
+        if numpy is not None:
+            objs.append(numpy.full(5000, i, dtype='i8'))
+            objs.append({'b': numpy.full(3000, i, dtype='f8')})
+        return objs
+
+    def assertObjs(self, objs, i):
+        for a, b in zip(objs, self.makeobjs(i)):
+            if numpy is not None and isinstance(b, dict) and 'b' in b:
+                self.assertTrue((a['b'] == b['b']).all())
+            elif numpy is not None and isinstance(b, numpy.ndarray):
+                self.assertTrue((a == b).all())
+            else:
+                self.assertEqual(a, b)
+
+    def testReuse(self):
+        pickle = MPI._p_pickle
+        comm = self.COMM
+        size = comm.Get_size()
+        rank = comm.Get_rank()
+        dest = (rank + 1) % size
+        source = (rank - 1) % size
+        for threshold in (None, 1024):
+            pickle.THRESHOLD = threshold
+            for pool in (None, 1<<24, 1<<15):
+                pickle.BUFFER_POOL = pool
+                kept = []
+                for i in range(10):
+                    o = comm.sendrecv(self.makeobjs(i), dest, source=source)
+                    kept.append(o)
+                    o = comm.bcast(self.makeobjs(i), root=i % size)
+                    kept.append(o)
+                    o = comm.allgather(self.makeobjs(i))
+                    kept.extend(o)
+                    for j in range(i+1):
+                        self.assertObjs(kept[(size+2)*j+0], j)
+                        self.assertObjs(kept[(size+2)*j+1], j)
+                        for k in range(size):
+                            self.assertObjs(kept[(size+2)*j+2+k], j)
+                    comm.Barrier()
+
+
+class TestPickleStats(unittest.TestCase):
+
+    COMM = MPI.COMM_WORLD
+
+    def setUp(self):
+        self.COMM = self.COMM.Dup()
+        MPI._p_pickle.STATS = True
+
+    def tearDown(self):
+        MPI._p_pickle.STATS = False
+        self.COMM.Free()
+
+    def testAttributes(self):
+        pickle = MPI._p_pickle
+        self.assertTrue(pickle.STATS)
+        pickle.STATS = False
+        self.assertFalse(pickle.STATS)
+        self.assertEqual(pickle.get_stats(), {})
+        self.COMM.bcast(None, root=0)
+        self.assertEqual(pickle.get_stats(), {})
+        pickle.STATS = True
+        self.assertTrue(pickle.STATS)
+
+    def testCounters(self):
+        pickle = MPI._p_pickle
+        comm = self.COMM
+        size = comm.Get_size()
+        rank = comm.Get_rank()
+        dest = (rank + 1) % size
+        source = (rank - 1) % size
+        smess = [rank] * 100
+        for i in range(3):
+            request = comm.irecv(None, source, 0)
+            comm.send(smess, dest, 0)
+            request.wait()
+            comm.allgather(smess)
+        handle = comm.py2f()
+        stats = pickle.get_stats()
+        send = stats[(handle, 'send')]
+        self.assertEqual(send['calls'], 3)
+        self.assertEqual(send['dumps'], 3)
+        self.assertEqual(send['loads'], 0)
+        self.assertTrue(send['bytes_out'] > 100 * 3)
+        wait = stats[(None, 'wait')]
+        self.assertEqual(wait['calls'], 3)
+        self.assertEqual(wait['loads'], 3)
+        self.assertEqual(wait['bytes_in'], send['bytes_out'])
+        allgather = stats[(handle, 'allgather')]
+        self.assertEqual(allgather['calls'], 3)
+        self.assertEqual(allgather['dumps'], 3)
+        self.assertEqual(allgather['loads'], 3 * size)
+        for counters in stats.values():
+            for key in ('dumps_time', 'loads_time', 'transfer_time'):
+                self.assertTrue(counters[key] >= 0)
+        total = pickle.gather_stats(comm, root=0)
+        if rank == 0:
+            self.assertEqual(total[(handle, 'send')]['calls'], 3 * size)
+            self.assertEqual(total[(handle, 'send')]['bytes_out'],
+                             send['bytes_out'] * size)
+        else:
+            self.assertEqual(total, None)
+        self.assertEqual(pickle.get_stats(), stats)
+        pickle.reset_stats()
+        self.assertEqual(pickle.get_stats(), {})
+
+
 if __name__ == '__main__':
     try:
         unittest.main()
@@ -84,6 +84,116 @@ class TestRequestArray(unittest.TestCase):
             self.assertEqual((ret[0],list(ret[1])), out)
             self.assertEqual(len(statuses), len(self.REQUESTS))
 
+class TestRequestSet(unittest.TestCase):
+
+    def setUp(self):
+        self.REQUESTS = MPI.RequestSet([MPI.Request() for i in range(5)],
+                                       statuses=True)
+
+    def testContainer(self):
+        requests = self.REQUESTS
+        self.assertEqual(len(requests), 5)
+        request = MPI.Request()
+        self.assertEqual(requests.add(request), 5)
+        self.assertTrue(requests[-1] is request)
+        self.assertTrue(requests.remove(5) is request)
+        self.assertEqual(len(requests), 5)
+        self.assertRaises(IndexError, requests.__getitem__, 5)
+        self.assertRaises(IndexError, requests.remove, -6)
+        status = requests.get_status(0)
+        self.assertEqual(status.Get_source(), MPI.ANY_SOURCE)
+        self.assertEqual(status.Get_tag(), MPI.ANY_TAG)
+        requests = MPI.RequestSet()
+        self.assertEqual(len(requests), 0)
+        requests.add(MPI.Request())
+        self.assertRaises(ValueError, requests.get_status, 0)
+
+    def testCompletion(self):
+        requests = self.REQUESTS
+        self.assertEqual(requests.Waitany(), MPI.UNDEFINED)
+        self.assertEqual(requests.Testany(), (True, MPI.UNDEFINED))
+        self.assertEqual(requests.Waitall(), None)
+        self.assertTrue(requests.Testall())
+        self.assertEqual(requests.Waitsome(), None)
+        self.assertEqual(requests.Testsome(), None)
+
+    def testMessages(self):
+        comm = MPI.COMM_SELF
+        requests = MPI.RequestSet(statuses=True)
+        buffers = [bytearray(1) for i in range(10)]
+        for i in range(10):
+            requests.add(comm.Irecv(buffers[i], 0, i))
+        self.assertEqual(list(requests.Testsome()), [])
+        self.assertEqual(requests.Testany(), (False, MPI.UNDEFINED))
+        for i in range(0, 10, 3):
+            comm.Send(bytearray([i]), 0, i)
+        indices = requests.Waitsome()
+        self.assertTrue(len(indices) > 0)
+        for i in indices:
+            self.assertEqual(i % 3, 0)
+            self.assertEqual(buffers[i][0], i)
+            self.assertEqual(requests[i], MPI.REQUEST_NULL)
+            self.assertEqual(requests.get_status(i).Get_tag(), i)
+        for i in range(10):
+            if i % 3: comm.Send(bytearray([i]), 0, i)
+        requests.Waitall()
+        for i in range(10):
+            self.assertEqual(buffers[i][0], i)
+            self.assertEqual(requests[i], MPI.REQUEST_NULL)
+            if i in indices: continue
+            self.assertEqual(requests.get_status(i).Get_tag(), i)
+
+    def testPersistent(self):
+        comm = MPI.COMM_SELF
+        sbuf, rbuf = bytearray(1), bytearray(1)
+        requests = MPI.RequestSet([comm.Send_init(sbuf, 0, 7),
+                                   comm.Recv_init(rbuf, 0, 7)])
+        for i in range(3):
+            sbuf[0] = i
+            requests.Startall()
+            requests.Waitall()
+            self.assertEqual(rbuf[0], i)
+        for i in range(2):
+            requests[i].Free()
+
+    def testObjects(self):
+        comm = MPI.COMM_SELF
+        for smess in (None, 'abc', b'x' * (1<<16)):
+            requests = MPI.RequestSet([comm.irecv(None, 0, 1),
+                                       comm.isend(smess, 0, 1)])
+            requests.Waitall()
+            self.assertFalse(requests[0])
+            self.assertFalse(requests[1])
+            requests = MPI.RequestSet([comm.irecv(None, 0, 2),
+                                       comm.ibcast(smess, root=0)])
+            requests.add(comm.isend(smess, 0, 2))
+            while not requests.Testall():
+                pass
+            self.assertFalse(any(requests[i] for i in range(3)))
+            requests = MPI.RequestSet([comm.irecv(None, 0, 3)])
+            request = comm.isend(smess, 0, 3)
+            self.assertEqual(requests.Waitany(), 0)
+            self.assertEqual(requests.Waitany(), MPI.UNDEFINED)
+            request.Wait()
+            requests = MPI.RequestSet([comm.irecv(None, 0, 4),
+                                       comm.iallgather(smess)])
+            request = comm.isend(smess, 0, 4)
+            while requests.Waitsome() is not None:
+                pass
+            self.assertFalse(requests[0])
+            self.assertFalse(requests[1])
+            request.Wait()
+            request = comm.irecv(None, 0, 5)
+            requests = MPI.RequestSet([request])
+            sreq = comm.isend(smess, 0, 5)
+            self.assertEqual(requests[0], request)
+            while len(requests.Testsome()) == 0:
+                pass
+            self.assertFalse(requests[0])
+            self.assertEqual(requests.Testany(), (True, MPI.UNDEFINED))
+            sreq.Wait()
+
+
 _name, _version = MPI.get_vendor()
 if (_name == 'MPICH1' or
     _name == 'LAM/MPI'):
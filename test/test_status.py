@@ -86,5 +86,53 @@ class TestStatus(unittest.TestCase):
             pass
 
 
+class TestStatusArray(unittest.TestCase):
+
+    def testDefaultFieldValues(self):
+        statuses = MPI.StatusArray(3)
+        self.assertEqual(len(statuses), 3)
+        self.assertEqual(list(statuses.Get_source()), [MPI.ANY_SOURCE] * 3)
+        self.assertEqual(list(statuses.Get_tag()), [MPI.ANY_TAG] * 3)
+        self.assertEqual(list(statuses.Get_error()), [MPI.SUCCESS] * 3)
+        self.assertEqual(list(statuses.sources), [MPI.ANY_SOURCE] * 3)
+        self.assertEqual(list(statuses.tags), [MPI.ANY_TAG] * 3)
+        self.assertEqual(list(statuses.errors), [MPI.SUCCESS] * 3)
+        self.assertEqual(statuses[-1].Get_source(), MPI.ANY_SOURCE)
+        self.assertEqual(statuses[-1].Get_tag(), MPI.ANY_TAG)
+        self.assertRaises(IndexError, statuses.__getitem__, 3)
+        self.assertEqual(len(MPI.StatusArray()), 0)
+
+    def testBufferInterface(self):
+        statuses = MPI.StatusArray(4)
+        for array in (statuses.sources, statuses.tags,
+                      statuses.errors, statuses.counts):
+            mem = memoryview(array)
+            self.assertEqual(mem.format, 'i')
+            self.assertEqual(len(mem), 4)
+
+    def testCompletion(self):
+        comm = MPI.COMM_SELF
+        buffers = [bytearray(i) for i in range(5)]
+        requests = [comm.Irecv(buffers[i], 0, 10 + i) for i in range(5)]
+        for i in range(5):
+            comm.Send(bytearray(i), 0, 10 + i)
+        statuses = MPI.StatusArray()
+        MPI.Request.Waitall(requests, statuses)
+        self.assertEqual(len(statuses), 5)
+        self.assertEqual(list(statuses.sources), [0] * 5)
+        self.assertEqual(list(statuses.tags), list(range(10, 15)))
+        self.assertEqual(list(statuses.counts), list(range(5)))
+        self.assertEqual(list(statuses.Get_count(MPI.BYTE)), list(range(5)))
+        self.assertEqual(list(statuses.Get_elements(MPI.BYTE)),
+                         list(range(5)))
+        self.assertEqual(statuses[3].Get_tag(), 13)
+        requests = [comm.isend(i, 0, 20 + i) for i in range(3)]
+        requests += [comm.irecv(None, 0, 20 + i) for i in range(3)]
+        self.assertEqual(MPI.Request.waitall(requests, statuses),
+                         [None] * 3 + list(range(3)))
+        self.assertEqual(len(statuses), 6)
+        self.assertEqual(list(statuses.tags)[3:], [20, 21, 22])
+
+
 if __name__ == '__main__':
     unittest.main()